@@ -0,0 +1,170 @@
+"""
+Propose how to allocate unallocated line items across grants.
+
+Eligibility comes from the grants' Allowed Items (grant_rules); grants without Allowed Items
+only take rows when asked to. The plan is built greedily: the most constrained rows (fewest
+eligible grants, then largest cost) are placed first, each on its best-matching eligible
+grant that still has enough balance, with ties going to the grant with the most money left.
+Nothing is changed until the plan is committed.
+
+Rows allocated by hand or by a committed plan are also recorded in a marks file next to the
+grants, keyed by the row's item, cost and date, so a reloaded workbook is not charged again.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from data_loader import clean_cost_series
+from categorizer import find_name_column
+from chart_data import find_date_column
+from grant_rules import GrantRuleMatcher
+
+ALLOCATED_GRANT_COLUMN = 'allocated grant'  # Marks rows already allocated to a grant
+ALLOCATION_MARKS_FILE_NAME = "allocation_marks.json"
+
+
+def grant_balances(grant_data):
+    """Money still available per grant: Total Balance minus Allocated Costs (missing counts as 0)."""
+    total = pd.to_numeric(grant_data['Total Balance'], errors='coerce').fillna(0)
+    if 'Allocated Costs' in grant_data.columns:
+        allocated = pd.to_numeric(grant_data['Allocated Costs'], errors='coerce').fillna(0)
+    else:
+        allocated = 0
+    return (total - allocated).to_numpy(dtype=float)
+
+
+def unallocated_rows(sheet_data):
+    """Boolean mask of rows with a positive cost and no grant allocated yet."""
+    costs = clean_cost_series(sheet_data['cost'])
+    mask = costs > 0
+    if ALLOCATED_GRANT_COLUMN in sheet_data.columns:
+        allocated = sheet_data[ALLOCATED_GRANT_COLUMN]
+        mask &= allocated.isna() | (allocated.astype(str).str.strip() == "")
+    return mask.to_numpy()
+
+
+def row_keys(sheet_data):
+    """Key identifying each line item across reloads: a hash of its item name, cost and date."""
+    parts = pd.DataFrame({'cost': clean_cost_series(sheet_data['cost']).round(2).astype(str)})
+    name_column = find_name_column(sheet_data.columns)
+    if name_column is not None:
+        parts['name'] = sheet_data[name_column].astype(str).str.strip().str.lower()
+    date_column = find_date_column(sheet_data.columns)
+    if date_column is not None:
+        parts['date'] = pd.to_datetime(sheet_data[date_column], errors='coerce').astype(str)
+    return pd.util.hash_pandas_object(parts, index=False).astype(str).to_numpy()
+
+
+def load_allocation_marks(path):
+    """{row key: [grant name per allocated occurrence]} saved at path, or {}."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_allocation_marks(path, marks):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(marks, f)
+
+
+def record_allocation_marks(marks, sheet_data, rows, grant_names):
+    """Add the grants the rows at positions `rows` were allocated to."""
+    keys = row_keys(sheet_data.iloc[rows])
+    for key, grant_name in zip(keys, grant_names):
+        marks.setdefault(key, []).append(str(grant_name))
+
+
+def apply_allocation_marks(sheet_data, marks):
+    """
+    Write the recorded grants into ALLOCATED_GRANT_COLUMN. Identical line items are matched in
+    order, as many as were allocated. Returns the number of rows marked.
+    """
+    if not marks or 'cost' not in sheet_data.columns:
+        return 0
+    keys = pd.Series(row_keys(sheet_data))
+    occurrence = keys.groupby(keys).cumcount().to_numpy()
+    rows, grant_names = [], []
+    for row in np.flatnonzero(keys.isin(marks).to_numpy()):
+        recorded = marks[keys.iat[row]]
+        if occurrence[row] < len(recorded):
+            rows.append(row)
+            grant_names.append(recorded[occurrence[row]])
+    if rows:
+        if ALLOCATED_GRANT_COLUMN not in sheet_data.columns:
+            sheet_data[ALLOCATED_GRANT_COLUMN] = pd.Series("", index=sheet_data.index, dtype=object)
+        sheet_data.iloc[rows, sheet_data.columns.get_loc(ALLOCATED_GRANT_COLUMN)] = grant_names
+    return len(rows)
+
+
+def greedy_assign(costs, pairs, balances):
+    """
+    Assign rows to grants. `pairs` has columns row, grant, score (row positions into `costs`).
+    Returns (grant index per row, -1 when nothing fits; score per row).
+    """
+    remaining = np.array(balances, dtype=float)
+    assignment = np.full(len(costs), -1)
+    assigned_scores = np.zeros(len(costs))
+    if pairs.empty:
+        return assignment, assigned_scores
+
+    # Candidates of each row, best match first
+    pairs = pairs.sort_values(['row', 'score'], ascending=[True, False], kind='stable')
+    candidates = {
+        row: (group['grant'].to_numpy(), group['score'].to_numpy())
+        for row, group in pairs.groupby('row', sort=False)
+    }
+
+    # Most constrained rows first, then the biggest costs
+    rows = sorted(candidates, key=lambda row: (len(candidates[row][0]), -costs[row]))
+    for row in rows:
+        grant_indexes, scores = candidates[row]
+        best = None
+        for grant_index, score in zip(grant_indexes, scores):
+            if remaining[grant_index] < costs[row]:
+                continue
+            if best is None or score > best[1] or (score == best[1] and remaining[grant_index] > remaining[best[0]]):
+                best = (grant_index, score)
+        if best is not None:
+            assignment[row] = best[0]
+            assigned_scores[row] = best[1]
+            remaining[best[0]] -= costs[row]
+    return assignment, assigned_scores
+
+
+def plan_allocation(sheet_data, grant_data, include_unrestricted=False):
+    """
+    Build an allocation plan for the unallocated rows of a sheet. include_unrestricted lets
+    grants without Allowed Items take any row that no other grant can.
+    Returns (plan, summary):
+      plan: one row per unallocated line item with its sheet position, cost, proposed grant
+            ('' if no eligible grant has enough balance) and match score;
+      summary: per grant, the available balance, planned amount and balance left.
+    """
+    positions = np.flatnonzero(unallocated_rows(sheet_data))
+    candidates = sheet_data.iloc[positions]
+    costs = clean_cost_series(candidates['cost']).to_numpy(dtype=float)
+
+    matcher = GrantRuleMatcher(grant_data)
+    balances = grant_balances(grant_data)
+    assignment, scores = greedy_assign(costs, matcher.eligible_pairs(candidates, include_unrestricted), balances)
+
+    grant_names = np.array(matcher.grant_names + [""], dtype=object)  # Index -1 maps to ''
+    plan = pd.DataFrame({
+        'row': positions,
+        'cost': costs,
+        'grant': grant_names[assignment],
+        'score': scores.round(2),
+    })
+
+    planned = np.bincount(assignment[assignment >= 0], weights=costs[assignment >= 0], minlength=len(balances))
+    summary = pd.DataFrame({
+        'Grant ID': grant_data['Grant ID'].to_numpy(),
+        'Grant Name': matcher.grant_names,
+        'Available': balances.round(2),
+        'Planned': planned.round(2),
+        'Remaining': (balances - planned).round(2),
+    })
+    return plan, summary
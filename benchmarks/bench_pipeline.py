@@ -0,0 +1,204 @@
+"""
+Time the main inventory operations on synthetic data and compare with a stored baseline.
+
+Operations: load (read_data_file), categorize (explain_rows), group (monthly close prepare +
+group by month), sum (costs by month and by fund), filter (date range total), allocate
+(plan_allocation) and export (one workbook). Each is timed at every requested size; the best
+of --repeat runs is kept.
+
+Usage:
+    python benchmarks/bench_pipeline.py                      # 1k/10k/100k/1M rows, compare with baseline
+    python benchmarks/bench_pipeline.py --sizes 1000 10000 --operations categorize allocate
+    python benchmarks/bench_pipeline.py --save-baseline      # store these timings as the new baseline
+    python benchmarks/bench_pipeline.py --fail-on-regression # exit with status 1 when something got slower
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import read_data_file, clean_cost_series
+from categorizer import explain_rows
+from supplier_resolver import SupplierResolver
+from allocation_optimizer import plan_allocation
+from monthly_close import prepare_stage, group_by_month_stage, summarize, excel_engine
+from synthetic_data import generate_inventory, generate_grants, write_inventory
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REGRESSION_TOLERANCE = 0.25  # Slower than baseline by more than this fraction is flagged
+NOISE_FLOOR_SECONDS = 0.005  # Differences below this are never flagged
+GRANT_COUNT = 50
+
+
+def close_context(state):
+    return {'sheet_dict': state['excel_data'], 'grant_data': state['grants'], 'month': None,
+            'resolver': None, 'memo': None, 'sheets': {}, 'data': None}
+
+
+def bench_load(state):
+    read_data_file(state['file_path'])
+
+
+def bench_categorize(state):
+    explain_rows(state['sheet'], 'item name', resolver=SupplierResolver())  # Fresh resolver: nothing cached
+
+
+def bench_group(state):
+    context = close_context(state)
+    prepare_stage(context)
+    group_by_month_stage(context)
+
+
+def bench_sum(state):
+    summarize(state['prepared'], 'month')
+    summarize(state['prepared'], 'fund_number')
+
+
+def bench_filter(state):
+    sheet = state['sheet']
+    dates = sheet['expiration date']
+    start, end = dates.quantile(0.25), dates.quantile(0.75)
+    in_range = sheet[(dates >= start) & (dates <= end)]
+    clean_cost_series(in_range['cost']).sum()
+
+
+def bench_allocate(state):
+    plan_allocation(state['sheet'], state['grants'])
+
+
+def bench_export(state):
+    with pd.ExcelWriter(os.path.join(state['directory'], "export.xlsx"), engine=excel_engine()) as writer:
+        for sheet_name, sheet_data in state['excel_data'].items():
+            sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+OPERATIONS = [
+    ('load', bench_load),
+    ('categorize', bench_categorize),
+    ('group', bench_group),
+    ('sum', bench_sum),
+    ('filter', bench_filter),
+    ('allocate', bench_allocate),
+    ('export', bench_export),
+]
+
+
+def prepare_state(rows, directory, file_format, sheets, seed):
+    """Generate the data for one size and write the file the load benchmark reads."""
+    excel_data = generate_inventory(rows, sheets=sheets, seed=seed)
+    file_path = os.path.join(directory, f"inventory_{rows}.{file_format}")
+    write_inventory(excel_data, file_path)
+
+    state = {
+        'excel_data': excel_data,
+        'sheet': pd.concat(excel_data.values(), ignore_index=True),
+        'grants': generate_grants(GRANT_COUNT, seed=seed),
+        'file_path': file_path,
+        'directory': directory,
+    }
+    context = close_context(state)
+    prepare_stage(context)
+    state['prepared'] = context['data']
+    return state
+
+
+def time_operation(operation, state, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(path, results):
+    baseline = {
+        'machine': platform.node(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'saved': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'results': results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+
+
+def compare(results, baseline, tolerance):
+    """Print every timing next to its baseline. Returns the keys that regressed."""
+    regressions = []
+    print(f"\n{'operation':<12}{'rows':>10}{'seconds':>11}{'baseline':>11}{'ratio':>8}  rows/s")
+    for key, seconds in results.items():
+        operation, rows = key.split('@')
+        reference = baseline.get(key)
+        ratio_text, flag = "", ""
+        if reference:
+            ratio = seconds / reference
+            ratio_text = f"{ratio:.2f}x"
+            if ratio > 1 + tolerance and seconds - reference > NOISE_FLOOR_SECONDS:
+                flag = "  REGRESSION"
+                regressions.append(key)
+            elif ratio < 1 - tolerance and reference - seconds > NOISE_FLOOR_SECONDS:
+                flag = "  faster"
+        reference_text = f"{reference:.4f}" if reference else "-"
+        throughput = int(int(rows) / seconds) if seconds > 0 else 0
+        print(f"{operation:<12}{int(rows):>10}{seconds:>11.4f}{reference_text:>11}{ratio_text:>8}  {throughput:,}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the inventory operations on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Row counts to benchmark")
+    parser.add_argument("--operations", nargs="+", choices=[name for name, _ in OPERATIONS],
+                        default=[name for name, _ in OPERATIONS])
+    parser.add_argument("--sheets", type=int, default=3, help="Sheets per generated workbook")
+    parser.add_argument("--format", choices=['csv', 'xlsx', 'parquet'], default='csv', help="File format read by 'load'")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operation (best time is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these timings as the baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.sizes:
+            print(f"Generating {rows} rows...")
+            state = prepare_state(rows, directory, args.format, args.sheets, args.seed)
+            for name, operation in OPERATIONS:
+                if name not in args.operations:
+                    continue
+                results[f"{name}@{rows}"] = time_operation(operation, state, args.repeat)
+                print(f"  {name:<12}{results[f'{name}@{rows}']:.4f} s")
+
+    regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+
+    if args.save_baseline:
+        merged = load_baseline(args.baseline)
+        merged.update(results)
+        save_baseline(args.baseline, merged)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regressions: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
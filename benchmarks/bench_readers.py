@@ -0,0 +1,59 @@
+"""
+Compare the workbook reader backends on real inventory workbooks.
+
+Usage:
+    python benchmarks/bench_readers.py path/to/inventory.xlsx [more.xlsx ...] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import READER_BACKENDS, backend_available, read_with_backend
+
+
+def time_backend(file_path, backend, repeat):
+    """Return the best wall time over `repeat` reads, plus the total row count."""
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sheets = read_with_backend(file_path, backend)
+        elapsed = time.perf_counter() - start
+        rows = sum(len(sheet) for sheet in sheets.values())
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Excel reader backends.")
+    parser.add_argument("workbooks", nargs="+", help="Workbooks to read")
+    parser.add_argument("--repeat", type=int, default=3, help="Reads per backend (best time is reported)")
+    args = parser.parse_args()
+
+    for backend in READER_BACKENDS:
+        if not backend_available(backend):
+            print(f"{backend}: not installed, skipped")
+
+    backends = [backend for backend in READER_BACKENDS if backend_available(backend)]
+
+    for file_path in args.workbooks:
+        size_mb = os.path.getsize(file_path) / 1024 ** 2
+        print(f"\n{os.path.basename(file_path)} ({size_mb:.1f} MB)")
+        timings = {}
+        for backend in backends:
+            elapsed, rows = time_backend(file_path, backend, args.repeat)
+            timings[backend] = elapsed
+            print(f"  {backend:<20} {elapsed:8.3f} s  {rows:>9} rows")
+
+        baseline = timings.get('openpyxl')
+        if baseline:
+            for backend, elapsed in timings.items():
+                if backend != 'openpyxl':
+                    print(f"  {backend} is {baseline / elapsed:.1f}x the speed of openpyxl")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Synthetic inventory workbooks and grant tables for the benchmarks.
+
+Item names are built from the categorizer's own keyword lists (so categorization does real
+work), suppliers come with the spelling variants seen in real exports, and costs are
+written the way the workbooks store them ('$12.50'). Everything is seeded, so a given size
+always produces the same data.
+
+Usage:
+    python benchmarks/synthetic_data.py out.xlsx --rows 10000 --sheets 3
+    python benchmarks/synthetic_data.py grants.csv --grants 50
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categorizer import CATEGORIES
+from supplier_resolver import SUPPLIER_ALIASES
+
+ITEM_SIZES = ['', '10 mL', '100 mL', '500 mL', '1 L', '25 g', '100 g', '96-well', '50 pack', '1000/case']
+REQUESTERS = ['Abhishek', 'Rahul', 'Weisi', 'Paul', 'Maria', 'Chen']
+PROJECTS = ['APOBEC Metastasis', 'POL-Theta', 'EVOSIGNALS', 'CIN', 'Organoids', 'Bio-Digital Avatars']
+UNKNOWN_ITEMS = ['shipping fee', 'service contract', 'misc hardware', 'repair kit', 'freight charge']
+POPULARITY_EXPONENT = 1.0  # Item popularity ~ 1 / rank ** exponent
+
+
+def supplier_variants(canonical_names, rng, count):
+    """Supplier spellings as they appear in exports: exact, lowercase, uppercase, with a suffix, or with a typo."""
+    variants = []
+    for index in range(count):
+        name = canonical_names[index % len(canonical_names)]
+        style = rng.integers(0, 5)
+        if style == 1:
+            name = name.lower()
+        elif style == 2:
+            name = name.upper()
+        elif style == 3:
+            name = f"{name} Inc."
+        elif style == 4 and len(name) > 5:
+            position = rng.integers(1, len(name) - 1)
+            name = name[:position] + name[position + 1:]  # Dropped letter
+        variants.append(name)
+    return variants
+
+
+def generate_inventory(rows, sheets=1, suppliers=30, categories=None, start_date='2023-01-01', date_span_days=730,
+                       distinct_items=None, seed=0):
+    """
+    Return {sheet_name: DataFrame} with `rows` line items in total, split evenly over the sheets.
+    `categories` limits the item vocabulary to some category names; `distinct_items` defaults
+    to about one distinct item per 20 rows, as in real order histories.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Step 1: Vocabulary of distinct items
+    category_names = categories or list(CATEGORIES)
+    keywords = [keyword for name in category_names for keyword in CATEGORIES[name]] + UNKNOWN_ITEMS
+    distinct_items = distinct_items or max(10, rows // 20)
+    bases = rng.choice(keywords, distinct_items)
+    sizes = rng.choice(ITEM_SIZES, distinct_items)
+    items = np.array([f"{base} {size}".strip() for base, size in zip(bases, sizes)], dtype=object)
+    catalog_numbers = np.array([f"{rng.integers(10000, 99999)}-{rng.integers(10, 99)}" for _ in range(distinct_items)], dtype=object)
+    unit_prices = np.round(rng.lognormal(mean=4, sigma=1.2, size=distinct_items), 2)
+
+    canonical_suppliers = sorted(set(SUPPLIER_ALIASES.values()))
+    supplier_names = np.array(supplier_variants(canonical_suppliers, rng, suppliers), dtype=object)
+    item_suppliers = rng.integers(0, len(supplier_names), distinct_items)
+
+    # Step 2: Line items, with popular items ordered more often
+    # Zipf's law over popularity ranks, shuffled so popularity is not tied to vocabulary order
+    popularity = 1.0 / np.arange(1, distinct_items + 1) ** POPULARITY_EXPONENT
+    rng.shuffle(popularity)
+    item_ids = rng.choice(distinct_items, rows, p=popularity / popularity.sum())
+    quantities = rng.integers(1, 10, rows)
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(rng.integers(0, date_span_days, rows), unit='D')
+
+    data = pd.DataFrame({
+        'item name': items[item_ids],
+        'supplier': supplier_names[item_suppliers[item_ids]],
+        'catalog number': catalog_numbers[item_ids],
+        'quantity': quantities,
+        'cost': [f"${value:,.2f}" for value in unit_prices[item_ids] * quantities],
+        'expiration date': dates,
+        'fund_number': rng.integers(1, 8, rows),
+        'requester': [f"{requester} - {project}" for requester, project in zip(
+            rng.choice(REQUESTERS, rows), rng.choice(PROJECTS, rows))],
+    })
+
+    bounds = np.linspace(0, rows, sheets + 1).astype(int)
+    return {
+        f"Sheet{index + 1}": data.iloc[bounds[index]:bounds[index + 1]].reset_index(drop=True)
+        for index in range(sheets)
+    }
+
+
+def generate_grants(count, allowed_items_per_grant=3, unrestricted_share=0.2, seed=0):
+    """Grant table in the grants.csv layout; some grants have no Allowed Items (they accept anything)."""
+    rng = np.random.default_rng(seed)
+    category_keywords = [keyword for keywords in CATEGORIES.values() for keyword in keywords]
+    rows = []
+    for index in range(count):
+        total = float(round(rng.uniform(20000, 500000), 2))
+        if rng.random() < unrestricted_share:
+            allowed = []
+        else:
+            allowed = [f"{rng.choice(REQUESTERS)} - {rng.choice(PROJECTS)}" for _ in range(allowed_items_per_grant - 1)]
+            allowed.append(str(rng.choice(category_keywords)))
+        rows.append({
+            'Grant ID': f"G{index:04d}",
+            'Grant Name': f"Grant {index:04d}",
+            'Total Balance': total,
+            'Allowed Items': allowed,
+            'Allocated Costs': 0.0,
+            'Net Amount': total,
+        })
+    return pd.DataFrame(rows)
+
+
+def write_inventory(excel_data, file_path):
+    """Write generated sheets as .xlsx (one sheet each), or the first sheet as .csv/.parquet."""
+    if file_path.endswith('.xlsx'):
+        with pd.ExcelWriter(file_path) as writer:
+            for sheet_name, sheet_data in excel_data.items():
+                sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
+    else:
+        combined = pd.concat(excel_data.values(), ignore_index=True)
+        if file_path.endswith('.parquet'):
+            combined.to_parquet(file_path, index=False)
+        else:
+            combined.to_csv(file_path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic inventory or grant data.")
+    parser.add_argument("output", help="Output file (.xlsx, .csv or .parquet; grant tables are .csv)")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--sheets", type=int, default=1)
+    parser.add_argument("--suppliers", type=int, default=30)
+    parser.add_argument("--days", type=int, default=730, help="Spread of the expiration dates")
+    parser.add_argument("--grants", type=int, help="Write a grant table with this many grants instead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.grants:
+        generate_grants(args.grants, seed=args.seed).to_csv(args.output, index=False)
+        print(f"Wrote {args.grants} grants to {args.output}")
+    else:
+        excel_data = generate_inventory(args.rows, args.sheets, args.suppliers, date_span_days=args.days, seed=args.seed)
+        write_inventory(excel_data, args.output)
+        print(f"Wrote {args.rows} rows in {args.sheets} sheets to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
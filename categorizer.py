@@ -0,0 +1,458 @@
+"""
+Rule set used to categorize inventory line items by name and supplier.
+Shared by ExcelHandler and the background ingestion of saved files.
+"""
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from supplier_resolver import default_resolver, normalize_supplier, rules_version as supplier_rules_version
+
+logger = logging.getLogger(__name__)
+
+# Extended categories with keywords
+CATEGORIES = {
+    'Media': [
+        # General media
+        'media', 'PBS', 'cell-culture', 'cell culture media', 'DMEM', 'RPMI', 'EMEM', 
+        'McCoy', 'IMDM', 'F-12', 'Ham\'s F-12', 'MEM', 'AMEM', 'α-MEM', 'Basal Medium Eagle',
+        'L-15', 'Leibovitz\'s L-15', 'Hank\'s Balanced Salt Solution', 'HBSS', 'Eagle\'s Medium', 
+        'Williams\' Medium E', 'Coon\'s Modified Ham\'s F-12', 'serum-free medium', 
+        'low-glucose medium', 'high-glucose medium', 'DMEM/F-12', 'RPMI-1640', 'keratinocyte medium',
+
+        # Neutralizers and derivatives
+        'trypsin', 'trypsin-EDTA', 'trypsin neutralizer', 'TrypLE', 'trypsin substitute', 
+        'neutralizing solution', 'EDTA', 'collagenase', 'dispase', 'accutase', 
+        'cell dissociation solution', 'cell detachment solution', 'trypsin inhibitor',
+
+        # Supplements and additives
+        'glutamine', 'L-glutamine', 'sodium pyruvate', 'non-essential amino acids', 
+        'NEAA', 'FBS', 'fetal bovine serum', 'bovine serum', 'horse serum', 'cell culture grade water',
+        'water for injection', 'sterile water', 'distilled water', 'di water', 'ultrapure water',
+
+        # Specialized media
+        'neural stem cell medium', 'mesenchymal stem cell medium', 'embryonic stem cell medium',
+        'organoid culture media', 'hepatocyte media', 'airway epithelial cell media',
+        'fibroblast growth medium', 'skeletal muscle cell media', 'chondrocyte media', 
+        'endothelial growth medium', 'epithelial cell growth medium', 'keratinocyte serum-free medium',
+
+        # Growth additives
+        'growth factor supplement', 'b27 supplement', 'N2 supplement', 'bfgf', 'EGF', 'insulin', 
+        'transferrin', 'selenium', 'hydrocortisone', 'dexamethasone', 'ascorbic acid', 'retinoic acid'
+    ],
+    'W/S/N Blots': [
+        'blot', 'western', 'southern', 'northern', 'gel', 'membrane', 'buffer', 'stain', 'substrate', 
+        'PAGE', 'SDS-PAGE', 'acrylamide', 'electrophoresis', 'ladder', 'marker', 'staining', 'mounting',
+        'HRP', 'chemiluminescent', 'chemiluminescence', 'fluorescent dye', 'immunoblot', 'immunoblotting', 
+        'transfer buffer', 'running buffer', 'blotting buffer', 'wash buffer', 'blocking buffer',
+        'PVDF', 'nitrocellulose', 'immobilon', 'BCA', 'Coomassie', 'silver stain', 'Ponceau', 
+        'NuPAGE', 'Bis-Tris', 'Tris-Glycine', 'MES buffer', 'MOPS buffer', 'transfer membrane',
+        'gel loading dye', 'protein ladder', 'DNA ladder', 'protein stain', 'anti-HRP', 'fluorescent marker',
+        'secondary detection', 'imaging substrate', 'ECL', 'enhanced chemiluminescence',
+        'polyacrylamide gel', 'Western substrate', 'Coomassie blue', 'chromogenic substrate',
+        'hybridization buffer', 'washing reagent', 'autoradiography', 'electroblotting', 'LDS Sample Buf', 'TBS w TWEEN TBST'
+    ],
+    'Antibodies': [
+        'antibody', 'antibodies', 'mAb', 'IgG', 'phospho', 'phospho-', 
+        'rabbit', 'mouse', 'goat', 'anti-', 'affinipure', 'monoclonal',
+        'secondary antibody', 'primary antibody', 'HRP-conjugated',
+        'Alexa Fluor', 'AF488', 'AF568', 'AF594', 'FITC', 'APC',
+        'Cy3', 'Cy5', 'Dylight', 'fluorescent antibody', 'polyclonal', 
+        'isotype control', 'conjugated antibody', 'biotinylated antibody', 
+        'peroxidase', 'HRP', 'AP (alkaline phosphatase)', 'ELISA antibody',
+        'immunoblot antibody', 'immunohistochemistry', 'IHC', 'ICC', 
+        'immunofluorescence', 'flow cytometry', 'western blot',
+
+        ## specific antibodies
+        'Hu Vimentin PE'
+    ],
+    'Flasks, Tips, etc.': [
+        'flask', 'flasks', 'Erlenmeyer flask', 'Erlenmeyer flasks', 'Conical flask', 'Conical flasks','well', 'wells',
+        'Cell culture flask', 'Cell culture flasks', 'Round-bottom flask', 'Round-bottom flasks',
+        'Volumetric flask', 'Volumetric flasks', 'Vacuum flask', 'Vacuum flasks', 'Filtering flask', 'Filtering flasks',
+        'tip', 'tips', 'pipet', 'pipets', 'pipette', 'pipettes', 'pipette tip', 'pipette tips',
+        'filter tip', 'filter tips', 'gel-loading tip', 'gel-loading tips', 'multi-channel tip', 'multi-channel tips',
+        'serological pipette', 'serological pipettes', 'manual pipette', 'manual pipettes', 'automatic pipette',
+        'automatic pipettes', 'multichannel pipette', 'multichannel pipettes', 'micropipette', 'micropipettes',
+        'repeater pipette', 'repeater pipettes', 'transfer pipette', 'transfer pipettes', 'glass pipette', 'glass pipettes',
+        'tube', 'tubes', 'centrifuge tube', 'centrifuge tubes', 'cryogenic tube', 'cryogenic tubes', 'chambers',
+        'microcentrifuge tube', 'microcentrifuge tubes', 'PCR tube', 'PCR tubes', 'glass tube', 'glass tubes',
+        'Falcon tube', 'Falcon tubes', 'Eppendorf tube', 'Eppendorf tubes', 'test tube', 'test tubes',
+        'storage tube', 'storage tubes', 'plts' ,'plate', 'plates', 'cell culture plate', 'cell culture plates',
+        'microplate', 'microplates', 'petri plate', 'petri plates', 'ELISA plate', 'ELISA plates',
+        'PCR plate', 'PCR plates', 'multi-well plate', 'multi-well plates', 'sealing plate', 'sealing plates',
+        'box', 'boxes', 'storage box', 'storage boxes', 'cryogenic box', 'cryogenic boxes', 'freezer box', 'freezer boxes',
+        'microtube box', 'microtube boxes', 'tip box', 'tip boxes', 'tube rack', 'tube racks',
+        'autoclave-safe box', 'autoclave-safe boxes', 'syringe', 'syringes', 'disposable syringe', 'disposable syringes',
+        'glass syringe', 'glass syringes', 'luer-lock syringe', 'luer-lock syringes', 'syringe filter', 'syringe filters',
+        'insulin syringe', 'insulin syringes', 'rack', 'racks', 'holder', 'holders', 'pipette rack', 'pipette racks',
+        'pipet rack', 'pipet racks', 'plate rack', 'plate racks', 'tube rack', 'tube racks', 'freezer rack', 'freezer racks',
+        'test tube rack', 'test tube racks', 'cryovial', 'cryovials', 'cryobox', 'cryoboxes', '384', 'allprotect tissue reagent',
+        'coutness', 'cryoelite', 'FBM', 'VWR BASIN'
+        'nitrogen storage rack', 'sterile container', 'sterile containers', 'sample vial', 'sample vials',
+        'funnel', 'funnels', 'glass slide', 'glass slides', 'coverslip', 'coverslips', 'weigh boat', 'weigh boats',
+        'measuring cylinder', 'measuring cylinders', 'spray bottle', 'spray bottles', 'lab tray', 'lab trays', 'T.I.P.S.',
+        'drip tray', 'drip trays', 'cell strainer', 'cell strainers', 'reservoir tray', 'reservoir trays', 'beaker', 'beakers', 'gloves', 'glove'
+    ],
+    'Assays': [
+        'assay', 'CyQUANT', 'DNeasy', 'Glo', 'immuno', 'ChIP', 'EdU', 'FITC', 'flow cytometry', 'mycoplasma', 'purelink hipure'
+    ],
+    'Mouse Work': [
+        'mouse', 'animal', 'rack', 'cage', 'rodent', 'bedding', 'scale', 'feeding', 'syringe for mouse', 
+        'mouse holder', 'animal cage'
+    ],
+    'Biological': [
+        # Existing items
+        'Lipofectamine', 'KAPA', 'concentrator', 'concentrators', 'goat serum', 'serum', 
+        'primers', 'primer', 'plasmid', 'glycerol stock', 'gBlock', 'lentivirus', 'Cas9', 'virus'
+
+        # Enzymes and enzyme-related terms
+        'enzyme', 'restriction enzyme', 'ligase', 'polymerase', 'reverse transcriptase',
+        'DNA ligase', 'RNA polymerase', 'nuclease', 'endonuclease', 'exonuclease', 
+        'DNA polymerase', 'RNase', 'RNase inhibitor', 'phosphatase', 'kinase', 
+        'T4 ligase', 'Taq polymerase', 'Q5 polymerase', 'EcoRI', 'BamHI', 'NotI', 'HindIII',
+        'restriction digestion', 'digestion enzyme', 'proteinase K', 'Klenow fragment',
+        'DNase', 'DNAse I', 'methylase', 'NEBuilder', 'HiFi DNA Assembly', 'nickase',
+
+        # NEB-specific items
+        'NEB', 'New England Biolabs', 'NEBuilder HiFi', 'Q5 Master Mix', 'Quick CIP',
+        'NEB ligase', 'NEB polymerase', 'NEB restriction enzyme', 'NEB buffer',
+        'NEBuffer', 'NEB T4 DNA Ligase', 'NEB Taq', 'NEB EcoRI', 'NEB digestion kit',
+        'NEB Phusion', 'NEB LunaScript', 'NEBNext', 'NEB methylase', 'NEB exonuclease',
+
+        # Biological reagents and kits
+        'competent cells', 'cloning kit', 'transfection reagent', 'DNA assembly',
+        'electroporation reagent', 'viral vector', 'cDNA synthesis kit', 'PCR kit',
+        'RT-PCR kit', 'NGS prep kit', 'plasmid purification', 'protein ladder', 'SuperScript', 'RNeasy',
+        'marker', 'DNA ladder', 'RNA ladder', 'molecular weight marker', 'agarose', 'LB', 'agar',
+
+        # Proteins and protein-related reagents
+        'protein expression', 'protein purification', 'proteinase', 'protease', 
+        'protein A', 'protein G', 'protein marker', 'protein standard', 'recombinant protein',
+
+        # Cell culture additives and growth reagents
+        'cell culture reagent', 'cell growth reagent', 'supplement', 'cell recovery medium',
+        'freezing medium', 'cryopreservation', 'transfection reagent', 'nucleofection reagent',
+
+        #Biologic Dyes
+        'Phalloidin', 'ANNEXIN V', 'ANNEXIN', 'HOECHST', 'vimentin live cell dye', 
+        'prolong diamond antifade mountant with dapi', 'dapi',
+
+        #Ladders
+        'GENERULER', 'master mix',
+
+        # Miscellaneous biological terms
+        'oligonucleotide', 'oligo', 'siRNA', 'shRNA', 'gRNA', 'sgRNA', 'RNAi', 'DNA template', 
+        'RNA template', 'expression plasmid', 'vector', 'CRISPR', 'CRISPR-Cas9', 'cloning vector',
+        'glycerol', 'competent cell', 'E.coli', 'BL21', 'DH5α', 'expression host', 'assembly mix', 'sequence',
+        'provirus', 'glucose', 'depc-treated'
+
+
+    ],
+    'Drugs': [
+        #Generic drugs
+        'drug', 'compound', 'chemical', 'inhibitor', 'small molecule', 'antibiotic', 'penicillin', 'amoxicillin', 'ciprofloxacin', 'azithromycin', 'cephalexin', 
+        'clindamycin', 'metronidazole', 'ampicillin', 'kanamycin', 'streptomycin', 'gentamicin', 'tetracycline', 'chloramphenicol', 
+        'penicillin', 'carbenicillin', 'antibiotic', 'small molecule', 'compound', 'chemical', 'inhibitor', 'aspirin', 'ibuprofen', 
+        'paracetamol', 'acetaminophen', 'statins', 'antiviral', 'aphidicolin', 'benzo(a)pyrene', 'doxycycline hyclate',
+
+        #Antibiotics
+        'penicillin', 'streptomycin', 'ampicillin', 'kanamycin', 'tetracycline', 
+        'chloramphenicol', 'cephalosporin', 'erythromycin', 'rifampin', 'vancomycin', 
+        'gentamicin', 'ciprofloxacin', 'levofloxacin', 'azithromycin'
+
+        # Chemotherapy Drugs
+        'cisplatin', 'carboplatin', 'oxaliplatin', 'paclitaxel', 'docetaxel', 
+        'doxorubicin', 'epirubicin', 'cyclophosphamide', 'ifosfamide', 
+        'etoposide', 'irinotecan', 'topotecan', 'gemcitabine', 'vincristine', 
+        'vinblastine', 'vinorelbine', 'bleomycin', 'mitomycin', '5-fluorouracil', 
+        'capecitabine', 'methotrexate', 'pemetrexed', 'temozolomide', 'dacarbazine', 
+        'mechlorethamine', 'melphalan', 'busulfan', 'fludarabine', 'cladribine', 'OLAPARIB'],
+
+    'Chemical': [
+        'buffer', 'DMSO', 'ethanol', 'TCEP', 'methanol', 'glutaraldehyde', 
+        'SDS', 'Tris', 'HEPES', 'NaCl', 'TBE', 'formaldehyde', 'molecular biology', 'molecular'
+        'ammonia', 'glycine', 'crystal violet', 'ethyl cinnamate', 'iodonitrotetrazolium', 'Tetrakis(2-hydroxypropyl)',
+        'poly(ethylene glycol)', 'poly-l-lysine', 'protamine sulfate grade x', 'sulfo-smcc', 'tert-butanol'
+    ],
+    'Services (sequencing)': ['sequencing', 'service', 'genomics', 'WGS', 'long-read', 'sequencing service'],
+    'Services (one-time)': ['repair', 'installation', 'quote', 'service fee', 'one-time service', 'BSC'],
+    'Services (recurrent)': ['LN2', 'nitrogen', 'maintenance', 'subscription', 'recurring service', 'FY'],
+    'Office Supplies': ['ink cartridge', 'printer', 'stationery', 'WB Mason', 'pen', 'VWR Tape']
+
+    }
+
+# Original suppliers mapped to categories
+DRUG_SUPPLIERS = ['MedChemExpress', 'SelleckChem', 'ApexBio']
+ENZYME_SUPPLIERS = ['New England Biolabs', 'NEB']
+PLASMID_SUPPLIERS = ['Addgene', 'addgene']
+ANTIBODY_SUPPLIERS = ['Cell Signaling Technology']
+OFFICE_SUPPLIES_SUPPLIERS = ['WB Mason']
+MOUSE_SUPPLIERS = ['SoftMouse.NET','ISEEHEAR INC']
+BIOLOGICAL_SUPPLIERS = ['Integrated DNA Technologies', 'VectorBuilder'] 
+
+# Specific Category Matching (checked after the general keywords)
+SPECIFIC_CATEGORY_KEYWORDS = {
+    'Antibodies': ['mouse antibody', 'rabbit antibody', 'goat antibody'],
+    'Mouse Work': ['mouse cage', 'mouse bedding', 'animal cage']
+}
+
+# Compiled rule set: keywords lowercased once at import instead of on every comparison
+COMPILED_CATEGORY_KEYWORDS = [
+    (category, tuple(keyword.lower() for keyword in keywords)) for category, keywords in CATEGORIES.items()
+]
+COMPILED_SPECIFIC_KEYWORDS = [
+    (category, tuple(keyword.lower() for keyword in keywords)) for category, keywords in SPECIFIC_CATEGORY_KEYWORDS.items()
+]
+
+CATEGORIZE_CHUNK_SIZE = 5000  # Distinct items per worker task
+PARALLEL_CATEGORIZE_THRESHOLD = 20000  # Distinct items to classify before worker processes are used
+
+
+def assign_category(name, supplier):
+    """Assign a category based on an item's name and supplier."""
+    return assign_category_normalized(name, normalize_supplier(supplier))
+
+
+def assign_category_normalized(name, normalized_supplier):
+    """Assign a category to an item whose supplier is already normalized."""
+    return explain_category(name, normalized_supplier)[0]
+
+
+# Provenance labels: which kind of rule decided the category
+RULE_PRIORITY_KEYWORD = 'priority keyword'
+RULE_SUPPLIER = 'supplier'
+RULE_CATEGORY_KEYWORD = 'category keyword'
+RULE_SPECIFIC_KEYWORD = 'specific keyword'
+RULE_DEFAULT = 'no match'
+
+# Suppliers mapped to categories, in the order they are checked
+SUPPLIER_RULES = [
+    (DRUG_SUPPLIERS, 'Drugs'),
+    (ENZYME_SUPPLIERS, 'Biological'),
+    (PLASMID_SUPPLIERS, 'Biological'),
+    (ANTIBODY_SUPPLIERS, 'Antibodies'),
+    (OFFICE_SUPPLIES_SUPPLIERS, 'Office Supplies'),
+    (["MedChemExpress", "ApexBio", "SelleckChem"], 'Drugs'),
+    (BIOLOGICAL_SUPPLIERS, 'Biological'),
+    (MOUSE_SUPPLIERS, 'Mouse Work'),
+]
+
+
+def _first_keyword(name_lower, compiled_keywords):
+    for category, keywords in compiled_keywords:
+        for keyword in keywords:
+            if keyword in name_lower:
+                return category, keyword
+    return None, None
+
+
+def explain_category(name, normalized_supplier):
+    """
+    Return (category, rule, matched term) for an item whose supplier is already normalized,
+    e.g. ('Antibodies', 'category keyword', 'anti-').
+    """
+    name_lower = str(name).lower().strip()
+
+    # Check if 'cisplatin' is in the name (prioritized)
+    if "cisplatin" in name_lower:
+        return "Drugs", RULE_PRIORITY_KEYWORD, "cisplatin"  # Prioritize 'cisplatin'
+
+    # Prioritized keyword matching
+    if "gel ink pen" in name_lower:
+        return "Office Supplies", RULE_PRIORITY_KEYWORD, "gel ink pen"  # Prioritize gel ink pens
+    elif "pen" in name_lower and "gel" in name_lower:
+        return "Office Supplies", RULE_PRIORITY_KEYWORD, "pen + gel"
+    elif "western blot" in name_lower:
+        return "W/S/N Blots", RULE_PRIORITY_KEYWORD, "western blot"  # Secondary priority for western blot gels
+    elif "gel" in name_lower and "blot" in name_lower:
+        return "W/S/N Blots", RULE_PRIORITY_KEYWORD, "gel + blot"
+    elif "gel" in name_lower:
+        # Additional logic for generic gels if needed
+        return "W/S/N Blots", RULE_PRIORITY_KEYWORD, "gel"  # Default to blot gels
+
+    # Check supplier-based categorization
+    for suppliers, category in SUPPLIER_RULES:
+        if normalized_supplier in suppliers:
+            return category, RULE_SUPPLIER, normalized_supplier
+
+    # Check name-based categorization
+    category, keyword = _first_keyword(name_lower, COMPILED_CATEGORY_KEYWORDS)
+    if category is not None:
+        return category, RULE_CATEGORY_KEYWORD, keyword
+
+    # Specific Category Matching (only reached when no general keyword matched)
+    category, keyword = _first_keyword(name_lower, COMPILED_SPECIFIC_KEYWORDS)
+    if category is not None:
+        return category, RULE_SPECIFIC_KEYWORD, keyword
+
+    return 'Others', RULE_DEFAULT, ""
+
+
+# Keywords used to find the column containing item names
+NAME_COLUMN_KEYWORDS = ["name", "item", "product", "details", "description"]
+
+
+def find_name_column(columns):
+    """Find the most likely column containing item names."""
+    for col in columns:
+        if any(keyword in str(col).lower() for keyword in NAME_COLUMN_KEYWORDS):
+            return col
+    return None
+
+
+def rules_version():
+    """
+    Fingerprint of the rule set: this module's source (keyword lists and matching logic)
+    plus the supplier normalization rules. Memos built with other rules are discarded.
+    """
+    with open(__file__, "rb") as f:
+        source = f.read()
+    return hashlib.sha1(source + supplier_rules_version().encode("utf-8")).hexdigest()
+
+
+def memo_key(name_key, supplier):
+    return f"{name_key}\x1f{supplier or ''}"
+
+
+class CategoryMemo:
+    """Persistent {(item name, supplier): (category, rule, matched term)} memo, kept between sessions."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.categories = {}
+        self.dirty = False
+        if path:
+            self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                memo = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Error reading the category memo: %s", e)
+            return
+        if memo.get('rules_version') == rules_version():
+            self.categories = memo.get('categories', {})
+        else:
+            logger.debug("Categorization rules changed, discarding the category memo")
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({'rules_version': rules_version(), 'categories': self.categories}, f)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning("Error writing the category memo: %s", e)
+
+    def get(self, name_key, supplier):
+        explanation = self.categories.get(memo_key(name_key, supplier))
+        return tuple(explanation) if explanation is not None else None
+
+    def put(self, name_key, supplier, explanation):
+        self.categories[memo_key(name_key, supplier)] = list(explanation)
+        self.dirty = True
+
+
+def classify_pairs(pairs):
+    """Explain the category of a list of (lowercased item name, normalized supplier) pairs."""
+    return [explain_category(name_key, supplier) for name_key, supplier in pairs]
+
+
+def classify_pairs_chunked(pairs, max_workers=None, progress_callback=None):
+    """
+    Categorize pairs in chunks, across worker processes when there are at least
+    PARALLEL_CATEGORIZE_THRESHOLD of them. Every chunk goes through classify_pairs, so the
+    results are the same as in serial mode. progress_callback(done, total) is called from
+    this thread after each chunk.
+    """
+    chunks = [pairs[start:start + CATEGORIZE_CHUNK_SIZE] for start in range(0, len(pairs), CATEGORIZE_CHUNK_SIZE)]
+    results = [None] * len(chunks)
+    done = 0
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(pairs) >= PARALLEL_CATEGORIZE_THRESHOLD and workers > 1:
+        logger.debug("Categorizing %d distinct items in %d chunks across processes", len(pairs), len(chunks))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(classify_pairs, chunk): index for index, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                done += len(chunks[index])
+                if progress_callback is not None:
+                    progress_callback(done, len(pairs))
+    else:
+        for index, chunk in enumerate(chunks):
+            results[index] = classify_pairs(chunk)
+            done += len(chunk)
+            if progress_callback is not None:
+                progress_callback(done, len(pairs))
+
+    return [category for chunk_results in results for category in chunk_results]
+
+
+def categorize_rows(sheet_data, name_column, resolver=None, memo=None, max_workers=None, progress_callback=None):
+    """Return the category of every row of a sheet."""
+    return explain_rows(sheet_data, name_column, resolver, memo, max_workers, progress_callback)['category']
+
+
+def explain_rows(sheet_data, name_column, resolver=None, memo=None, max_workers=None, progress_callback=None):
+    """
+    Return a DataFrame with the category, rule and matched term of every row of a sheet.
+    Rows repeat the same few products, so the (name, supplier) pairs are factorized, only
+    the distinct pairs not already in the memo are classified, and the results are
+    broadcast back to the rows.
+    """
+    resolver = resolver or default_resolver
+
+    # Step 1: Factorize the item names (case and surrounding spaces do not matter to the rules)
+    name_codes, name_values = pd.factorize(sheet_data[name_column])
+    name_keys = [str(value).lower().strip() for value in name_values] + ['nan']  # Last entry for missing names
+    name_codes = np.where(name_codes < 0, len(name_keys) - 1, name_codes)
+    key_codes, name_keys = pd.factorize(np.array(name_keys, dtype=object))
+    name_codes = key_codes[name_codes]
+
+    # Step 2: Factorize the normalized suppliers
+    if 'supplier' in sheet_data.columns:
+        supplier_codes, supplier_values = pd.factorize(resolver.resolve_series(sheet_data['supplier']))
+        supplier_keys = list(supplier_values) + [None]  # Last entry for missing suppliers
+        supplier_codes = np.where(supplier_codes < 0, len(supplier_keys) - 1, supplier_codes)
+    else:
+        supplier_keys = [None]
+        supplier_codes = np.zeros(len(sheet_data), dtype=np.intp)
+
+    # Step 3: Distinct (name, supplier) pairs
+    pair_codes, pair_values = pd.factorize(name_codes * len(supplier_keys) + supplier_codes)
+    pairs = [
+        (name_keys[pair // len(supplier_keys)], supplier_keys[pair % len(supplier_keys)])
+        for pair in pair_values
+    ]
+
+    # Step 4: Classify the pairs the memo does not know yet
+    explanations = [memo.get(*pair) if memo is not None else None for pair in pairs]
+    todo = [i for i, explanation in enumerate(explanations) if explanation is None]
+    new_explanations = classify_pairs_chunked([pairs[i] for i in todo], max_workers, progress_callback)
+    for i, explanation in zip(todo, new_explanations):
+        explanations[i] = explanation
+        if memo is not None:
+            memo.put(*pairs[i], explanation)
+    logger.debug("Categorized %d rows: %d distinct items, %d newly classified", len(sheet_data), len(pairs), len(todo))
+
+    # Step 5: Broadcast back to the rows
+    columns = ['category', 'rule', 'matched_term']
+    result = pd.DataFrame(index=sheet_data.index)
+    for position, column in enumerate(columns):
+        values = np.array([explanation[position] for explanation in explanations], dtype=object)
+        result[column] = values[pair_codes]
+    return result
@@ -0,0 +1,111 @@
+"""
+Chart-ready aggregates of a sheet and downsampling of long series.
+
+A chart never needs more points than its axes are wide, so long series are reduced to the
+minimum and maximum of each pixel-wide bucket (which keeps every spike visible), and the
+cost breakdowns are aggregated once per chart instead of drawing every row.
+"""
+import numpy as np
+import pandas as pd
+
+from data_loader import clean_cost_series, DATE_KEYWORDS
+
+MAX_BAR_CATEGORIES = 25  # Smaller categories are summed into one 'Other' bar
+OTHER_LABEL = 'Other'
+
+
+def downsample_minmax(x, y, buckets):
+    """
+    Reduce a series sorted by x to at most 2 * `buckets` points: the minimum and maximum y of
+    each bucket of consecutive points, in their original order. NaN y values are dropped.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    if buckets <= 0 or len(y) <= 2 * buckets:
+        return x, y
+
+    # Equal-sized buckets as the rows of a matrix; the padding never wins a min or max
+    bucket_size = -(-len(y) // buckets)
+    bucket_count = -(-len(y) // bucket_size)
+    padding = bucket_size * bucket_count - len(y)
+    offsets = np.arange(bucket_count) * bucket_size
+    minimum = np.append(y, np.full(padding, np.inf)).reshape(bucket_count, bucket_size).argmin(axis=1)
+    maximum = np.append(y, np.full(padding, -np.inf)).reshape(bucket_count, bucket_size).argmax(axis=1)
+    keep = np.unique(np.concatenate([offsets + minimum, offsets + maximum]))
+    return x[keep], y[keep]
+
+
+def find_date_column(columns):
+    """'expiration date' if present, otherwise the first column with 'date' in its name."""
+    if 'expiration date' in columns:
+        return 'expiration date'
+    for col in columns:
+        if any(keyword in str(col).lower() for keyword in DATE_KEYWORDS):
+            return col
+    return None
+
+
+def find_category_column(columns):
+    for col in ('category', 'Category'):
+        if col in columns:
+            return col
+    return None
+
+
+def numeric_values(series):
+    """A column as floats; cost-like text such as '$3.30' is cleaned first."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    return clean_cost_series(series)
+
+
+def cost_by_month(sheet_data, date_column):
+    """Total cost per calendar month (indexed by month start), including months without costs."""
+    dates = pd.to_datetime(sheet_data[date_column], errors='coerce')
+    costs = pd.Series(clean_cost_series(sheet_data['cost']).to_numpy(), index=dates)
+    costs = costs[costs.index.notna()]
+    if costs.empty:
+        return pd.Series(dtype=float)
+    return costs.sort_index().resample('MS').sum()
+
+
+def cost_by_group(sheet_data, group_column, limit=MAX_BAR_CATEGORIES):
+    """Total cost per value of a column, largest first, with the tail folded into 'Other'."""
+    costs = clean_cost_series(sheet_data['cost'])
+    groups = sheet_data[group_column].astype(object).where(sheet_data[group_column].notna(), "(blank)").astype(str)
+    totals = costs.groupby(groups.to_numpy(), sort=False).sum().sort_values(ascending=False)
+    return fold_small_groups(totals, limit)
+
+
+def fold_small_groups(totals, limit=MAX_BAR_CATEGORIES):
+    if len(totals) <= limit:
+        return totals
+    head = totals.iloc[:limit - 1]
+    return pd.concat([head, pd.Series({OTHER_LABEL: totals.iloc[limit - 1:].sum()})])
+
+
+def column_series(sheet_data, x_column, y_column):
+    """
+    Data for a column-vs-column chart. Returns (kind, x, y): a 'line' sorted by x when x is
+    numeric or a date, otherwise 'bar' with y summed per x value.
+    """
+    x_values = sheet_data[x_column]
+    y_values = numeric_values(sheet_data[y_column])
+
+    if pd.api.types.is_datetime64_any_dtype(x_values) or (
+        not pd.api.types.is_numeric_dtype(x_values) and x_column == find_date_column([x_column])
+    ):
+        x_values = pd.to_datetime(x_values, errors='coerce')
+        kind = 'date'
+    elif pd.api.types.is_numeric_dtype(x_values) and not pd.api.types.is_bool_dtype(x_values):
+        kind = 'line'
+    else:
+        labels = x_values.astype(object).where(x_values.notna(), "(blank)").astype(str)
+        totals = y_values.groupby(labels.to_numpy(), sort=False).sum().sort_values(ascending=False)
+        totals = fold_small_groups(totals)
+        return 'bar', totals.index.to_numpy(), totals.to_numpy()
+
+    frame = pd.DataFrame({'x': x_values.to_numpy(), 'y': y_values.to_numpy()}).dropna().sort_values('x', kind='stable')
+    return kind, frame['x'].to_numpy(), frame['y'].to_numpy()
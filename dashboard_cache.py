@@ -0,0 +1,173 @@
+"""
+Pre-aggregated sheet data for the cost dashboard.
+
+Each sheet is collapsed once into cells of (day, supplier, category) with their total cost
+and row count. Every dashboard query (any date range) then works on those cells with a
+boolean mask and a bincount, which takes milliseconds however many rows the sheet has.
+Aggregates are rebuilt only when a sheet is replaced or its columns change, or when the
+handler invalidates a sheet whose values it changed in place.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data_loader import clean_cost_series
+from chart_data import find_date_column, find_category_column, fold_small_groups, MAX_BAR_CATEGORIES
+from allocation_optimizer import grant_balances
+
+TOP_SUPPLIER_COUNT = 10
+UNDATED_DAY = np.iinfo(np.int64).min  # Day number of rows without a valid date
+BLANK_LABEL = "(blank)"
+
+logger = logging.getLogger(__name__)
+
+
+def find_supplier_column(columns):
+    if 'supplier' in columns:
+        return 'supplier'
+    for col in columns:
+        if 'supplier' in str(col).lower() or 'vendor' in str(col).lower():
+            return col
+    return None
+
+
+def _label_codes(sheet_data, column, resolver=None):
+    """(integer code per row, label per code) of a column; blanks get the '(blank)' label."""
+    if column is None:
+        return np.zeros(len(sheet_data), dtype=np.intp), np.array([BLANK_LABEL], dtype=object)
+    codes, uniques = pd.factorize(sheet_data[column])
+    labels = pd.Series(uniques, dtype=object)
+    if resolver is not None:
+        labels = resolver.resolve_series(labels)
+    labels = np.append(labels.where(labels.notna(), BLANK_LABEL).astype(str).to_numpy(dtype=object), BLANK_LABEL)
+    return np.where(codes < 0, len(labels) - 1, codes), labels
+
+
+class SheetAggregates:
+    def __init__(self, sheet_data, resolver=None):
+        """Collapse a sheet into (day, supplier, category) cells."""
+        columns = sheet_data.columns
+        costs = clean_cost_series(sheet_data['cost']) if 'cost' in columns else pd.Series(0.0, index=sheet_data.index)
+        date_column = find_date_column(columns)
+        if date_column is not None:
+            dates = pd.to_datetime(sheet_data[date_column], errors='coerce')
+        else:
+            dates = pd.Series(pd.NaT, index=sheet_data.index, dtype='datetime64[ns]')
+
+        # Step 1: Days as integers, so range filters are plain comparisons
+        days = dates.dt.normalize().to_numpy(dtype='datetime64[D]').astype(np.int64)
+        days[dates.isna().to_numpy()] = UNDATED_DAY
+
+        # Step 2: Sum the rows of every (day, supplier, category) cell, grouping integer codes
+        supplier_codes, supplier_labels = _label_codes(sheet_data, find_supplier_column(columns), resolver)
+        category_codes, category_labels = _label_codes(sheet_data, find_category_column(columns))
+        cells = pd.DataFrame({
+            'day': days,
+            'supplier': supplier_codes,
+            'category': category_codes,
+            'cost': costs.to_numpy(dtype=float),
+        })
+        cells = cells.groupby(['day', 'supplier', 'category'], sort=False).agg(
+            cost=('cost', 'sum'), rows=('cost', 'size')
+        ).reset_index()
+
+        # Step 3: Keep plain arrays with integer codes for the queries; resolved spellings may merge labels
+        self.day = cells['day'].to_numpy()
+        self.cost = cells['cost'].to_numpy(dtype=float)
+        self.rows = cells['rows'].to_numpy()
+        self.supplier_codes, self.suppliers = pd.factorize(supplier_labels[cells['supplier'].to_numpy()])
+        self.category_codes, self.categories = pd.factorize(category_labels[cells['category'].to_numpy()])
+        dated = self.day != UNDATED_DAY
+        dated_days = self.day[dated].astype('datetime64[D]')
+        self.month = np.full(len(self.day), -1)
+        self.month[dated] = dated_days.astype('datetime64[M]').astype(np.int64)
+        self.has_dates = bool(dated.any())
+
+    def date_span(self):
+        """(first day, last day) with a valid date, or None."""
+        if not self.has_dates:
+            return None
+        dated_days = self.day[self.day != UNDATED_DAY]
+        return pd.Timestamp(dated_days.min().astype('datetime64[D]')), pd.Timestamp(dated_days.max().astype('datetime64[D]'))
+
+    def mask(self, start=None, end=None):
+        """Cells within [start, end]. Undated cells only count when no range is given."""
+        if start is None and end is None:
+            return np.ones(len(self.day), dtype=bool)
+        mask = self.day != UNDATED_DAY
+        if start is not None:
+            mask &= self.day >= np.datetime64(pd.Timestamp(start).date(), 'D').astype(np.int64)
+        if end is not None:
+            mask &= self.day <= np.datetime64(pd.Timestamp(end).date(), 'D').astype(np.int64)
+        return mask
+
+    def totals(self, start=None, end=None):
+        """(total cost, row count) within the range."""
+        mask = self.mask(start, end)
+        return float(self.cost[mask].sum()), int(self.rows[mask].sum())
+
+    def spend_by_month(self, start=None, end=None):
+        """Cost per month (indexed by month start), including months without costs."""
+        mask = self.mask(start, end) & (self.month >= 0)
+        if not mask.any():
+            return pd.Series(dtype=float)
+        months = self.month[mask]
+        first = months.min()
+        totals = np.bincount(months - first, weights=self.cost[mask])
+        index = pd.DatetimeIndex(np.arange(first, first + len(totals)).astype('datetime64[M]').astype('datetime64[ns]'))
+        return pd.Series(totals, index=index)
+
+    def _breakdown(self, codes, labels, mask, limit):
+        totals = np.bincount(codes[mask], weights=self.cost[mask], minlength=len(labels))
+        series = pd.Series(totals, index=labels).sort_values(ascending=False)
+        return fold_small_groups(series[series != 0], limit)
+
+    def top_suppliers(self, start=None, end=None, limit=TOP_SUPPLIER_COUNT):
+        return self._breakdown(self.supplier_codes, self.suppliers, self.mask(start, end), limit + 1)
+
+    def category_breakdown(self, start=None, end=None):
+        return self._breakdown(self.category_codes, self.categories, self.mask(start, end), MAX_BAR_CATEGORIES)
+
+
+class AggregateCache:
+    def __init__(self, resolver=None):
+        self.resolver = resolver
+        self.entries = {}  # {sheet name: (fingerprint, SheetAggregates)}
+
+    @staticmethod
+    def fingerprint(sheet_data):
+        # Sheets are replaced by new frames when rows change; new columns (e.g. 'category') change the key too
+        return id(sheet_data), len(sheet_data), tuple(sheet_data.columns)
+
+    def get(self, sheet_name, sheet_data):
+        """The aggregates of a sheet, rebuilt only if the sheet changed since they were built."""
+        fingerprint = self.fingerprint(sheet_data)
+        entry = self.entries.get(sheet_name)
+        if entry is None or entry[0] != fingerprint:
+            entry = (fingerprint, SheetAggregates(sheet_data, self.resolver))
+            self.entries[sheet_name] = entry
+            logger.debug("Dashboard aggregates built for '%s': %d cells", sheet_name, len(entry[1].cost))
+        return entry[1]
+
+    def invalidate(self, sheet_data):
+        """Forget the aggregates of a sheet whose values were changed in place (e.g. re-categorized); the fingerprint cannot see that."""
+        for sheet_name in [name for name, entry in self.entries.items() if entry[0][0] == id(sheet_data)]:
+            del self.entries[sheet_name]
+
+    def refresh(self, sheet_dict):
+        """Build the aggregates of every sheet ahead of time and forget removed sheets."""
+        for sheet_name in [name for name in self.entries if name not in sheet_dict]:
+            del self.entries[sheet_name]
+        for sheet_name in sheet_dict:
+            if sheet_name in self.entries and getattr(sheet_dict, 'is_spilled', lambda name: False)(sheet_name):
+                continue  # A spilled sheet cannot have changed; do not read it back
+            self.get(sheet_name, sheet_dict[sheet_name])
+
+
+def grant_utilization(grant_data):
+    """Percent of each grant's Total Balance already allocated, by grant name."""
+    total = pd.to_numeric(grant_data['Total Balance'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    allocated = total - grant_balances(grant_data)
+    percent = np.where(total > 0, allocated / np.where(total > 0, total, 1) * 100, 0.0)
+    return pd.Series(percent.round(1), index=grant_data['Grant Name'].astype(str).to_numpy())
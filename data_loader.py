@@ -0,0 +1,509 @@
+import importlib.util
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from search_index import SEARCH_COLUMN_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# Columns with few distinct values that are repeated on every row
+CATEGORY_COLUMNS = ['supplier', 'category', 'fund_number', 'month', 'source_file']
+
+# Keywords used to recognize cost, date and quantity columns (column names are lowercase)
+COST_KEYWORDS = ['cost', 'price']
+DATE_KEYWORDS = ['date']
+QUANTITY_KEYWORDS = ['quantity', 'qty']
+
+
+def clean_cost_series(series):
+    """
+    Clean and convert a whole cost column to float64 in one vectorized pass.
+    Supports values like '$3.30', '3.30' and blanks (which become 0.0).
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64').fillna(0.0)
+
+    cleaned = series.astype(str).str.replace(r'[^\d.]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').fillna(0.0)
+
+
+# Columns the analyses use: name/description, supplier, cost, expiration date and fund number,
+# plus everything the search box looks in (e.g. catalog numbers)
+ANALYSIS_COLUMN_KEYWORDS = [
+    'name', 'description', 'item', 'product', 'details', 'supplier', 'cost', 'expiration date', 'fund_number'
+]
+ANALYSIS_COLUMN_KEYWORDS += [keyword for keyword in SEARCH_COLUMN_KEYWORDS if keyword not in ANALYSIS_COLUMN_KEYWORDS]
+
+# File types accepted on upload. CSV and Parquet files are loaded as a single sheet named after the file.
+EXCEL_EXTENSIONS = ('.xlsx',)
+CSV_EXTENSIONS = ('.csv', '.csv.gz')
+PARQUET_EXTENSIONS = ('.parquet',)
+DATA_FILE_EXTENSIONS = EXCEL_EXTENSIONS + CSV_EXTENSIONS + PARQUET_EXTENSIONS
+DATA_FILE_FILTER = "Data Files (*.xlsx *.csv *.csv.gz *.parquet);;Excel Files (*.xlsx);;CSV Files (*.csv *.csv.gz);;Parquet Files (*.parquet);;All Files (*)"
+
+# CSV files above this size are streamed in blocks instead of being parsed in one go
+CSV_CHUNK_THRESHOLD = 50 * 1024 ** 2
+CSV_BLOCK_SIZE = 16 * 1024 ** 2
+CSV_CHUNK_ROWS = 200_000
+
+# Workbook reader backends, fastest first. 'openpyxl' is the pandas default and always the last resort.
+READER_BACKENDS = ['calamine', 'openpyxl_streaming', 'openpyxl']
+
+
+def _pandas_supports_calamine():
+    """pandas added the 'calamine' engine in 2.2."""
+    major, minor = (int(part) for part in pd.__version__.split('.')[:2])
+    return (major, minor) >= (2, 2)
+
+
+def backend_available(backend):
+    """Check whether a reader backend can be used in this environment."""
+    if backend == 'calamine':
+        return _pandas_supports_calamine() and importlib.util.find_spec('python_calamine') is not None
+    if backend in ('openpyxl', 'openpyxl_streaming'):
+        return importlib.util.find_spec('openpyxl') is not None
+    return False
+
+
+def available_backends():
+    """Return the installed reader backends, fastest first."""
+    return [backend for backend in READER_BACKENDS if backend_available(backend)]
+
+
+def scan_workbook(file_path):
+    """
+    Read only the sheet names, header rows and row counts of a workbook, without parsing any data.
+    Returns {sheet_name: {'columns': [...], 'rows': int or None}}.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        scan = {}
+        for name in workbook.sheetnames:
+            worksheet = workbook[name]
+            header = next(worksheet.iter_rows(max_row=1, values_only=True), ())
+            columns = [str(value) for value in header if value is not None]
+            rows = worksheet.max_row - 1 if worksheet.max_row else None
+            scan[name] = {'columns': columns, 'rows': rows}
+    finally:
+        workbook.close()
+    return scan
+
+
+def suggest_columns(columns):
+    """Pick the columns the analyses actually use out of a header row."""
+    return [col for col in columns if any(keyword in str(col).lower() for keyword in ANALYSIS_COLUMN_KEYWORDS)]
+
+
+def make_usecols(columns):
+    """
+    Build a usecols callable that keeps the given columns (case-insensitive).
+    A callable works across sheets whose headers differ. Returns None to keep every column.
+    """
+    if not columns:
+        return None
+    wanted = {str(col).lower().strip() for col in columns}
+    return lambda col: str(col).lower().strip() in wanted
+
+
+def load_upload_profiles(profiles_path):
+    """Load saved upload profiles ({name: {'sheets': [...], 'columns': [...]}}) from a JSON file."""
+    if not os.path.exists(profiles_path):
+        return {}
+    try:
+        with open(profiles_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Error loading upload profiles: %s", e)
+        return {}
+
+
+def save_upload_profile(profiles_path, name, sheets, columns):
+    """Add or replace a named upload profile."""
+    profiles = load_upload_profiles(profiles_path)
+    profiles[name] = {'sheets': list(sheets), 'columns': list(columns)}
+    with open(profiles_path, 'w') as f:
+        json.dump(profiles, f, indent=2)
+
+
+def read_openpyxl_streaming(file_path, sheet_name=None, usecols=None):
+    """
+    Read a workbook with openpyxl's read-only (streaming) parser.
+    The first row of each sheet is used as the header. sheet_name may be a name, a list
+    of names or None for every sheet, and usecols a callable on column names, like pd.read_excel.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            names = workbook.sheetnames
+        elif isinstance(sheet_name, (list, tuple)):
+            names = list(sheet_name)
+        else:
+            names = [sheet_name]
+
+        sheets = {}
+        for name in names:
+            rows = workbook[name].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                sheets[name] = pd.DataFrame()
+                continue
+            columns = [f"Unnamed: {i}" if value is None else value for i, value in enumerate(header)]
+            keep = [i for i, col in enumerate(columns) if usecols is None or usecols(col)]
+            sheets[name] = pd.DataFrame(
+                [[row[i] if i < len(row) else None for i in keep] for row in rows],
+                columns=[columns[i] for i in keep]
+            )
+    finally:
+        workbook.close()
+
+    if sheet_name is None or isinstance(sheet_name, (list, tuple)):
+        return sheets
+    return sheets[sheet_name]
+
+
+def read_with_backend(file_path, backend, sheet_name=None, usecols=None):
+    """Read a workbook with one specific backend."""
+    if backend == 'openpyxl_streaming':
+        return read_openpyxl_streaming(file_path, sheet_name=sheet_name, usecols=usecols)
+    return pd.read_excel(file_path, sheet_name=sheet_name, engine=backend, usecols=usecols)
+
+
+def read_workbook(file_path, backend=None, sheet_name=None, usecols=None):
+    """
+    Read a workbook with the preferred backend, falling back to the next available one
+    when it is not installed. sheet_name and usecols are passed through as in pd.read_excel.
+    Returns (data, backend_used).
+    """
+    candidates = available_backends()
+    if backend in candidates:
+        candidates.remove(backend)
+        candidates.insert(0, backend)
+    elif backend is not None:
+        logger.warning("Reader backend '%s' is not installed, falling back to %s", backend, candidates[0] if candidates else 'openpyxl')
+
+    for candidate in candidates:
+        try:
+            return read_with_backend(file_path, candidate, sheet_name=sheet_name, usecols=usecols), candidate
+        except ImportError as e:
+            logger.warning("Reader backend '%s' failed to import: %s", candidate, e)
+
+    # Nothing detected as installed: let pandas raise its usual error
+    return pd.read_excel(file_path, sheet_name=sheet_name, usecols=usecols), 'openpyxl'
+
+
+def file_kind(file_path):
+    """Return 'excel', 'csv' or 'parquet' for a supported data file, otherwise None."""
+    lower = file_path.lower()
+    if lower.endswith(EXCEL_EXTENSIONS):
+        return 'excel'
+    if lower.endswith(CSV_EXTENSIONS):
+        return 'csv'
+    if lower.endswith(PARQUET_EXTENSIONS):
+        return 'parquet'
+    return None
+
+
+def is_data_file(file_path):
+    return file_kind(file_path) is not None
+
+
+def table_sheet_name(file_path):
+    """Sheet name used for a CSV/Parquet file: the file name without extensions, within Excel's 31 characters."""
+    name = os.path.basename(file_path)
+    for extension in CSV_EXTENSIONS + PARQUET_EXTENSIONS:
+        if name.lower().endswith(extension):
+            name = name[:-len(extension)]
+            break
+    return name[:31] or "Sheet1"
+
+
+def read_csv_file(file_path, usecols=None):
+    """
+    Read a CSV (optionally gzip-compressed) file.
+    With pyarrow installed, the file is parsed by the pyarrow CSV reader (large files block by
+    block) and unwanted columns are never converted; otherwise, or when pyarrow cannot convert
+    a column, pandas reads it (large files in chunks).
+    """
+    large = os.path.getsize(file_path) > CSV_CHUNK_THRESHOLD
+
+    if importlib.util.find_spec('pyarrow') is not None:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        convert_options = pa_csv.ConvertOptions()
+        if usecols is not None:
+            names = [str(col) for col in pd.read_csv(file_path, nrows=0).columns]
+            convert_options = pa_csv.ConvertOptions(include_columns=[name for name in names if usecols(name)])
+        if usecols is None or convert_options.include_columns:  # An empty include list would mean every column
+            try:
+                if not large:
+                    return pa_csv.read_csv(file_path, convert_options=convert_options).to_pandas()
+                reader = pa_csv.open_csv(
+                    file_path, read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE), convert_options=convert_options
+                )
+                return reader.read_all().to_pandas()
+            except pa.ArrowInvalid:
+                # pyarrow infers column types from the first block, so a later value of another
+                # type ('F-REST' in a numeric fund column, '$1,200.00' among plain costs) fails
+                pass
+
+    if not large:
+        return pd.read_csv(file_path, usecols=usecols)
+    chunks = pd.read_csv(file_path, usecols=usecols, chunksize=CSV_CHUNK_ROWS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_parquet_file(file_path, usecols=None):
+    """Read a Parquet file, loading only the wanted columns when pyarrow can list them up front."""
+    if usecols is not None and importlib.util.find_spec('pyarrow') is not None:
+        import pyarrow.parquet as pq
+
+        columns = [name for name in pq.read_schema(file_path).names if usecols(name)]
+        return pd.read_parquet(file_path, columns=columns)
+
+    data = pd.read_parquet(file_path)
+    if usecols is not None:
+        data = data[[col for col in data.columns if usecols(col)]]
+    return data
+
+
+def scan_data_file(file_path):
+    """Like scan_workbook, for any supported file type."""
+    kind = file_kind(file_path)
+    if kind == 'csv':
+        columns = [str(col) for col in pd.read_csv(file_path, nrows=0).columns]
+        return {table_sheet_name(file_path): {'columns': columns, 'rows': None}}
+    if kind == 'parquet':
+        if importlib.util.find_spec('pyarrow') is not None:
+            import pyarrow.parquet as pq
+
+            metadata = pq.ParquetFile(file_path).metadata
+            columns = pq.read_schema(file_path).names
+            return {table_sheet_name(file_path): {'columns': columns, 'rows': metadata.num_rows}}
+        data = pd.read_parquet(file_path)
+        return {table_sheet_name(file_path): {'columns': [str(col) for col in data.columns], 'rows': len(data)}}
+    return scan_workbook(file_path)
+
+
+def read_data_file(file_path, backend=None, sheet_name=None, usecols=None):
+    """
+    Read any supported file into {sheet_name: DataFrame}, so CSV and Parquet files flow
+    through the same downstream code as workbooks. Returns (data, reader_used).
+    """
+    kind = file_kind(file_path)
+    if kind == 'csv':
+        reader = 'pyarrow_csv' if importlib.util.find_spec('pyarrow') is not None else 'pandas_csv'
+        return {table_sheet_name(file_path): read_csv_file(file_path, usecols=usecols)}, reader
+    if kind == 'parquet':
+        return {table_sheet_name(file_path): read_parquet_file(file_path, usecols=usecols)}, 'parquet'
+
+    if sheet_name is not None and not isinstance(sheet_name, (list, tuple)):
+        sheet_name = [sheet_name]
+    return read_workbook(file_path, backend=backend, sheet_name=sheet_name, usecols=usecols)
+
+
+# Multi-file merges tag every row with the file it came from. CSV/Parquet files have no
+# sheet names of their own, so they are all combined into one sheet.
+SOURCE_FILE_COLUMN = 'source_file'
+MERGED_TABLE_SHEET = 'merged_data'
+
+
+def load_file_for_merge(file_path, backend=None, sheets=None, columns=None):
+    """
+    Parse one file of a multi-file merge into {sheet_name: DataFrame} with lowercase columns
+    and a source_file column. Kept at module level so it can run in a worker process.
+    """
+    kind = file_kind(file_path)
+    sheet_name = None
+    if kind == 'excel' and sheets is not None:
+        # Not every monthly workbook has every sheet
+        present = scan_workbook(file_path).keys()
+        sheet_name = [name for name in sheets if name in present]
+        if not sheet_name:
+            return {}
+
+    data, _ = read_data_file(file_path, backend=backend, sheet_name=sheet_name, usecols=make_usecols(columns))
+
+    source = os.path.basename(file_path)
+    loaded = {}
+    for name, frame in data.items():
+        if frame.empty:
+            continue
+        frame.columns = [str(col).lower() for col in frame.columns]
+        frame[SOURCE_FILE_COLUMN] = source
+        loaded[name if kind == 'excel' else MERGED_TABLE_SHEET] = frame
+    return loaded
+
+
+def merge_data_files(file_paths, backend=None, sheets=None, columns=None, dedupe_keys=None, max_workers=None):
+    """
+    Parse several files in a process pool and concatenate sheets with matching names.
+
+    Repeated line items are dropped by dedupe_keys (lowercase column names; the later file wins),
+    or by every column except source_file when no keys are given.
+    Returns ({sheet_name: DataFrame}, {sheet_name: duplicates_removed}).
+    """
+    if len(file_paths) > 1:
+        workers = max_workers or min(len(file_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(load_file_for_merge, file_path, backend, sheets, columns)
+                for file_path in file_paths
+            ]
+            # Collect in selection order so "later file wins" is predictable
+            loaded_files = [future.result() for future in futures]
+    else:
+        loaded_files = [load_file_for_merge(file_path, backend, sheets, columns) for file_path in file_paths]
+
+    frames_by_sheet = {}
+    for loaded in loaded_files:
+        for sheet_name, frame in loaded.items():
+            frames_by_sheet.setdefault(sheet_name, []).append(frame)
+
+    merged = {}
+    duplicates_removed = {}
+    for sheet_name, frames in frames_by_sheet.items():
+        combined = pd.concat(frames, ignore_index=True, sort=False)
+
+        if dedupe_keys:
+            subset = [key for key in dedupe_keys if key in combined.columns]
+        else:
+            subset = [col for col in combined.columns if col != SOURCE_FILE_COLUMN]
+
+        row_count = len(combined)
+        if subset:
+            combined = combined.drop_duplicates(subset=subset, keep='last').reset_index(drop=True)
+        merged[sheet_name] = combined
+        duplicates_removed[sheet_name] = row_count - len(combined)
+
+    return merged, duplicates_removed
+
+
+def _is_blank(series):
+    """Return a mask of missing or empty-string cells."""
+    return series.isna() | (series.astype(str).str.strip() == '')
+
+
+def _matches(column_name, keywords):
+    return any(keyword in column_name for keyword in keywords)
+
+
+def _convert_cost(series):
+    """Convert a cost column to float64, or return None if values would be lost."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+
+    blank = _is_blank(series)
+    cleaned = series.astype(str).str.replace(r'[^\d.]', '', regex=True)
+    converted = pd.to_numeric(cleaned.where(~blank), errors='coerce')
+    if (converted.isna() & ~blank).any():
+        return None
+    return converted.astype('float64')
+
+
+def _convert_date(series):
+    """Convert a date column to datetime64, or return None if values would be lost."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    blank = _is_blank(series)
+    converted = pd.to_datetime(series.where(~blank), errors='coerce')
+    if (converted.isna() & ~blank).any():
+        return None
+    return converted
+
+
+def _convert_category(series):
+    """Convert a low-cardinality column to 'category', storing values as text."""
+    # Whole-number floats (e.g. fund numbers read as 1234.0) are stored as '1234'
+    if pd.api.types.is_float_dtype(series) and ((series.dropna() % 1) == 0).all():
+        series = series.astype('Int64')
+    text = series.astype(str).where(series.notna(), '')
+    return text.astype('category')
+
+
+def _convert_quantity(series):
+    """Convert a quantity column to a nullable integer, or return None if values would be lost."""
+    blank = _is_blank(series)
+    converted = pd.to_numeric(series.where(~blank), errors='coerce')
+    if (converted.isna() & ~blank).any():
+        return None
+    # Fractional quantities cannot be stored as integers
+    if ((converted.dropna() % 1) != 0).any():
+        return None
+    return converted.astype('Int64')
+
+
+def optimize_dtypes(sheet_data):
+    """
+    Give a freshly loaded sheet compact dtypes.
+
+    Supplier, category, fund number and month become 'category', costs become float64,
+    dates become datetime64 and quantities become nullable integers. Remaining text
+    columns keep '' for empty cells, as the rest of the application expects.
+    A column is only converted when no non-empty value would be lost.
+
+    Returns the optimized DataFrame together with its memory usage before and after (bytes).
+    """
+    memory_before = int(sheet_data.memory_usage(deep=True).sum())
+
+    optimized = sheet_data.copy()
+    optimized.columns = [str(col).lower() for col in optimized.columns]
+
+    for column in optimized.columns:
+        series = optimized[column]
+        converted = None
+
+        if column in CATEGORY_COLUMNS:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            converted = _convert_category(series)
+        elif _matches(column, COST_KEYWORDS):
+            converted = _convert_cost(series)
+        elif _matches(column, DATE_KEYWORDS):
+            converted = _convert_date(series)
+        elif _matches(column, QUANTITY_KEYWORDS):
+            converted = _convert_quantity(series)
+
+        if converted is None and pd.api.types.is_string_dtype(series.dtype):
+            converted = series.fillna('')
+
+        if converted is not None:
+            optimized[column] = converted
+
+    memory_after = int(optimized.memory_usage(deep=True).sum())
+    return optimized, memory_before, memory_after
+
+
+def optimize_workbook_dtypes(excel_data):
+    """
+    Run optimize_dtypes over every sheet of a workbook.
+    Returns the optimized sheets and a {sheet_name: (bytes_before, bytes_after)} report.
+    """
+    optimized_sheets = {}
+    memory_report = {}
+    for sheet_name, sheet_data in excel_data.items():
+        optimized, memory_before, memory_after = optimize_dtypes(sheet_data)
+        optimized_sheets[sheet_name] = optimized
+        memory_report[sheet_name] = (memory_before, memory_after)
+    return optimized_sheets, memory_report
+
+
+def format_memory_report(memory_report):
+    """Format the memory saved per sheet as readable lines."""
+    lines = []
+    for sheet_name, (memory_before, memory_after) in memory_report.items():
+        saved = memory_before - memory_after
+        percent = (saved / memory_before * 100) if memory_before else 0.0
+        lines.append(
+            f"{sheet_name}: {memory_before / 1024 ** 2:.2f} MB -> {memory_after / 1024 ** 2:.2f} MB "
+            f"(saved {saved / 1024 ** 2:.2f} MB, {percent:.0f}%)"
+        )
+    return "\n".join(lines)
@@ -1,11 +1,12 @@
 import os
+import shutil
+import filecmp
 import pandas as pd
 import re
 import random
 import logging
+from collections import OrderedDict
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 
 from openpyxl import Workbook
@@ -14,17 +15,66 @@ from openpyxl.styles import PatternFill
 from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import (
     QDialog, QFileDialog, QVBoxLayout, QTabWidget, QTableWidget, QTableWidgetItem, 
-    QMessageBox, QLabel, QHBoxLayout, QHeaderView, QDateEdit, QPushButton, QLineEdit, QComboBox, QInputDialog, QListWidget, QApplication, QScrollArea, QWidget
+    QMessageBox, QLabel, QHBoxLayout, QHeaderView, QDateEdit, QPushButton, QLineEdit, QComboBox, QInputDialog, QListWidget, QApplication, QScrollArea, QWidget,
+    QListWidgetItem, QDialogButtonBox, QCheckBox, QProgressDialog, QGridLayout
 )
 from PyQt5.QtCore import Qt, QDate
 
+from data_loader import (
+    optimize_workbook_dtypes, format_memory_report, clean_cost_series, read_data_file,
+    scan_data_file, suggest_columns, make_usecols, load_upload_profiles, save_upload_profile,
+    is_data_file, file_kind, merge_data_files, DATA_FILE_FILTER, MERGED_TABLE_SHEET
+)
+from categorizer import find_name_column, explain_rows, CategoryMemo
+from folder_watcher import FolderWatcher, load_cached_results
+from file_catalog import FileCatalog, CATALOG_FILE_NAME
+from search_index import SearchIndex, find_search_columns
+from supplier_resolver import SupplierResolver
+from grant_rules import GrantRuleMatcher
+from allocation_optimizer import (
+    plan_allocation, load_allocation_marks, save_allocation_marks, record_allocation_marks, apply_allocation_marks,
+    ALLOCATED_GRANT_COLUMN, ALLOCATION_MARKS_FILE_NAME
+)
+from chart_data import find_date_column, find_category_column, cost_by_month, cost_by_group, column_series
+from plot_canvas import PlotCanvas
+from dashboard_cache import AggregateCache, grant_utilization
+from report_generator import generate_report
+from monthly_close import run_monthly_close, available_months, ALL_MONTHS
+from profiling import profile_public_methods, profile_phase, profiling_suspended, not_profiled
+from sheet_store import (
+    SheetStore, spill_available, load_memory_budget, save_memory_budget, MEMORY_BUDGET_FILE_NAME, SPILL_DIRECTORY_NAME,
+    BYTES_PER_MB
+)
+from session_store import save_session, load_session, session_info, SESSION_DIRECTORY_NAME
+from fallback_classifier import (
+    FallbackClassifier, classifier_available, training_examples_from_cache, apply_fallback, MODEL_FILE_NAME
+)
+
 #list of libraries needed to install
 #pip install openpyxl
 #pip install xlsxwriter
+#pip install python-calamine (optional, much faster Excel reading)
+#pip install scikit-learn (optional, fallback classifier for 'Others' items)
 #there could be others
 
+SEARCH_HIGHLIGHT_COLOR = "#fff59d"
+SEARCH_HIGHLIGHT_LIMIT = 5000  # Rows highlighted per sheet; all matches are still counted
+
+# Charts offered by visualize_data
+CHART_COST_BY_MONTH = "Cost by Month"
+CHART_COST_BY_CATEGORY = "Cost by Category"
+CHART_COST_BY_FUND = "Cost by Fund"
+CHART_COLUMN_VS_COLUMN = "Column vs Column"
+
+DASHBOARD_TAB_NAME = "Dashboard"
+
+TABLE_ITEM_BYTES = 200  # Rough memory of one QTableWidgetItem; built tables count against the memory budget
+
+GROUP_ROW_PALETTE = ["#FFCCCC", "#CCFFCC", "#CCCCFF", "#FFFF99", "#FFCCFF", "#99FFFF"]  # Row colors of grouped sheets
+
+@profile_public_methods
 class ExcelHandler:
-    def __init__(self, parent, grant_management, save_directory="uploaded_files"):
+    def __init__(self, parent, grant_management, save_directory="uploaded_files", reader_backend=None):
         self.parent = parent
         self.grant_management = grant_management
         self.group_color_mapping = {}  # Store group-value-to-color mapping
@@ -32,22 +82,64 @@ class ExcelHandler:
         self.selected_sum_label = None
         self.sheet_data = None
         self.saved_excel_sheets = {}  # Dictionary to store saved Excel sheets
+        self.memory_report = {}  # Memory before/after the dtype pass, per sheet
         self.save_directory = save_directory
+        self.reader_backend = reader_backend  # None picks the fastest installed backend
+        self.plot_canvas = None  # Reusable chart canvas of the open sheet window
         os.makedirs(self.save_directory, exist_ok=True)
+        self.profiles_path = os.path.join(self.save_directory, "upload_profiles.json")  # Saved sheet/column selections
+        self.merge_dedupe_keys = []  # Columns identifying a repeated line item when merging files (empty = whole row)
+        self.folder_watcher = None  # Background ingestion of save_directory, see start_folder_watcher
+        self.file_catalog = FileCatalog(os.path.join(self.save_directory, CATALOG_FILE_NAME))  # Searchable metadata of saved files
+        self.search_index = SearchIndex()  # Text index over the displayed sheets
+        self.search_highlights = {}  # {tab index: highlighted row positions}
+        self.search_backgrounds = {}  # {tab index: {row: backgrounds before highlighting}}, restored when the search changes
+        self.supplier_resolver = SupplierResolver(os.path.join(self.save_directory, "supplier_cache.json"))  # Resolved supplier names, kept between sessions
+        self.category_memo = CategoryMemo(os.path.join(self.save_directory, "category_memo.json"))  # Categories of items seen before
+        self.fallback_model_path = os.path.join(self.save_directory, MODEL_FILE_NAME)
+        self.fallback_classifier = FallbackClassifier.load(self.fallback_model_path)  # None until trained
+        self.aggregate_cache = AggregateCache(self.supplier_resolver)  # Pre-aggregated sheets for the dashboard
+        self.dashboard_widget = None
+        self.memory_budget_path = os.path.join(self.save_directory, MEMORY_BUDGET_FILE_NAME)
+        self.memory_budget_mb = load_memory_budget(self.memory_budget_path)
+        self.spill_directory = os.path.join(self.save_directory, SPILL_DIRECTORY_NAME)
+        shutil.rmtree(self.spill_directory, ignore_errors=True)  # Spill files left by an earlier session
+        self.sheet_dict = SheetStore(self.spill_directory, self.memory_budget_mb, self.on_sheet_spilled)
+        self.memory_status_label = None  # Status bar label showing the memory held by the open sheets
+        self.session_directory = os.path.join(self.save_directory, SESSION_DIRECTORY_NAME)  # Sheets and view state of the last session
+        self.sheet_groupings = {}  # {sheet name: [column its rows are colored by, 'palette' or 'mapping']}
+        self.unbuilt_tabs = set()  # Sheets whose tab is an empty placeholder until it is activated
+        self.lazy_tabs = set()  # Sheets whose table is filled by populate_table_widget, so it can be released
+        self.built_tabs = OrderedDict()  # {sheet name: table cells}, least recently viewed first
+        self.allocation_marks_path = os.path.join(self.grant_management.directory_path, ALLOCATION_MARKS_FILE_NAME)  # Rows already charged to a grant
 
     def upload_excel(self):
         options = QFileDialog.Options()
         options |= QFileDialog.ReadOnly
-        file_path, _ = QFileDialog.getOpenFileName(
-            self.parent, "Upload Inventory Excel File", "", "Excel Files (*.xlsx);;All Files (*)", options=options
-        )
+        with profiling_suspended():
+            file_path, _ = QFileDialog.getOpenFileName(
+                self.parent, "Upload Inventory Excel File", "", DATA_FILE_FILTER, options=options
+            )
 
         if file_path:
             try:
-                excel_data = pd.read_excel(file_path, sheet_name=None)
+                # Pre-scan headers so only the needed sheets and columns get parsed
+                selection = self.select_sheets_and_columns(scan_data_file(file_path))
+                if selection is None:
+                    return
+                sheets, columns = selection
+
+                with profile_phase("parse file") as phase:
+                    excel_data, backend = read_data_file(
+                        file_path, backend=self.reader_backend, sheet_name=sheets, usecols=make_usecols(columns)
+                    )
+                    phase['rows'] = sum(len(data) for data in excel_data.values())
+                print(f"File read with the '{backend}' reader")  # Debugging statement
                 excel_data = {name: data for name, data in excel_data.items() if not data.empty}
+                excel_data = self.optimize_loaded_sheets(excel_data)
 
                 if excel_data:
+                    self.save_uploaded_file(file_path)
                     self.sheet_data = excel_data[list(excel_data.keys())[0]]  # Default to the first sheet
                     print("Excel Data Loaded:", self.sheet_data.head())  # Debugging statement
                     self.display_excel_contents(excel_data)
@@ -58,8 +150,232 @@ class ExcelHandler:
                 self.sheet_data = None  # Clear any previous data
                 QMessageBox.critical(self.parent, "Error", f"An error occurred: {str(e)}")
 
+    def upload_multiple_files(self):
+        """Upload several inventory files, parse them in parallel and merge matching sheets into one dataset."""
+        options = QFileDialog.Options()
+        options |= QFileDialog.ReadOnly
+        with profiling_suspended():
+            file_paths, _ = QFileDialog.getOpenFileNames(
+                self.parent, "Upload and Merge Inventory Files", "", DATA_FILE_FILTER, options=options
+            )
+        if not file_paths:
+            return
+
+        try:
+            # Union of every file's headers so one selection applies to all files
+            scan = {}
+            for file_path in file_paths:
+                for sheet_name, info in scan_data_file(file_path).items():
+                    key = sheet_name if file_kind(file_path) == 'excel' else MERGED_TABLE_SHEET
+                    entry = scan.setdefault(key, {'columns': [], 'rows': 0})
+                    entry['columns'] += [col for col in info['columns'] if col not in entry['columns']]
+                    if entry['rows'] is None or info['rows'] is None:
+                        entry['rows'] = None
+                    else:
+                        entry['rows'] += info['rows']
+
+            selection = self.select_sheets_and_columns(scan)
+            if selection is None:
+                return
+            sheets, columns = selection
 
-    
+            with profiling_suspended():
+                key_text, ok = QInputDialog.getText(
+                    self.parent, "Duplicate Line Items",
+                    "Columns identifying a repeated line item (comma-separated, blank = whole row):",
+                    QLineEdit.Normal, ", ".join(self.merge_dedupe_keys)
+                )
+            if not ok:
+                return
+            self.merge_dedupe_keys = [key.strip().lower() for key in key_text.split(',') if key.strip()]
+
+            merged, duplicates_removed = merge_data_files(
+                file_paths, backend=self.reader_backend,
+                sheets=[name for name in sheets if name != MERGED_TABLE_SHEET],
+                columns=columns, dedupe_keys=self.merge_dedupe_keys
+            )
+            excel_data = {name: data for name, data in merged.items() if name in sheets and not data.empty}
+            excel_data = self.optimize_loaded_sheets(excel_data)
+
+            if excel_data:
+                for file_path in file_paths:
+                    self.save_uploaded_file(file_path)
+                print("Duplicates removed per sheet:", duplicates_removed)  # Debugging statement
+                removed = sum(duplicates_removed.get(name, 0) for name in excel_data)
+                QMessageBox.information(
+                    self.parent, "Files Merged",
+                    f"Merged {len(file_paths)} files into {len(excel_data)} sheet(s); {removed} repeated line items removed."
+                )
+                self.sheet_data = excel_data[list(excel_data.keys())[0]]  # Default to the first sheet
+                self.display_excel_contents(excel_data)
+            else:
+                self.sheet_data = None  # Clear any previous data
+                QMessageBox.warning(self.parent, "No Data", "The selected files contain no data.")
+        except Exception as e:
+            self.sheet_data = None  # Clear any previous data
+            QMessageBox.critical(self.parent, "Error", f"An error occurred while merging files: {str(e)}")
+
+    def save_uploaded_file(self, file_path):
+        """
+        Keep a copy of an uploaded file in the save directory, where the folder watcher picks it up.
+        Archived files are never overwritten: a different file with the same name is saved as
+        name_1.xlsx, name_2.xlsx, ...; a file identical to one already saved is not copied again.
+        """
+        name = os.path.basename(file_path)
+        stem, extension = os.path.splitext(name)
+        if extension.lower() == '.gz':  # Keep 'report.csv.gz' together as report_1.csv.gz
+            stem, inner_extension = os.path.splitext(stem)
+            extension = inner_extension + extension
+
+        counter = 0
+        destination = os.path.join(self.save_directory, name)
+        try:
+            while os.path.exists(destination):
+                if os.path.abspath(destination) == os.path.abspath(file_path) or filecmp.cmp(file_path, destination, shallow=False):
+                    return  # Already saved
+                counter += 1
+                destination = os.path.join(self.save_directory, f"{stem}_{counter}{extension}")
+            shutil.copy2(file_path, destination)
+        except OSError as e:
+            print(f"Could not save a copy of {file_path}: {str(e)}")
+
+    def start_folder_watcher(self):
+        """Parse and categorize files in the save directory in the background as they arrive."""
+        if self.folder_watcher is None:
+            # Each processed file is added to the catalog straight from its parsed sheets
+            self.folder_watcher = FolderWatcher(self.save_directory, on_ingested=self.file_catalog.update_file)
+            self.folder_watcher.start()
+
+    def stop_folder_watcher(self):
+        if self.folder_watcher is not None:
+            self.folder_watcher.stop()
+            self.folder_watcher = None
+
+    def select_sheets_and_columns(self, scan):
+        """
+        Let the user (or a saved profile) pick which sheets and columns to load, based on a
+        header pre-scan. Returns (sheets, columns), where columns may be None for all columns,
+        or None if the user cancelled.
+        """
+        all_columns = []
+        for info in scan.values():
+            for col in info['columns']:
+                if col not in all_columns:
+                    all_columns.append(col)
+
+        dialog = QDialog(self.parent)
+        dialog.setWindowTitle("Select Sheets and Columns")
+        dialog.setStyleSheet("background-color: #cce7ff;")
+        dialog.resize(600, 600)
+
+        layout = QVBoxLayout()
+
+        # Saved profiles
+        profiles = load_upload_profiles(self.profiles_path)
+        profile_layout = QHBoxLayout()
+        profile_label = QLabel("Profile:")
+        profile_label.setStyleSheet("font-size: 16px; color: black;")
+        profile_layout.addWidget(profile_label)
+        profile_combo = QComboBox()
+        profile_combo.addItems(["(Suggested columns)"] + list(profiles.keys()))
+        profile_layout.addWidget(profile_combo)
+        layout.addLayout(profile_layout)
+
+        # Sheet list
+        sheets_label = QLabel("Sheets:")
+        sheets_label.setStyleSheet("font-size: 16px; color: black;")
+        layout.addWidget(sheets_label)
+        sheet_list_widget = QListWidget()
+        sheet_list_widget.setStyleSheet("font-size: 14px; color: black; background-color: white;")
+        for sheet_name, info in scan.items():
+            rows = info['rows'] if info['rows'] is not None else "?"
+            item = QListWidgetItem(f"{sheet_name} ({rows} rows, {len(info['columns'])} columns)")
+            item.setData(Qt.UserRole, sheet_name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            sheet_list_widget.addItem(item)
+        layout.addWidget(sheet_list_widget)
+
+        # Column list (union of all sheet headers)
+        columns_label = QLabel("Columns:")
+        columns_label.setStyleSheet("font-size: 16px; color: black;")
+        layout.addWidget(columns_label)
+        column_list_widget = QListWidget()
+        column_list_widget.setStyleSheet("font-size: 14px; color: black; background-color: white;")
+        for col in all_columns:
+            item = QListWidgetItem(col)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            column_list_widget.addItem(item)
+        layout.addWidget(column_list_widget)
+
+        def apply_selection(sheets, columns):
+            wanted_columns = {str(col).lower() for col in columns}
+            for i in range(sheet_list_widget.count()):
+                item = sheet_list_widget.item(i)
+                item.setCheckState(Qt.Checked if item.data(Qt.UserRole) in sheets else Qt.Unchecked)
+            for i in range(column_list_widget.count()):
+                item = column_list_widget.item(i)
+                item.setCheckState(Qt.Checked if item.text().lower() in wanted_columns else Qt.Unchecked)
+
+        def apply_profile(index):
+            if index == 0:
+                apply_selection(list(scan.keys()), suggest_columns(all_columns) or all_columns)
+            else:
+                profile = profiles[profile_combo.itemText(index)]
+                apply_selection(profile.get('sheets', []), profile.get('columns', []))
+
+        def checked(list_widget, use_data=False):
+            return [
+                list_widget.item(i).data(Qt.UserRole) if use_data else list_widget.item(i).text()
+                for i in range(list_widget.count())
+                if list_widget.item(i).checkState() == Qt.Checked
+            ]
+
+        def save_profile():
+            name, ok = QInputDialog.getText(dialog, "Save Profile", "Profile name:")
+            if ok and name.strip():
+                save_upload_profile(self.profiles_path, name.strip(), checked(sheet_list_widget, True), checked(column_list_widget))
+                QMessageBox.information(dialog, "Profile Saved", f"Profile '{name.strip()}' has been saved.")
+
+        profile_combo.currentIndexChanged.connect(apply_profile)
+        apply_profile(0)
+
+        save_profile_button = QPushButton("Save Selection as Profile")
+        save_profile_button.setStyleSheet("font-size: 16px; color: white; background-color: #2196F3;")
+        save_profile_button.clicked.connect(save_profile)
+        layout.addWidget(save_profile_button)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(dialog.accept)
+        button_box.rejected.connect(dialog.reject)
+        layout.addWidget(button_box)
+
+        dialog.setLayout(layout)
+        with profiling_suspended():
+            result = dialog.exec_()
+        if result != QDialog.Accepted:
+            return None
+
+        sheets = checked(sheet_list_widget, True)
+        columns = checked(column_list_widget)
+        if not sheets:
+            QMessageBox.warning(self.parent, "No Sheets Selected", "Please select at least one sheet to load.")
+            return None
+
+        if not columns:
+            QMessageBox.warning(self.parent, "No Columns Selected", "Please select at least one column to load.")
+            return None
+
+        # Every column selected: skip usecols filtering entirely
+        if len(columns) == len(all_columns):
+            columns = None
+        return sheets, columns
+
+    def optimize_loaded_sheets(self, excel_data):
+        """Give freshly loaded sheets compact dtypes and report the memory saved per sheet."""
+        excel_data, self.memory_report = optimize_workbook_dtypes(excel_data)
+        if self.memory_report:
+            print("Memory saved per sheet:\n" + format_memory_report(self.memory_report))  # Debugging statement
+        return excel_data
 
 
 
@@ -70,13 +386,14 @@ class ExcelHandler:
         try:
             # Prompt user for save location
             options = QFileDialog.Options()
-            file_path, _ = QFileDialog.getSaveFileName(
-                self.parent,
-                "Save Grouped Data As",
-                f"grouped_data_{title.replace(' ', '_').lower()}.xlsx",
-                "Excel Files (*.xlsx);;All Files (*)",
-                options=options
-            )
+            with profiling_suspended():
+                file_path, _ = QFileDialog.getSaveFileName(
+                    self.parent,
+                    "Save Grouped Data As",
+                    f"grouped_data_{title.replace(' ', '_').lower()}.xlsx",
+                    "Excel Files (*.xlsx);;All Files (*)",
+                    options=options
+                )
             if not file_path:
                 return
 
@@ -169,7 +486,8 @@ class ExcelHandler:
         delete_all_button.clicked.connect(lambda: self.delete_all_rows(dialog))
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
     def remove_row(self, dialog, row_index):
         """Remove a specific row by index."""
@@ -188,10 +506,11 @@ class ExcelHandler:
 
     def delete_all_rows(self, dialog):
         """Clear all rows from the current sheet data."""
-        confirmation = QMessageBox.question(
-            self.parent, "Confirm Delete All", "Are you sure you want to delete all data?",
-            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
-        )
+        with profiling_suspended():
+            confirmation = QMessageBox.question(
+                self.parent, "Confirm Delete All", "Are you sure you want to delete all data?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
         if confirmation == QMessageBox.Yes:
             self.sheet_data = self.sheet_data.iloc[0:0]  # Clear all rows
             QMessageBox.information(self.parent, "All Data Deleted", "All rows have been removed from the dataset.")
@@ -199,54 +518,89 @@ class ExcelHandler:
 
 
     def visualize_data(self):
-        """Visualize the dataset using matplotlib and embed the graph into the GUI."""
+        """Chart the current sheet on a single reusable canvas embedded in the GUI."""
         if self.sheet_data is None or self.sheet_data.empty:
             QMessageBox.warning(self.parent, "No Data", "No data available to visualize. Please add or load data first.")
             return
 
         try:
-            # Identify numeric columns
-            numeric_columns = self.sheet_data.select_dtypes(include=["number"]).columns.tolist()
-            
-            if not numeric_columns:
-                QMessageBox.warning(self.parent, "No Numeric Columns", "No numeric columns are available for visualization.")
-                return
-
-            # Ask user to select x and y columns
-            x_column, ok_x = QInputDialog.getItem(self.parent, "Select X-axis", 
-                                                "Choose a numeric column for the X-axis:", numeric_columns, 0, False)
-            if not ok_x:
-                return
-
-            y_column, ok_y = QInputDialog.getItem(self.parent, "Select Y-axis", 
-                                                "Choose a numeric column for the Y-axis:", numeric_columns, 0, False)
-            if not ok_y:
+            columns = list(self.sheet_data.columns)
+            has_cost = 'cost' in columns
+            date_column = find_date_column(columns)
+            category_column = find_category_column(columns)
+
+            # Step 1: Offer the charts this sheet can support
+            chart_types = []
+            if has_cost and date_column:
+                chart_types.append(CHART_COST_BY_MONTH)
+            if has_cost and category_column:
+                chart_types.append(CHART_COST_BY_CATEGORY)
+            if has_cost and 'fund_number' in columns:
+                chart_types.append(CHART_COST_BY_FUND)
+            chart_types.append(CHART_COLUMN_VS_COLUMN)
+
+            with profiling_suspended():
+                chart_type, ok = QInputDialog.getItem(self.parent, "Select Chart", "Choose a chart:", chart_types, 0, False)
+            if not ok:
                 return
 
-            # Clear any previous graph canvas
-            if hasattr(self, 'graph_canvas'):
-                self.graph_canvas.deleteLater()
-
-            # Create a new figure and canvas
-            self.graph_canvas = FigureCanvas(Figure(figsize=(6, 4)))
-            ax = self.graph_canvas.figure.add_subplot(111)
+            # Step 2: Create the canvas once per window and reuse it for every chart
+            if self.plot_canvas is None:
+                self.plot_canvas = PlotCanvas()
+                self.graph_layout.addWidget(self.plot_canvas.make_toolbar())  # Zoom and pan
+                self.graph_layout.addWidget(self.plot_canvas)
+
+            # Step 3: Aggregate and draw
+            if chart_type == CHART_COST_BY_MONTH:
+                monthly = cost_by_month(self.sheet_data, date_column)
+                if monthly.empty:
+                    QMessageBox.warning(self.parent, "No Dates", f"No valid dates found in '{date_column}'.")
+                    return
+                self.plot_canvas.plot_series(monthly.index, monthly.to_numpy(), "Cost by Month", "Month", "Cost", x_is_date=True)
+            elif chart_type == CHART_COST_BY_CATEGORY:
+                totals = cost_by_group(self.sheet_data, category_column)
+                self.plot_canvas.plot_categories(totals.index, totals.to_numpy(), "Cost by Category", "Category", "Cost")
+            elif chart_type == CHART_COST_BY_FUND:
+                totals = cost_by_group(self.sheet_data, 'fund_number')
+                self.plot_canvas.plot_categories(totals.index, totals.to_numpy(), "Cost by Fund", "Fund Number", "Cost")
+            else:
+                value_columns = [
+                    col for col in columns
+                    if col == 'cost' or (pd.api.types.is_numeric_dtype(self.sheet_data[col]) and not pd.api.types.is_bool_dtype(self.sheet_data[col]))
+                ]
+                if not value_columns:
+                    QMessageBox.warning(self.parent, "No Numeric Columns", "No numeric columns are available for visualization.")
+                    return
 
-            # Plot the data
-            ax.plot(self.sheet_data[x_column], self.sheet_data[y_column], 
-                    marker='o', linestyle='-', color='blue')
-            ax.set_title(f"{y_column} vs {x_column}")
-            ax.set_xlabel(x_column)
-            ax.set_ylabel(y_column)
-            ax.grid(True)
+                with profiling_suspended():
+                    x_column, ok_x = QInputDialog.getItem(self.parent, "Select X-axis",
+                                                        "Choose a column for the X-axis:", [str(col) for col in columns], 0, False)
+                if not ok_x:
+                    return
+                with profiling_suspended():
+                    y_column, ok_y = QInputDialog.getItem(self.parent, "Select Y-axis",
+                                                        "Choose a numeric column for the Y-axis:", [str(col) for col in value_columns], 0, False)
+                if not ok_y:
+                    return
+                x_column = columns[[str(col) for col in columns].index(x_column)]
+                y_column = value_columns[[str(col) for col in value_columns].index(y_column)]
 
-            # Add the canvas to the layout
-            self.graph_layout.addWidget(self.graph_canvas)
+                kind, x_values, y_values = column_series(self.sheet_data, x_column, y_column)
+                title = f"{y_column} vs {x_column}"
+                if kind == 'bar':
+                    self.plot_canvas.plot_categories(x_values, y_values, title, str(x_column), str(y_column))
+                else:
+                    self.plot_canvas.plot_series(x_values, y_values, title, str(x_column), str(y_column), x_is_date=(kind == 'date'))
 
         except Exception as e:
             QMessageBox.critical(self.parent, "Error", f"An error occurred while visualizing data: {str(e)}")
 
-    def display_excel_contents(self, excel_data):
-        """Display Excel data with buttons on the right and additional components below."""
+    def display_excel_contents(self, excel_data, session=None):
+        """
+        Display Excel data with buttons on the right and additional components below.
+        session is the manifest of a restored session: its grouped sheets are colored again
+        and its current sheet is selected.
+        """
         dialog = QDialog(self.parent)
         dialog.setWindowTitle("Excel File Contents")
         dialog.setStyleSheet("background-color: #cce7ff;")
@@ -261,6 +615,19 @@ class ExcelHandler:
         # Main vertical layout
         main_layout = QVBoxLayout()
 
+        # Search across all sheets (item name, supplier, catalog number)
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search items, suppliers or catalog numbers in all sheets...")
+        self.search_input.setStyleSheet("font-size: 14px; color: black; background-color: white;")
+        self.search_input.textChanged.connect(self.search_sheets)
+        search_layout.addWidget(self.search_input)
+
+        self.search_result_label = QLabel("")
+        self.search_result_label.setStyleSheet("font-size: 14px; color: black;")
+        search_layout.addWidget(self.search_result_label)
+        main_layout.addLayout(search_layout)
+
         # Horizontal layout for table and right-side buttons
         top_horizontal_layout = QHBoxLayout()
 
@@ -285,56 +652,73 @@ class ExcelHandler:
         }
     """)
 
-        # Store sheet data in a dictionary to track by tab
-        self.sheet_dict = {}  # Store all sheets
-        for sheet_name, sheet_data in excel_data.items():
+        # Store sheet data by tab; sheets beyond the memory budget are spilled to disk
+        self.sheet_dict.close()
+        self.sheet_dict = SheetStore(self.spill_directory, self.memory_budget_mb, self.on_sheet_spilled)
+        self.search_index = SearchIndex()
+        self.search_highlights = {}
+        self.search_backgrounds = {}
+        self.sheet_groupings = dict(session['sheet_groupings']) if session else {}
+        self.unbuilt_tabs = set()
+        self.lazy_tabs = set()
+        self.built_tabs = OrderedDict()
+        for sheet_name in list(excel_data):
+            sheet_data = excel_data.pop(sheet_name)  # Moved, so the caller's dict does not keep spilled sheets alive
             sheet_data.columns = sheet_data.columns.str.lower()
-            sheet_data = sheet_data.fillna("")
 
-        # Table widget for sheet
+            # Placeholder table for the sheet; its cells are filled when the tab is first activated
             table_widget = QTableWidget()
-            table_widget.setRowCount(sheet_data.shape[0])
             table_widget.setColumnCount(sheet_data.shape[1])
             table_widget.setHorizontalHeaderLabels(sheet_data.columns)
 
-        # Enable scrollbars
-        table_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        table_widget.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-
-        # Adjust column widths to prevent clipping
-        for col_index in range(sheet_data.shape[1]):
-            table_widget.setColumnWidth(col_index, 200)
-
-        # Allow resizable columns
-        table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
-
-        # Set column widths explicitly
-        for col_index in range(sheet_data.shape[1]):
-            table_widget.setColumnWidth(col_index, 200)
-
-        # Populate table data
-            for i in range(sheet_data.shape[0]):
-                for j in range(sheet_data.shape[1]):
-                    item = QTableWidgetItem(str(sheet_data.iat[i, j]))
-                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                    table_widget.setItem(i, j, item)
+            # Enable scrollbars
+            table_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            table_widget.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
 
             table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            table_widget.itemSelectionChanged.connect(lambda table_widget=table_widget: self.update_selected_sum(table_widget))
 
-            # Add sheet data to the dictionary
+            # Index the sheet for search while it is in memory, then add it to the dictionary
+            self.search_index.add_sheet(sheet_name, sheet_data)
             self.sheet_dict[sheet_name] = sheet_data
+            self.unbuilt_tabs.add(sheet_name)
+            self.lazy_tabs.add(sheet_name)
 
             # Add the table widget to the tab widget
             self.tab_widget.addTab(table_widget, sheet_name)
+        self.update_memory_status()
+
+        # Dashboard tab, after the sheets
+        self.dashboard_widget = self.create_dashboard_tab()
+        self.tab_widget.addTab(self.dashboard_widget, DASHBOARD_TAB_NAME)
 
         # Ensure self.sheet_data is set to the first sheet by default
         def update_current_sheet(index):
+            if self.tab_widget.widget(index) is self.dashboard_widget:
+                self.show_dashboard()  # Keep self.sheet_data on the last sheet viewed
+                return
             selected_sheet_name = self.tab_widget.tabText(index)
+            self.sheet_dict.pin(selected_sheet_name)  # Reads the sheet back if it was spilled
             self.sheet_data = self.sheet_dict[selected_sheet_name]
+            table_widget = self.tab_widget.widget(index)
+            if selected_sheet_name in self.unbuilt_tabs:  # First activation, or released since
+                self.populate_table_widget(table_widget, selected_sheet_name, self.sheet_data)
+                self.color_grouped_rows(table_widget, selected_sheet_name, self.sheet_data)
+                self.search_backgrounds[index] = self.highlight_rows(table_widget, self.search_highlights.get(index, []))
+                self.unbuilt_tabs.discard(selected_sheet_name)
+            self.built_tabs[selected_sheet_name] = table_widget.rowCount() * table_widget.columnCount()
+            self.built_tabs.move_to_end(selected_sheet_name)
+            self.release_hidden_tables()
+            self.update_memory_status()
             print(f"Current Sheet: {selected_sheet_name}")
 
         self.tab_widget.currentChanged.connect(update_current_sheet)
-        if self.tab_widget.count() > 0:
+        current_index = 0
+        if session and session.get('current_sheet') in self.sheet_dict:
+            current_index = list(self.sheet_dict).index(session['current_sheet'])
+        if current_index > 0:
+            self.tab_widget.setCurrentIndex(current_index)  # Emits currentChanged
+        elif self.tab_widget.count() > 0:
             update_current_sheet(0)
 
         # Add the tab widget to the horizontal layout
@@ -351,75 +735,90 @@ class ExcelHandler:
         # Add button to download sheets into a new Excel file
         download_button = QPushButton("Download Sheets as Excel")
         download_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
-        download_button.clicked.connect(self.download_sheets_as_excel)
+        download_button.clicked.connect(lambda: self.download_sheets_as_excel())
         right_button_layout.addWidget(download_button)
 
         # Add Data Button
         add_data_button = QPushButton("Add Data")
         add_data_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
         add_data_button.setFixedHeight(35)  # Reduce button height
-        add_data_button.clicked.connect(self.add_data_to_sheet)
+        add_data_button.clicked.connect(lambda: self.add_data_to_sheet())
         right_button_layout.addWidget(add_data_button)
 
         # Remove Data Button
         remove_data_button = QPushButton("Remove Data")
         remove_data_button.setStyleSheet("font-size: 16px; color: white; background-color: #F44336;")
         remove_data_button.setFixedHeight(35)
-        remove_data_button.clicked.connect(self.remove_data_from_sheet)
+        remove_data_button.clicked.connect(lambda: self.remove_data_from_sheet())
         right_button_layout.addWidget(remove_data_button)
 
         # Visualize Data Button
         visualize_button = QPushButton("Visualize Data")
         visualize_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
         visualize_button.setFixedHeight(35)
-        visualize_button.clicked.connect(self.visualize_data)
+        visualize_button.clicked.connect(lambda: self.visualize_data())
         right_button_layout.addWidget(visualize_button)
 
         # Grouping Buttons
         group_month_button = QPushButton("Group by Month")
         group_month_button.setStyleSheet("font-size: 16px;")
         group_month_button.setFixedHeight(35)
-        group_month_button.clicked.connect(self.group_by_month)
+        group_month_button.clicked.connect(lambda: self.group_by_month())
         right_button_layout.addWidget(group_month_button)
 
         group_fund_button = QPushButton("Group by Fund Number")
         group_fund_button.setStyleSheet("font-size: 16px;")
         group_fund_button.setFixedHeight(35)
-        group_fund_button.clicked.connect(self.group_by_fund)
+        group_fund_button.clicked.connect(lambda: self.group_by_fund())
         right_button_layout.addWidget(group_fund_button)
 
         # Sum Costs by Month Button
         sum_by_month_button = QPushButton("Sum Costs by Month")
         sum_by_month_button.setStyleSheet("font-size: 16px;")
         sum_by_month_button.setFixedHeight(35)
-        sum_by_month_button.clicked.connect(self.sum_costs_by_month)
+        sum_by_month_button.clicked.connect(lambda: self.sum_costs_by_month())
         right_button_layout.addWidget(sum_by_month_button)
 
         # Sum Costs by Fund Button
         sum_by_fund_button = QPushButton("Sum Costs by Fund")
         sum_by_fund_button.setStyleSheet("font-size: 16px;")
         sum_by_fund_button.setFixedHeight(35)
-        sum_by_fund_button.clicked.connect(self.sum_costs_by_fund)
+        sum_by_fund_button.clicked.connect(lambda: self.sum_costs_by_fund())
         right_button_layout.addWidget(sum_by_fund_button)
 
         # Categorize Items Button
         categorize_button = QPushButton("Categorize Items")
         categorize_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
         categorize_button.setFixedHeight(35)
-        categorize_button.clicked.connect(self.categorize_items)
+        categorize_button.clicked.connect(lambda: self.categorize_items())
         right_button_layout.addWidget(categorize_button)
 
         # Categorize and Group Items Button
         categorize_button = QPushButton("Categorize and Group Items")
         categorize_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
         categorize_button.setFixedHeight(35)
-        categorize_button.clicked.connect(self.categorize_and_group_items)
+        categorize_button.clicked.connect(lambda: self.categorize_and_group_items())
         right_button_layout.addWidget(categorize_button)
 
 
+        # Check Grant Eligibility Button
+        eligibility_button = QPushButton("Check Grant Eligibility")
+        eligibility_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
+        eligibility_button.setFixedHeight(35)
+        eligibility_button.clicked.connect(lambda: self.check_grant_eligibility())
+        right_button_layout.addWidget(eligibility_button)
+
+        # Monthly Close Button
+        monthly_close_button = QPushButton("Run Monthly Close")
+        monthly_close_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
+        monthly_close_button.setFixedHeight(35)
+        monthly_close_button.clicked.connect(lambda: self.run_monthly_close())
+        right_button_layout.addWidget(monthly_close_button)
+
         # Graph Layout (below buttons)
         self.graph_layout = QVBoxLayout()
         right_button_layout.addLayout(self.graph_layout)
+        self.plot_canvas = None  # Created by the first chart of this window
 
         # Add right button layout to the horizontal layout
         top_horizontal_layout.addLayout(right_button_layout)
@@ -439,6 +838,14 @@ class ExcelHandler:
         self.selected_sum_label.setStyleSheet("font-size: 16px; color: black;")
         bottom_layout.addWidget(self.selected_sum_label)
 
+        # Memory saved by the load-time dtype pass (per-sheet details in the tooltip)
+        if self.memory_report:
+            memory_saved = sum(before - after for before, after in self.memory_report.values())
+            memory_label = QLabel(f"Memory Saved by Compact Types: {memory_saved / 1024 ** 2:.2f} MB")
+            memory_label.setStyleSheet("font-size: 14px; color: #555;")
+            memory_label.setToolTip(format_memory_report(self.memory_report))
+            bottom_layout.addWidget(memory_label)
+
         # Date range filtering
         date_range_layout = QHBoxLayout()
 
@@ -462,7 +869,7 @@ class ExcelHandler:
 
         filter_button = QPushButton("Filter Costs by Date Range")
         filter_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
-        filter_button.clicked.connect(self.filter_costs_by_date)
+        filter_button.clicked.connect(lambda: self.filter_costs_by_date())
         date_range_layout.addWidget(filter_button)
 
         bottom_layout.addLayout(date_range_layout)
@@ -480,9 +887,14 @@ class ExcelHandler:
 
         allocate_button = QPushButton("Allocate Selected Costs to Grant")
         allocate_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
-        allocate_button.clicked.connect(self.allocate_costs_to_grant)
+        allocate_button.clicked.connect(lambda: self.allocate_costs_to_grant())
         grant_layout.addWidget(allocate_button)
 
+        auto_allocate_button = QPushButton("Auto-Allocate Unallocated Costs")
+        auto_allocate_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
+        auto_allocate_button.clicked.connect(lambda: self.auto_allocate_costs())
+        grant_layout.addWidget(auto_allocate_button)
+
         net_amount_label = QLabel("Net Amount in Grant: $0.00")
         net_amount_label.setStyleSheet("font-size: 16px; color: black;")
         self.net_amount_label = net_amount_label
@@ -495,7 +907,253 @@ class ExcelHandler:
 
         # Set the dialog layout
         dialog.setLayout(main_layout)
-        dialog.exec_()
+        with profiling_suspended():  # Buttons clicked in the dialog are actions of their own
+            dialog.exec_()
+        self.save_session()
+
+    def search_sheets(self, query):
+        """Highlight rows matching the search text in every sheet and jump to the first match."""
+        # Step 1: Clear the previous highlights
+        for tab_index, backgrounds in self.search_backgrounds.items():
+            self.restore_rows(self.tab_widget.widget(tab_index), backgrounds)
+        self.search_highlights = {}
+        self.search_backgrounds = {}
+
+        if not query.strip():
+            self.search_result_label.setText("")
+            return
+
+        # Step 2: Index sheets added since, and again when rows were added or removed
+        for sheet_name in self.sheet_dict:
+            if self.sheet_dict.is_spilled(sheet_name):
+                if sheet_name not in self.search_index.sheets:  # Indexed from its file, without reading it back
+                    search_columns = find_search_columns(self.sheet_dict.columns(sheet_name))
+                    self.search_index.add_sheet(sheet_name, self.sheet_dict.read_columns(sheet_name, search_columns))
+                continue  # Spilled sheets are unchanged since they were indexed
+            sheet_data = self.sheet_dict[sheet_name]
+            if not self.search_index.is_current(sheet_name, sheet_data):
+                self.search_index.add_sheet(sheet_name, sheet_data)
+
+        # Step 3: Look up the matching rows
+        results = self.search_index.search(query)
+        total_matches = sum(len(rows) for rows in results.values())
+        self.search_result_label.setText(f"{total_matches} matching rows in {len(results)} sheets")
+        if not results:
+            return
+
+        # Step 4: Highlight them
+        first_match = None
+        for tab_index in range(self.tab_widget.count()):
+            if self.tab_widget.widget(tab_index) is self.dashboard_widget:
+                continue  # A sheet may also be named 'Dashboard'
+            rows = results.get(self.tab_widget.tabText(tab_index))
+            if rows is None:
+                continue
+            rows = rows[:SEARCH_HIGHLIGHT_LIMIT]
+            self.search_backgrounds[tab_index] = self.highlight_rows(self.tab_widget.widget(tab_index), rows)
+            self.search_highlights[tab_index] = rows
+            if first_match is None:
+                first_match = (tab_index, rows[0])
+
+        # Step 5: Show the first match, staying on the current sheet if it has matches
+        current_index = self.tab_widget.currentIndex()
+        if current_index in self.search_highlights:
+            first_match = (current_index, self.search_highlights[current_index][0])
+        tab_index, row = first_match
+        self.tab_widget.setCurrentIndex(tab_index)
+        table_widget = self.tab_widget.widget(tab_index)
+        table_widget.scrollToItem(table_widget.item(row, 0))
+
+    def highlight_rows(self, table_widget, rows):
+        """Highlight whole rows. Returns their previous backgrounds (e.g. group colors) for restore_rows."""
+        previous = {}
+        for row in rows:
+            backgrounds = []
+            for col in range(table_widget.columnCount()):
+                item = table_widget.item(row, col)
+                backgrounds.append(item.data(Qt.BackgroundRole) if item is not None else None)
+                if item is not None:
+                    item.setBackground(QColor(SEARCH_HIGHLIGHT_COLOR))
+            previous[row] = backgrounds
+        return previous
+
+    def restore_rows(self, table_widget, previous):
+        """Put back the backgrounds saved by highlight_rows."""
+        for row, backgrounds in previous.items():
+            for col, background in enumerate(backgrounds):
+                item = table_widget.item(row, col)
+                if item is not None:
+                    item.setData(Qt.BackgroundRole, background)
+
+    def populate_table_widget(self, table_widget, sheet_name, sheet_data):
+        """Fill a sheet's table, showing missing values as empty cells without changing the stored dtypes."""
+        display_data = sheet_data.astype(object).where(sheet_data.notna(), "")
+        table_widget.setRowCount(display_data.shape[0])
+        table_widget.setColumnCount(display_data.shape[1])
+        table_widget.setHorizontalHeaderLabels(display_data.columns)
+        with profile_phase(f"populate table '{sheet_name}'", rows=display_data.shape[0]):
+            for i in range(display_data.shape[0]):
+                for j in range(display_data.shape[1]):
+                    item = QTableWidgetItem(str(display_data.iat[i, j]))
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    table_widget.setItem(i, j, item)
+
+    def color_grouped_rows(self, table_widget, sheet_name, sheet_data):
+        """Color the rows of a grouped or summarized sheet by its group column, as when it was added."""
+        grouping = self.sheet_groupings.get(sheet_name)
+        if grouping is None or grouping[0] not in sheet_data.columns:
+            return
+        column, scheme = grouping
+        palette_colors = {}
+        for i, group_value in enumerate(sheet_data[column]):
+            if scheme == 'mapping':
+                row_color = QColor(self.group_color_mapping.get(group_value, "#FFFFFF"))
+            else:
+                if group_value not in palette_colors:
+                    palette_colors[group_value] = QColor(GROUP_ROW_PALETTE[len(palette_colors) % len(GROUP_ROW_PALETTE)])
+                row_color = palette_colors[group_value]
+            for j in range(table_widget.columnCount()):
+                item = table_widget.item(i, j)
+                if item is not None:
+                    item.setBackground(row_color)
+
+    def save_session(self):
+        """Keep the open sheets and view state for the next run (see restore_session)."""
+        if not spill_available() or len(self.sheet_dict) == 0:
+            return
+        current_sheet = None
+        if getattr(self, 'tab_widget', None) is not None and self.tab_widget.currentWidget() is not self.dashboard_widget:
+            current_sheet = self.tab_widget.tabText(self.tab_widget.currentIndex())
+        try:
+            with profile_phase("save session", rows=len(self.sheet_dict)):
+                save_session(
+                    self.session_directory, self.sheet_dict, current_sheet=current_sheet,
+                    group_color_mapping=self.group_color_mapping, sheet_groupings=self.sheet_groupings
+                )
+            print(f"Session saved to {self.session_directory}")  # Debugging statement
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Error saving the session: {str(e)}")
+
+    def restore_session(self):
+        """Reopen the sheets of the last session straight from its memory-mapped files."""
+        if session_info(self.session_directory) is None:
+            QMessageBox.information(self.parent, "No Saved Session", "There is no saved session to resume.")
+            return
+        try:
+            with profile_phase("load session"):
+                excel_data, session = load_session(self.session_directory)
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"The saved session could not be opened: {str(e)}")
+            return
+        self.group_color_mapping.update(session['group_colors'])
+        self.display_excel_contents(excel_data, session=session)
+
+    def last_session_summary(self):
+        """'<n> sheets, saved <time>' for the saved session, or None."""
+        manifest = session_info(self.session_directory)
+        if manifest is None:
+            return None
+        return f"{len(manifest['sheets'])} sheets, saved {manifest['saved']}"
+
+    def refresh_current_table(self, columns):
+        """
+        Show changed columns of self.sheet_data in the current tab. Tables of loaded sheets are
+        refilled; those built by their own function (grouped, summarized, ...) keep their
+        formatting and only get the cells of these columns.
+        """
+        table_widget = self.tab_widget.currentWidget()
+        if table_widget is self.dashboard_widget or not isinstance(table_widget, QTableWidget):
+            return
+        sheet_name = self.tab_widget.tabText(self.tab_widget.currentIndex())
+        if sheet_name in self.lazy_tabs:
+            self.populate_table_widget(table_widget, sheet_name, self.sheet_data)
+            self.color_grouped_rows(table_widget, sheet_name, self.sheet_data)
+        else:
+            table_widget.setColumnCount(max(table_widget.columnCount(), self.sheet_data.shape[1]))
+            for column in columns:
+                j = self.sheet_data.columns.get_loc(column)
+                table_widget.setHorizontalHeaderItem(j, QTableWidgetItem(str(column)))
+                values = self.sheet_data[column].astype(object).where(self.sheet_data[column].notna(), "")
+                for i, value in enumerate(values):
+                    item = QTableWidgetItem(str(value))
+                    row_start = table_widget.item(i, 0)
+                    if row_start is not None:  # Same look as the rest of the row
+                        item.setTextAlignment(row_start.textAlignment())
+                        item.setData(Qt.BackgroundRole, row_start.data(Qt.BackgroundRole))
+                    table_widget.setItem(i, j, item)
+        self.built_tabs[sheet_name] = table_widget.rowCount() * table_widget.columnCount()
+
+    def release_table(self, sheet_name):
+        """
+        Drop the cells of a sheet's table; they are filled again when its tab is activated.
+        Only tables of loaded sheets are released: populate_table_widget cannot rebuild the
+        formatting of grouped or summarized ones.
+        """
+        tab_widget = getattr(self, 'tab_widget', None)
+        if tab_widget is None or sheet_name in self.unbuilt_tabs or sheet_name not in self.lazy_tabs:
+            return
+        for index in range(tab_widget.count()):
+            table_widget = tab_widget.widget(index)
+            if tab_widget.tabText(index) == sheet_name and isinstance(table_widget, QTableWidget):
+                table_widget.clearContents()
+                table_widget.setRowCount(0)
+                self.unbuilt_tabs.add(sheet_name)
+                self.built_tabs.pop(sheet_name, None)
+                print(f"Table of sheet '{sheet_name}' released")  # Debugging statement
+
+    def release_hidden_tables(self):
+        """Release the tables of hidden tabs, least recently viewed first, while the sheets and tables exceed the memory budget."""
+        if not self.memory_budget_mb:
+            return
+        budget = self.memory_budget_mb * BYTES_PER_MB
+        current_sheet = self.tab_widget.tabText(self.tab_widget.currentIndex())
+        for sheet_name in list(self.built_tabs):
+            if self.sheet_dict.resident_bytes() + sum(self.built_tabs.values()) * TABLE_ITEM_BYTES <= budget:
+                break
+            if sheet_name != current_sheet:
+                self.release_table(sheet_name)
+
+    @not_profiled
+    def on_sheet_spilled(self, sheet_name, spilled):
+        """Store listener: release the table of a sheet moved to disk; it is refilled when its tab is activated."""
+        if spilled:
+            self.release_table(sheet_name)
+        self.update_memory_status()
+
+    @not_profiled
+    def update_memory_status(self):
+        """Show the memory held by the open sheets in the main window's status bar."""
+        if not hasattr(self.parent, 'statusBar'):
+            return
+        if self.memory_status_label is None:
+            self.memory_status_label = QLabel()
+            self.parent.statusBar().addPermanentWidget(self.memory_status_label)
+        table_mb = sum(self.built_tabs.values()) * TABLE_ITEM_BYTES / BYTES_PER_MB
+        self.memory_status_label.setText(
+            f"{self.sheet_dict.memory_summary()} | {len(self.built_tabs)} tables built (~{table_mb:.0f} MB)"
+        )
+
+    def set_memory_budget(self):
+        """Ask for the memory budget of the open sheets; sheets beyond it are spilled to disk."""
+        if not spill_available():
+            QMessageBox.information(self.parent, "Memory Budget", "Spilling sheets to disk needs pyarrow (pip install pyarrow).")
+            return
+        with profiling_suspended():
+            budget_mb, ok = QInputDialog.getInt(
+                self.parent, "Memory Budget", "MB of sheet data kept in memory (0 = no limit):",
+                self.memory_budget_mb, 0, 1024 * 1024, 128
+            )
+        if not ok:
+            return
+        self.memory_budget_mb = budget_mb
+        try:
+            save_memory_budget(self.memory_budget_path, budget_mb)
+        except OSError as e:
+            QMessageBox.warning(self.parent, "Memory Budget", f"The budget could not be saved: {str(e)}")
+        self.sheet_dict.set_budget(budget_mb)
+        if getattr(self, 'tab_widget', None) is not None:
+            self.release_hidden_tables()
+        self.update_memory_status()
 
     def create_table_widget(self, sheet_data):
         """Helper function to create a QTableWidget from sheet data."""
@@ -515,9 +1173,10 @@ class ExcelHandler:
         """Allow saving all sheets as a new Excel file."""
         try:
             options = QFileDialog.Options()
-            file_path, _ = QFileDialog.getSaveFileName(
-                self.parent, "Save Sheets As Excel", "output_sheets.xlsx", "Excel Files (*.xlsx);;All Files (*)", options=options
-            )
+            with profiling_suspended():
+                file_path, _ = QFileDialog.getSaveFileName(
+                    self.parent, "Save Sheets As Excel", "output_sheets.xlsx", "Excel Files (*.xlsx);;All Files (*)", options=options
+                )
 
             if file_path:
                 # Save all sheets in the current sheet dictionary
@@ -620,7 +1279,8 @@ class ExcelHandler:
         layout.addWidget(add_sheet_button)
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
     def generate_color_mapping(self, grouped_data, column_name):
         """
@@ -748,7 +1408,8 @@ class ExcelHandler:
         layout.addLayout(button_layout)
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
 
 
@@ -780,15 +1441,14 @@ class ExcelHandler:
             new_table_widget.setHorizontalHeaderLabels([str(col).capitalize() for col in grouped_data.columns])
 
             # Highlight rows for grouped data
-            color_palette = [
-                QColor("#FFCCCC"), QColor("#CCFFCC"), QColor("#CCCCFF"),
-                QColor("#FFFF99"), QColor("#FFCCFF"), QColor("#99FFFF")
-            ]
+            color_palette = [QColor(color) for color in GROUP_ROW_PALETTE]
+            group_column = 'fund_number' if 'fund_number' in grouped_data.columns else 'month'
+            self.sheet_groupings[new_sheet_name] = [group_column, 'palette']
             color_mapping = {}
             color_index = 0
 
             for i in range(grouped_data.shape[0]):
-                group_key = grouped_data.iloc[i]['fund_number'] if 'fund_number' in grouped_data.columns else grouped_data.iloc[i]['month']
+                group_key = grouped_data.iloc[i][group_column]
                 if group_key not in color_mapping:
                     color_mapping[group_key] = color_palette[color_index % len(color_palette)]
                     color_index += 1
@@ -815,12 +1475,13 @@ class ExcelHandler:
 
             # Step 6: Save to file if requested
             if save_to_file:
-                save_path, _ = QFileDialog.getSaveFileName(
-                    self.parent,
-                    "Save Grouped Data",
-                    f"{new_sheet_name}.xlsx",
-                    "Excel Files (*.xlsx);;All Files (*)"
-                )
+                with profiling_suspended():
+                    save_path, _ = QFileDialog.getSaveFileName(
+                        self.parent,
+                        "Save Grouped Data",
+                        f"{new_sheet_name}.xlsx",
+                        "Excel Files (*.xlsx);;All Files (*)"
+                    )
                 if save_path:
                     grouped_data.to_excel(save_path, index=False)
                     QMessageBox.information(self.parent, "Success", f"Grouped data saved to: {save_path}")
@@ -900,10 +1561,10 @@ class ExcelHandler:
 
         try:
             # Clean and convert cost column to numeric
-            self.sheet_data['clean_cost'] = self.sheet_data['cost'].apply(lambda x: self.clean_and_convert_cost(x))
+            self.sheet_data['clean_cost'] = clean_cost_series(self.sheet_data['cost'])
 
             # Sum costs by month
-            summed_data = self.sheet_data.groupby('month')['clean_cost'].sum().reset_index()
+            summed_data = self.sheet_data.groupby('month', observed=True)['clean_cost'].sum().reset_index()
             summed_data.rename(columns={'clean_cost': 'total_cost'}, inplace=True)
 
             # Use existing color mapping for months
@@ -919,10 +1580,10 @@ class ExcelHandler:
 
         try:
             # Clean and convert cost column to numeric
-            self.sheet_data['clean_cost'] = self.sheet_data['cost'].apply(lambda x: self.clean_and_convert_cost(x))
+            self.sheet_data['clean_cost'] = clean_cost_series(self.sheet_data['cost'])
 
             # Sum costs by fund
-            summed_data = self.sheet_data.groupby('fund_number')['clean_cost'].sum().reset_index()
+            summed_data = self.sheet_data.groupby('fund_number', observed=True)['clean_cost'].sum().reset_index()
             summed_data.rename(columns={'clean_cost': 'total_cost'}, inplace=True)
 
             # Use existing color mapping for fund numbers
@@ -978,7 +1639,8 @@ class ExcelHandler:
         layout.addWidget(add_sheet_button)
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
 
 
@@ -990,10 +1652,10 @@ class ExcelHandler:
 
         try:
             # Clean and convert cost column to numeric
-            self.sheet_data['clean_cost'] = self.sheet_data['cost'].apply(self.clean_and_convert_cost)
+            self.sheet_data['clean_cost'] = clean_cost_series(self.sheet_data['cost'])
 
             # Sum costs by month
-            summed_data = self.sheet_data.groupby('month')['clean_cost'].sum().reset_index()
+            summed_data = self.sheet_data.groupby('month', observed=True)['clean_cost'].sum().reset_index()
             summed_data.rename(columns={'clean_cost': 'total_cost'}, inplace=True)
 
             # Use the existing color mapping for months
@@ -1011,10 +1673,10 @@ class ExcelHandler:
 
         try:
             # Clean and convert cost column to numeric
-            self.sheet_data['clean_cost'] = self.sheet_data['cost'].apply(self.clean_and_convert_cost)
+            self.sheet_data['clean_cost'] = clean_cost_series(self.sheet_data['cost'])
 
             # Sum costs by fund
-            summed_data = self.sheet_data.groupby('fund_number')['clean_cost'].sum().reset_index()
+            summed_data = self.sheet_data.groupby('fund_number', observed=True)['clean_cost'].sum().reset_index()
             summed_data.rename(columns={'clean_cost': 'total_cost'}, inplace=True)
 
             # Use the existing color mapping for fund numbers
@@ -1063,7 +1725,8 @@ class ExcelHandler:
         layout.addWidget(save_button)
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
 
 
@@ -1079,6 +1742,7 @@ class ExcelHandler:
 
         # Store the summarized data in the sheet dictionary
         self.sheet_dict[sheet_name] = summarized_data
+        self.sheet_groupings[sheet_name] = [summarized_data.columns[0], 'mapping']
 
         # Create a QTableWidget for the new sheet
         table_widget = QTableWidget()
@@ -1106,6 +1770,7 @@ class ExcelHandler:
 
 
 
+    @not_profiled
     def clean_and_convert_cost(self, value):
         """
         Clean and convert a cost value to a numeric format.
@@ -1124,6 +1789,7 @@ class ExcelHandler:
 
 
 
+    @not_profiled
     def update_selected_sum(self, table_widget):
         """Update the sum of selected costs based on highlighted rows, specifically from the 'cost' column."""
         selected_sum = 0.0
@@ -1162,8 +1828,7 @@ class ExcelHandler:
         ]
 
         if 'cost' in filtered_data.columns:
-            cleaned_costs = filtered_data['cost'].apply(lambda x: float(re.sub(r'[^\d.]', '', str(x))) if x != '' else 0)
-            total_filtered_cost = cleaned_costs.sum()
+            total_filtered_cost = clean_cost_series(filtered_data['cost']).sum()
             QMessageBox.information(self.parent, "Filtered Costs", f"Total Costs in Date Range: ${total_filtered_cost:.2f}")
         else:
             QMessageBox.warning(self.parent, "Cost Column Missing", "'Cost' column not found in the filtered data.")
@@ -1181,11 +1846,7 @@ class ExcelHandler:
 
     def find_name_column(self):
         """Find the most likely column containing item names."""
-        possible_names = ["name", "item", "product", "details", "description"]
-        for col in self.sheet_data.columns:
-            if any(keyword in col.lower() for keyword in possible_names):
-                return col
-        return None
+        return find_name_column(self.sheet_data.columns)
 
     def categorize_items(self):
         """Categorize items, group by category, and create a new sheet."""
@@ -1193,239 +1854,17 @@ class ExcelHandler:
             QMessageBox.warning(self.parent, "No Data", "No data has been loaded. Please upload an Excel file first.")
             return
 
-        # Extended categories with keywords
-        categories = {
-            'Media': [
-                # General media
-                'media', 'PBS', 'cell-culture', 'cell culture media', 'DMEM', 'RPMI', 'EMEM', 
-                'McCoy', 'IMDM', 'F-12', 'Ham\'s F-12', 'MEM', 'AMEM', 'α-MEM', 'Basal Medium Eagle',
-                'L-15', 'Leibovitz\'s L-15', 'Hank\'s Balanced Salt Solution', 'HBSS', 'Eagle\'s Medium', 
-                'Williams\' Medium E', 'Coon\'s Modified Ham\'s F-12', 'serum-free medium', 
-                'low-glucose medium', 'high-glucose medium', 'DMEM/F-12', 'RPMI-1640', 'keratinocyte medium',
-                
-                # Neutralizers and derivatives
-                'trypsin', 'trypsin-EDTA', 'trypsin neutralizer', 'TrypLE', 'trypsin substitute', 
-                'neutralizing solution', 'EDTA', 'collagenase', 'dispase', 'accutase', 
-                'cell dissociation solution', 'cell detachment solution', 'trypsin inhibitor',
-                
-                # Supplements and additives
-                'glutamine', 'L-glutamine', 'sodium pyruvate', 'non-essential amino acids', 
-                'NEAA', 'FBS', 'fetal bovine serum', 'bovine serum', 'horse serum', 'cell culture grade water',
-                'water for injection', 'sterile water', 'distilled water', 'di water', 'ultrapure water',
-                
-                # Specialized media
-                'neural stem cell medium', 'mesenchymal stem cell medium', 'embryonic stem cell medium',
-                'organoid culture media', 'hepatocyte media', 'airway epithelial cell media',
-                'fibroblast growth medium', 'skeletal muscle cell media', 'chondrocyte media', 
-                'endothelial growth medium', 'epithelial cell growth medium', 'keratinocyte serum-free medium',
-                
-                # Growth additives
-                'growth factor supplement', 'b27 supplement', 'N2 supplement', 'bfgf', 'EGF', 'insulin', 
-                'transferrin', 'selenium', 'hydrocortisone', 'dexamethasone', 'ascorbic acid', 'retinoic acid'
-            ],
-            'W/S/N Blots': [
-                'blot', 'western', 'southern', 'northern', 'gel', 'membrane', 'buffer', 'stain', 'substrate', 
-                'PAGE', 'SDS-PAGE', 'acrylamide', 'electrophoresis', 'ladder', 'marker', 'staining', 'mounting',
-                'HRP', 'chemiluminescent', 'chemiluminescence', 'fluorescent dye', 'immunoblot', 'immunoblotting', 
-                'transfer buffer', 'running buffer', 'blotting buffer', 'wash buffer', 'blocking buffer',
-                'PVDF', 'nitrocellulose', 'immobilon', 'BCA', 'Coomassie', 'silver stain', 'Ponceau', 
-                'NuPAGE', 'Bis-Tris', 'Tris-Glycine', 'MES buffer', 'MOPS buffer', 'transfer membrane',
-                'gel loading dye', 'protein ladder', 'DNA ladder', 'protein stain', 'anti-HRP', 'fluorescent marker',
-                'secondary detection', 'imaging substrate', 'ECL', 'enhanced chemiluminescence',
-                'polyacrylamide gel', 'Western substrate', 'Coomassie blue', 'chromogenic substrate',
-                'hybridization buffer', 'washing reagent', 'autoradiography', 'electroblotting', 'LDS Sample Buf', 'TBS w TWEEN TBST'
-            ],
-            'Antibodies': [
-                'antibody', 'antibodies', 'mAb', 'IgG', 'phospho', 'phospho-', 
-                'rabbit', 'mouse', 'goat', 'anti-', 'affinipure', 'monoclonal',
-                'secondary antibody', 'primary antibody', 'HRP-conjugated',
-                'Alexa Fluor', 'AF488', 'AF568', 'AF594', 'FITC', 'APC',
-                'Cy3', 'Cy5', 'Dylight', 'fluorescent antibody', 'polyclonal', 
-                'isotype control', 'conjugated antibody', 'biotinylated antibody', 
-                'peroxidase', 'HRP', 'AP (alkaline phosphatase)', 'ELISA antibody',
-                'immunoblot antibody', 'immunohistochemistry', 'IHC', 'ICC', 
-                'immunofluorescence', 'flow cytometry', 'western blot',
-
-                ## specific antibodies
-                'Hu Vimentin PE'
-            ],
-            'Flasks, Tips, etc.': [
-                'flask', 'flasks', 'Erlenmeyer flask', 'Erlenmeyer flasks', 'Conical flask', 'Conical flasks','well', 'wells',
-                'Cell culture flask', 'Cell culture flasks', 'Round-bottom flask', 'Round-bottom flasks',
-                'Volumetric flask', 'Volumetric flasks', 'Vacuum flask', 'Vacuum flasks', 'Filtering flask', 'Filtering flasks',
-                'tip', 'tips', 'pipet', 'pipets', 'pipette', 'pipettes', 'pipette tip', 'pipette tips',
-                'filter tip', 'filter tips', 'gel-loading tip', 'gel-loading tips', 'multi-channel tip', 'multi-channel tips',
-                'serological pipette', 'serological pipettes', 'manual pipette', 'manual pipettes', 'automatic pipette',
-                'automatic pipettes', 'multichannel pipette', 'multichannel pipettes', 'micropipette', 'micropipettes',
-                'repeater pipette', 'repeater pipettes', 'transfer pipette', 'transfer pipettes', 'glass pipette', 'glass pipettes',
-                'tube', 'tubes', 'centrifuge tube', 'centrifuge tubes', 'cryogenic tube', 'cryogenic tubes', 'chambers',
-                'microcentrifuge tube', 'microcentrifuge tubes', 'PCR tube', 'PCR tubes', 'glass tube', 'glass tubes',
-                'Falcon tube', 'Falcon tubes', 'Eppendorf tube', 'Eppendorf tubes', 'test tube', 'test tubes',
-                'storage tube', 'storage tubes', 'plts' ,'plate', 'plates', 'cell culture plate', 'cell culture plates',
-                'microplate', 'microplates', 'petri plate', 'petri plates', 'ELISA plate', 'ELISA plates',
-                'PCR plate', 'PCR plates', 'multi-well plate', 'multi-well plates', 'sealing plate', 'sealing plates',
-                'box', 'boxes', 'storage box', 'storage boxes', 'cryogenic box', 'cryogenic boxes', 'freezer box', 'freezer boxes',
-                'microtube box', 'microtube boxes', 'tip box', 'tip boxes', 'tube rack', 'tube racks',
-                'autoclave-safe box', 'autoclave-safe boxes', 'syringe', 'syringes', 'disposable syringe', 'disposable syringes',
-                'glass syringe', 'glass syringes', 'luer-lock syringe', 'luer-lock syringes', 'syringe filter', 'syringe filters',
-                'insulin syringe', 'insulin syringes', 'rack', 'racks', 'holder', 'holders', 'pipette rack', 'pipette racks',
-                'pipet rack', 'pipet racks', 'plate rack', 'plate racks', 'tube rack', 'tube racks', 'freezer rack', 'freezer racks',
-                'test tube rack', 'test tube racks', 'cryovial', 'cryovials', 'cryobox', 'cryoboxes', '384', 'allprotect tissue reagent',
-                'coutness', 'cryoelite', 'FBM', 'VWR BASIN'
-                'nitrogen storage rack', 'sterile container', 'sterile containers', 'sample vial', 'sample vials',
-                'funnel', 'funnels', 'glass slide', 'glass slides', 'coverslip', 'coverslips', 'weigh boat', 'weigh boats',
-                'measuring cylinder', 'measuring cylinders', 'spray bottle', 'spray bottles', 'lab tray', 'lab trays', 'T.I.P.S.',
-                'drip tray', 'drip trays', 'cell strainer', 'cell strainers', 'reservoir tray', 'reservoir trays', 'beaker', 'beakers', 'gloves', 'glove'
-            ],
-            'Assays': [
-                'assay', 'CyQUANT', 'DNeasy', 'Glo', 'immuno', 'ChIP', 'EdU', 'FITC', 'flow cytometry', 'mycoplasma', 'purelink hipure'
-            ],
-            'Mouse Work': [
-                'mouse', 'animal', 'rack', 'cage', 'rodent', 'bedding', 'scale', 'feeding', 'syringe for mouse', 
-                'mouse holder', 'animal cage'
-            ],
-            'Biological': [
-                # Existing items
-                'Lipofectamine', 'KAPA', 'concentrator', 'concentrators', 'goat serum', 'serum', 
-                'primers', 'primer', 'plasmid', 'glycerol stock', 'gBlock', 'lentivirus', 'Cas9', 'virus'
-                
-                # Enzymes and enzyme-related terms
-                'enzyme', 'restriction enzyme', 'ligase', 'polymerase', 'reverse transcriptase',
-                'DNA ligase', 'RNA polymerase', 'nuclease', 'endonuclease', 'exonuclease', 
-                'DNA polymerase', 'RNase', 'RNase inhibitor', 'phosphatase', 'kinase', 
-                'T4 ligase', 'Taq polymerase', 'Q5 polymerase', 'EcoRI', 'BamHI', 'NotI', 'HindIII',
-                'restriction digestion', 'digestion enzyme', 'proteinase K', 'Klenow fragment',
-                'DNase', 'DNAse I', 'methylase', 'NEBuilder', 'HiFi DNA Assembly', 'nickase',
-                
-                # NEB-specific items
-                'NEB', 'New England Biolabs', 'NEBuilder HiFi', 'Q5 Master Mix', 'Quick CIP',
-                'NEB ligase', 'NEB polymerase', 'NEB restriction enzyme', 'NEB buffer',
-                'NEBuffer', 'NEB T4 DNA Ligase', 'NEB Taq', 'NEB EcoRI', 'NEB digestion kit',
-                'NEB Phusion', 'NEB LunaScript', 'NEBNext', 'NEB methylase', 'NEB exonuclease',
-                
-                # Biological reagents and kits
-                'competent cells', 'cloning kit', 'transfection reagent', 'DNA assembly',
-                'electroporation reagent', 'viral vector', 'cDNA synthesis kit', 'PCR kit',
-                'RT-PCR kit', 'NGS prep kit', 'plasmid purification', 'protein ladder', 'SuperScript', 'RNeasy',
-                'marker', 'DNA ladder', 'RNA ladder', 'molecular weight marker', 'agarose', 'LB', 'agar',
-                
-                # Proteins and protein-related reagents
-                'protein expression', 'protein purification', 'proteinase', 'protease', 
-                'protein A', 'protein G', 'protein marker', 'protein standard', 'recombinant protein',
-                
-                # Cell culture additives and growth reagents
-                'cell culture reagent', 'cell growth reagent', 'supplement', 'cell recovery medium',
-                'freezing medium', 'cryopreservation', 'transfection reagent', 'nucleofection reagent',
-                
-                #Biologic Dyes
-                'Phalloidin', 'ANNEXIN V', 'ANNEXIN', 'HOECHST', 'vimentin live cell dye', 
-                'prolong diamond antifade mountant with dapi', 'dapi',
-
-                #Ladders
-                'GENERULER', 'master mix',
-
-                # Miscellaneous biological terms
-                'oligonucleotide', 'oligo', 'siRNA', 'shRNA', 'gRNA', 'sgRNA', 'RNAi', 'DNA template', 
-                'RNA template', 'expression plasmid', 'vector', 'CRISPR', 'CRISPR-Cas9', 'cloning vector',
-                'glycerol', 'competent cell', 'E.coli', 'BL21', 'DH5α', 'expression host', 'assembly mix', 'sequence',
-                'provirus', 'glucose', 'depc-treated'
-
-
-            ],
-            'Drugs': [
-                #Generic drugs
-                'drug', 'compound', 'chemical', 'inhibitor', 'small molecule', 'antibiotic', 'penicillin', 'amoxicillin', 'ciprofloxacin', 'azithromycin', 'cephalexin', 
-                'clindamycin', 'metronidazole', 'ampicillin', 'kanamycin', 'streptomycin', 'gentamicin', 'tetracycline', 'chloramphenicol', 
-                'penicillin', 'carbenicillin', 'antibiotic', 'small molecule', 'compound', 'chemical', 'inhibitor', 'aspirin', 'ibuprofen', 
-                'paracetamol', 'acetaminophen', 'statins', 'antiviral', 'aphidicolin', 'benzo(a)pyrene', 'doxycycline hyclate',
-                
-                #Antibiotics
-                'penicillin', 'streptomycin', 'ampicillin', 'kanamycin', 'tetracycline', 
-                'chloramphenicol', 'cephalosporin', 'erythromycin', 'rifampin', 'vancomycin', 
-                'gentamicin', 'ciprofloxacin', 'levofloxacin', 'azithromycin'
-
-                # Chemotherapy Drugs
-                'cisplatin', 'carboplatin', 'oxaliplatin', 'paclitaxel', 'docetaxel', 
-                'doxorubicin', 'epirubicin', 'cyclophosphamide', 'ifosfamide', 
-                'etoposide', 'irinotecan', 'topotecan', 'gemcitabine', 'vincristine', 
-                'vinblastine', 'vinorelbine', 'bleomycin', 'mitomycin', '5-fluorouracil', 
-                'capecitabine', 'methotrexate', 'pemetrexed', 'temozolomide', 'dacarbazine', 
-                'mechlorethamine', 'melphalan', 'busulfan', 'fludarabine', 'cladribine', 'OLAPARIB'],
-
-            'Chemical': [
-                'buffer', 'DMSO', 'ethanol', 'TCEP', 'methanol', 'glutaraldehyde', 
-                'SDS', 'Tris', 'HEPES', 'NaCl', 'TBE', 'formaldehyde', 'molecular biology', 'molecular'
-                'ammonia', 'glycine', 'crystal violet', 'ethyl cinnamate', 'iodonitrotetrazolium', 'Tetrakis(2-hydroxypropyl)',
-                'poly(ethylene glycol)', 'poly-l-lysine', 'protamine sulfate grade x', 'sulfo-smcc', 'tert-butanol'
-            ],
-            'Services (sequencing)': ['sequencing', 'service', 'genomics', 'WGS', 'long-read', 'sequencing service'],
-            'Services (one-time)': ['repair', 'installation', 'quote', 'service fee', 'one-time service', 'BSC'],
-            'Services (recurrent)': ['LN2', 'nitrogen', 'maintenance', 'subscription', 'recurring service', 'FY'],
-            'Office Supplies': ['ink cartridge', 'printer', 'stationery', 'WB Mason', 'pen', 'VWR Tape']
-        
-            }
-
-        # Original suppliers mapped to categories
-        drug_suppliers = ['MedChemExpress', 'SelleckChem', 'ApexBio']
-        enzyme_suppliers = ['New England Biolabs', 'NEB']
-        plasmid_suppliers = ['Addgene', 'addgene']
-        antibody_suppliers = ['Cell Signaling Technology']
-        office_supplies_suppliers = ['WB Mason']
-        mouse_suppliers = ['SoftMouse.NET','ISEEHEAR INC']
-        biological_suppliers = ['Integrated DNA Technologies', 'VectorBuilder'] 
-
-
-        # Normalization mapping for suppliers
-        supplier_aliases = {
-            'cell signaling': 'Cell Signaling Technology',
-            'sigma aldrich': 'Millipore Sigma',
-            'life tech': 'Life Technologies',
-            'wb mason': 'WB Mason',
-            'medchemexpress': 'MedChemExpress',
-            'med chem express': 'MedChemExpress',
-            'medchem express': 'MedChemExpress',
-            'selleckchem': 'SelleckChem',
-            'selleck chem': 'SelleckChem',
-            'selleckchemicals': 'SelleckChem',
-            'apexbio': 'ApexBio',
-            'apex bio': 'ApexBio',
-            'apexbiotechnology': 'ApexBio',
-            'neb': 'New England Biolabs',
-            'new england biolabs': 'New England Biolabs',
-            'thermo fisher': 'Thermo Fisher',
-            'invitrogen': 'Invitrogen',
-            'promega': 'Promega',
-            'bio-rad': 'Bio-Rad',
-            'qiagen': 'Qiagen',
-            'takara': 'Takara',
-            'roche': 'Roche',
-            'clontech': 'Clontech',
-            'agilent': 'Agilent',
-            'millipore': 'Millipore',
-            'ge healthcare': 'GE Healthcare',
-            'applied biosystems': 'Applied Biosystems',
-            'epicentre': 'Epicentre',
-            'softmouse.net': 'SoftMouse.NET',
-            'ISEEHEAR INC': 'ISEEHEAR INC',
-            'ISEEHEAR': 'ISEEHEAR INC',
-            'idt': 'Integrated DNA Technologies', 
-            'integrated dna technologies': 'Integrated DNA Technologies',
-            'integrated dna tech': 'Integrated DNA Technologies',
-            'vectorbuilder': 'VectorBuilder',  # Normalize VectorBuilder
-            'vector builder': 'VectorBuilder'
-        }
-
-
         # Step 1: Automatically find the 'name' column
         name_column = self.find_name_column()
 
         # Step 2: If not found, prompt the user to select the column
         if not name_column:
             column_names = self.sheet_data.columns.tolist()
-            name_column, ok = QInputDialog.getItem(
-                self.parent, "Select Name Column",
-                "Choose the column containing item names:", column_names, 0, False
-            )
+            with profiling_suspended():
+                name_column, ok = QInputDialog.getItem(
+                    self.parent, "Select Name Column",
+                    "Choose the column containing item names:", column_names, 0, False
+                )
             if not ok or not name_column:
                 QMessageBox.warning(self.parent, "Operation Cancelled", "No column was selected.")
                 return
@@ -1435,91 +1874,6 @@ class ExcelHandler:
             QMessageBox.warning(self.parent, "Missing Column", f"The current sheet does not contain a '{name_column}' column.")
             return
 
-        # Function to normalize supplier names
-        def normalize_supplier(supplier):
-            if not supplier:
-                return None
-
-            supplier_lower = supplier.lower().strip()
-
-            # Check for known supplier patterns
-            if "medchem" in supplier_lower:
-                return "MedChemExpress"
-            if "apex" in supplier_lower:
-                return "ApexBio"
-            if "selleck" in supplier_lower:
-                return "SelleckChem"
-            if 'neb' in supplier_lower:
-                return 'New England Biolabs'
-            if "idt" in supplier_lower or "integrated dna" in supplier_lower:
-                return "Integrated DNA Technologies"
-            if "vectorbuilder" in supplier_lower or "vector builder" in supplier_lower:
-                return "VectorBuilder"
-
-            # Return the original supplier if no match is found
-            return supplier
-
-        # Function to assign a category based on name and supplier
-        def assign_category(name, supplier):
-            name_lower = str(name).lower().strip()
-
-            # Check if 'cisplatin' is in the name (prioritized)
-            if "cisplatin" in name_lower:
-                return "Drugs"  # Prioritize 'cisplatin'
-
-
-            # Normalize supplier
-            normalized_supplier = normalize_supplier(supplier)
-
-                # Prioritized keyword matching
-            if "gel ink pen" in name_lower or ("pen" in name_lower and "gel" in name_lower):
-                return "Office Supplies"  # Prioritize gel ink pens
-            elif "western blot" in name_lower or ("gel" in name_lower and "blot" in name_lower):
-                return "W/S/N Blots"  # Secondary priority for western blot gels
-            elif "gel" in name_lower:
-                # Additional logic for generic gels if needed
-                return "W/S/N Blots"  # Default to blot gels
-
-            # Check supplier-based categorization
-            if normalized_supplier in drug_suppliers:
-                return 'Drugs'
-            if normalized_supplier in enzyme_suppliers:
-                return 'Biological'
-            if normalized_supplier in plasmid_suppliers:
-                return 'Biological'
-            if normalized_supplier in antibody_suppliers:
-                return 'Antibodies'
-            if normalized_supplier in office_supplies_suppliers:
-                return 'Office Supplies'
-            # Check supplier-based categorization
-            if normalized_supplier in ["MedChemExpress", "ApexBio", "SelleckChem"]:
-                return 'Drugs'
-                # Check for supplier-specific categorization
-            if normalized_supplier in biological_suppliers:
-                return 'Biological'
-            if normalized_supplier in mouse_suppliers:
-                return 'Mouse Work'
-
-            # Check name-based categorization
-            for category, keywords in categories.items():
-                if any(keyword.lower() in name_lower for keyword in keywords):
-                    return category
-
-            # Specific Category Matching
-            specific_category_keywords = {
-                'Antibodies': ['mouse antibody', 'rabbit antibody', 'goat antibody'],
-                'Mouse Work': ['mouse cage', 'mouse bedding', 'animal cage']
-            }
-            for category, specific_keywords in specific_category_keywords.items():
-                if any(keyword.lower() in name_lower for keyword in specific_keywords):
-                    return category
-
-            # General Category Matching
-            for category, keywords in categories.items():
-                if any(keyword.lower() in name_lower for keyword in keywords):
-                    return category
-
-            return 'Others'
 
         try:
             
@@ -1527,25 +1881,19 @@ class ExcelHandler:
             self.sheet_data.columns = [col.lower() for col in self.sheet_data.columns]
 
             # Step 4: Categorize each item based on name and supplier
-            self.sheet_data['category'] = self.sheet_data.apply(
-                lambda row: assign_category(row[name_column], row.get('supplier', '')), axis=1
-            )
+            self.categorize_sheet(name_column, 'category')
 
             # Ensure a 'cost' column exists (case-insensitive)
             if 'cost' not in self.sheet_data.columns:
                 QMessageBox.warning(self.parent, "Missing Column", "The current sheet does not contain a 'Cost' column.")
                 return
 
-            # Step 5: Clean and convert the 'cost' column to numeric
-            self.sheet_data['cost'] = self.sheet_data['cost'].replace(
-                r'[^0-9.]', '', regex=True  # Remove all non-numeric characters except decimal points
-            )
-            
-            # Replace empty strings or invalid values with 0 and convert to float
-            self.sheet_data['cost'] = self.sheet_data['cost'].replace('', '0').astype(float)
+            # Step 5: Clean and convert the 'cost' column to numeric (blanks and invalid values become 0)
+            self.sheet_data['cost'] = clean_cost_series(self.sheet_data['cost'])
+            self.aggregate_cache.invalidate(self.sheet_data)
 
             # Step 6: Group data by the 'category' column, calculate counts and total costs
-            category_summary = self.sheet_data.groupby('category').agg(
+            category_summary = self.sheet_data.groupby('category', observed=True).agg(
                 Count=('category', 'size'),
                 Total_Cost=('cost', 'sum')
             ).reset_index()
@@ -1580,38 +1928,333 @@ class ExcelHandler:
 
 
 
+    def create_dashboard_tab(self):
+        """Dashboard with spend over time, top suppliers, categories and grant utilization."""
+        dashboard = QWidget()
+        layout = QVBoxLayout(dashboard)
+
+        # Sheet and date range selection
+        controls_layout = QHBoxLayout()
+        controls_layout.addWidget(QLabel("Sheet:"))
+        self.dashboard_sheet_combo = QComboBox()
+        self.dashboard_sheet_combo.currentTextChanged.connect(self.on_dashboard_sheet_changed)
+        controls_layout.addWidget(self.dashboard_sheet_combo)
+
+        controls_layout.addWidget(QLabel("From:"))
+        self.dashboard_start_edit = QDateEdit()
+        self.dashboard_start_edit.setCalendarPopup(True)
+        self.dashboard_start_edit.dateChanged.connect(lambda: self.refresh_dashboard())
+        controls_layout.addWidget(self.dashboard_start_edit)
+
+        controls_layout.addWidget(QLabel("To:"))
+        self.dashboard_end_edit = QDateEdit()
+        self.dashboard_end_edit.setCalendarPopup(True)
+        self.dashboard_end_edit.dateChanged.connect(lambda: self.refresh_dashboard())
+        controls_layout.addWidget(self.dashboard_end_edit)
+
+        self.dashboard_all_dates = QCheckBox("All Dates")
+        self.dashboard_all_dates.setChecked(True)
+        self.dashboard_all_dates.stateChanged.connect(lambda: self.refresh_dashboard())
+        controls_layout.addWidget(self.dashboard_all_dates)
+
+        self.dashboard_total_label = QLabel("")
+        self.dashboard_total_label.setStyleSheet("font-size: 14px; color: black;")
+        controls_layout.addWidget(self.dashboard_total_label)
+        layout.addLayout(controls_layout)
+
+        # One persistent canvas per chart
+        charts_layout = QGridLayout()
+        self.dashboard_canvases = {}
+        for position, chart in enumerate(['spend', 'suppliers', 'categories', 'grants']):
+            canvas = PlotCanvas()
+            chart_layout = QVBoxLayout()
+            chart_layout.addWidget(canvas.make_toolbar())  # Zoom and pan
+            chart_layout.addWidget(canvas)
+            charts_layout.addLayout(chart_layout, position // 2, position % 2)
+            self.dashboard_canvases[chart] = canvas
+        layout.addLayout(charts_layout)
+        return dashboard
+
+    def show_dashboard(self):
+        """Bring the dashboard up to date with the current sheets when its tab is opened."""
+        self.aggregate_cache.refresh(self.sheet_dict)
+
+        current = self.dashboard_sheet_combo.currentText()
+        self.dashboard_sheet_combo.blockSignals(True)
+        self.dashboard_sheet_combo.clear()
+        self.dashboard_sheet_combo.addItems(list(self.sheet_dict.keys()))
+        if current in self.sheet_dict:
+            self.dashboard_sheet_combo.setCurrentText(current)
+        self.dashboard_sheet_combo.blockSignals(False)
+        self.on_dashboard_sheet_changed(self.dashboard_sheet_combo.currentText())
+
+    def on_dashboard_sheet_changed(self, sheet_name):
+        """Reset the date range to the span of the newly selected sheet, then redraw."""
+        if sheet_name not in self.sheet_dict:
+            return
+        span = self.aggregate_cache.get(sheet_name, self.sheet_dict[sheet_name]).date_span()
+        if span is not None:
+            for date_edit, day in ((self.dashboard_start_edit, span[0]), (self.dashboard_end_edit, span[1])):
+                date_edit.blockSignals(True)
+                date_edit.setDate(QDate(day.year, day.month, day.day))
+                date_edit.blockSignals(False)
+        self.refresh_dashboard()
+
+    def refresh_dashboard(self):
+        """Redraw every dashboard chart from the sheet's pre-aggregated cells."""
+        sheet_name = self.dashboard_sheet_combo.currentText()
+        if sheet_name not in self.sheet_dict:
+            return
+
+        try:
+            aggregates = self.aggregate_cache.get(sheet_name, self.sheet_dict[sheet_name])
+            if self.dashboard_all_dates.isChecked():
+                start = end = None
+            else:
+                start = self.dashboard_start_edit.date().toPyDate()
+                end = self.dashboard_end_edit.date().toPyDate()
+
+            total, rows = aggregates.totals(start, end)
+            self.dashboard_total_label.setText(f"Total: ${total:,.2f} ({rows} rows)")
+
+            canvases = self.dashboard_canvases
+            monthly = aggregates.spend_by_month(start, end)
+            canvases['spend'].plot_series(monthly.index, monthly.to_numpy(), "Spend Over Time", "Month", "Cost", x_is_date=True)
+            suppliers = aggregates.top_suppliers(start, end)
+            canvases['suppliers'].plot_categories(suppliers.index, suppliers.to_numpy(), "Top Suppliers", "Supplier", "Cost")
+            categories = aggregates.category_breakdown(start, end)
+            canvases['categories'].plot_categories(categories.index, categories.to_numpy(), "Cost by Category", "Category", "Cost")
+            utilization = grant_utilization(self.grant_management.grant_data)
+            canvases['grants'].plot_categories(utilization.index, utilization.to_numpy(), "Grant Utilization", "Grant", "% Allocated")
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"An error occurred while updating the dashboard: {str(e)}")
+
+    def selected_row_positions(self):
+        """Positions (in self.sheet_data) of the rows selected in the current tab."""
+        table_widget = self.tab_widget.currentWidget()
+        if not isinstance(table_widget, QTableWidget):
+            return []
+        return sorted(set(item.row() for item in table_widget.selectedItems()))
+
+    def check_grant_eligibility(self):
+        """Add the grants whose Allowed Items match each row of the current sheet."""
+        if self.sheet_data is None:
+            QMessageBox.warning(self.parent, "No Data", "No data has been loaded. Please upload an Excel file first.")
+            return
+
+        try:
+            matcher = GrantRuleMatcher(self.grant_management.grant_data)
+            matches = matcher.match_rows(self.sheet_data)
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"An error occurred while matching grant rules: {str(e)}")
+            return
+
+        for col in matches.columns:
+            self.sheet_data[col] = matches[col]
+        self.aggregate_cache.invalidate(self.sheet_data)
+
+        # Redraw the current tab with the new columns
+        if self.tab_widget.currentWidget() is self.dashboard_widget:
+            QMessageBox.information(self.parent, "Grant Eligibility", "Eligibility columns were added to the last sheet viewed.")
+            return
+        index = self.tab_widget.currentIndex()
+        sheet_name = self.tab_widget.tabText(index)
+        table_widget = self.create_table_widget(self.sheet_data.astype(object).where(self.sheet_data.notna(), ""))
+        table_widget.itemSelectionChanged.connect(lambda: self.update_selected_sum(table_widget))
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, table_widget, sheet_name)
+        self.tab_widget.setCurrentIndex(index)
+
+        unmatched = int((matches['eligible grants'] == "").sum())
+        QMessageBox.information(
+            self.parent, "Grant Eligibility",
+            f"{len(matches) - unmatched} of {len(matches)} rows match at least one grant's Allowed Items."
+        )
+
     def allocate_costs_to_grant(self):
         """Allocate the selected costs to the selected grant."""
         selected_grant = self.grant_combo.currentText()
         selected_sum = float(re.sub(r'[^\d.]', '', self.selected_sum_label.text().split('$')[1]))
 
         grant_data = self.grant_management.get_grant_data(selected_grant)
+        if grant_data is None or grant_data.empty:
+            QMessageBox.warning(self.parent, "Grant Not Found", f"The selected grant {selected_grant} could not be found.")
+            return
 
-        if grant_data is not None:
-            total_grant_amount = grant_data['Total Balance'].iloc[0]
+        # Flag selected rows that the grant's Allowed Items do not cover
+        selected_rows = self.selected_row_positions()
+        if selected_rows and self.sheet_data is not None:
+            matcher = GrantRuleMatcher(self.grant_management.grant_data)
+            selected_data = self.sheet_data.iloc[selected_rows]
+            violations = selected_data[~matcher.eligibility_mask(selected_data, selected_grant)]
+            if not violations.empty:
+                name_column = self.find_name_column()
+                examples = violations[name_column].astype(str).head(10).tolist() if name_column else []
+                with profiling_suspended():
+                    reply = QMessageBox.question(
+                        self.parent, "Allowed Items Check",
+                        f"{len(violations)} of {len(selected_rows)} selected rows do not match the Allowed Items of "
+                        f"{selected_grant}:\n" + "\n".join(examples) + "\n\nAllocate anyway?",
+                        QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+                    )
+                if reply != QMessageBox.Yes:
+                    return
 
-            # Safely access 'Allocated Costs' and handle cases where it may not exist
-            if 'Allocated Costs' in grant_data.columns:
-                allocated_cost = grant_data['Allocated Costs'].iloc[0]
-            else:
-                # Initialize 'Allocated Costs' to 0 if the column does not exist
-                allocated_cost = 0
-                self.grant_management.update_grant_data(selected_grant, 'Allocated Costs', allocated_cost)
+        total_grant_amount = grant_data['Total Balance'].iloc[0]
 
-            # Add the selected sum to the allocated costs
-            updated_allocated_cost = allocated_cost + selected_sum
-            net_amount = total_grant_amount - updated_allocated_cost
+        # Safely access 'Allocated Costs' and handle cases where it may not exist
+        if 'Allocated Costs' in grant_data.columns:
+            allocated_cost = grant_data['Allocated Costs'].iloc[0]
+        else:
+            # Initialize 'Allocated Costs' to 0 if the column does not exist
+            allocated_cost = 0
+            self.grant_management.update_grant_data(selected_grant, 'Allocated Costs', allocated_cost)
+
+        # Add the selected sum to the allocated costs
+        updated_allocated_cost = allocated_cost + selected_sum
+        net_amount = total_grant_amount - updated_allocated_cost
+
+        # Update grant data with the new allocated costs and net amount
+        self.grant_management.update_grant_data(selected_grant, 'Allocated Costs', updated_allocated_cost)
+        self.grant_management.update_grant_data(selected_grant, 'Net Amount', net_amount)
+        self.grant_management.add_allocated_cost(grant_data['Grant ID'].iloc[0], selected_sum)  # Dated ledger entry for forecasting
+        if selected_rows:
+            self.mark_allocated_rows(selected_rows, [selected_grant] * len(selected_rows))  # Skipped by Auto-Allocate
+
+        # Update the UI with the new net amount
+        self.net_amount_label.setText(f"Net Amount in Grant: ${net_amount:.2f}")
+
+        QMessageBox.information(self.parent, "Costs Allocated", f"Successfully allocated ${selected_sum:.2f} to the {selected_grant} grant.")
+
+    def auto_allocate_costs(self):
+        """Propose an allocation of all unallocated rows across grants and let the user preview it before committing."""
+        if self.sheet_data is None or 'cost' not in self.sheet_data.columns:
+            QMessageBox.warning(self.parent, "Missing Column", "The current sheet does not contain a 'Cost' column.")
+            return
 
-            # Update grant data with the new allocated costs and net amount
-            self.grant_management.update_grant_data(selected_grant, 'Allocated Costs', updated_allocated_cost)
-            self.grant_management.update_grant_data(selected_grant, 'Net Amount', net_amount)
+        # Grants without Allowed Items accept anything, so they only take rows if the user agrees
+        grant_data = self.grant_management.grant_data
+        unrestricted = [grant_data['Grant Name'].iloc[index] for index in sorted(GrantRuleMatcher(grant_data).unrestricted)]
+        include_unrestricted = False
+        if unrestricted:
+            with profiling_suspended():
+                reply = QMessageBox.question(
+                    self.parent, "Grants Without Allowed Items",
+                    f"{', '.join(map(str, unrestricted))} list no Allowed Items and would accept any item.\n\n"
+                    "Use them for items that match no other grant?",
+                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+                )
+            include_unrestricted = reply == QMessageBox.Yes
 
-            # Update the UI with the new net amount
-            self.net_amount_label.setText(f"Net Amount in Grant: ${net_amount:.2f}")
+        # Rows allocated before, e.g. in an earlier session of this workbook, are not planned again
+        if apply_allocation_marks(self.sheet_data, load_allocation_marks(self.allocation_marks_path)):
+            self.refresh_current_table([ALLOCATED_GRANT_COLUMN])
 
-            QMessageBox.information(self.parent, "Costs Allocated", f"Successfully allocated ${selected_sum:.2f} to the {selected_grant} grant.")
-        else:
-            QMessageBox.warning(self.parent, "Grant Not Found", f"The selected grant {selected_grant} could not be found.")
+        try:
+            plan, summary = plan_allocation(self.sheet_data, grant_data, include_unrestricted)
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"An error occurred while planning the allocation: {str(e)}")
+            return
+
+        if plan.empty:
+            QMessageBox.information(self.parent, "Nothing to Allocate", "All rows with a cost are already allocated.")
+            return
+
+        dialog = QDialog(self.parent)
+        dialog.setWindowTitle("Allocation Plan Preview")
+        dialog.setStyleSheet("background-color: #cce7ff;")
+        dialog.resize(1000, 700)
+        layout = QVBoxLayout()
+
+        placed = plan[plan['grant'] != ""]
+        info_label = QLabel(
+            f"{len(placed)} of {len(plan)} unallocated rows can be allocated (${placed['cost'].sum():.2f} of "
+            f"${plan['cost'].sum():.2f}). Rows without a grant match no Allowed Items or exceed every balance."
+        )
+        info_label.setWordWrap(True)
+        info_label.setStyleSheet("font-size: 14px; color: black;")
+        layout.addWidget(info_label)
+
+        # Proposed grant per row
+        name_column = self.find_name_column()
+        preview = pd.DataFrame({
+            'Item': self.sheet_data[name_column].iloc[plan['row']].astype(str).to_numpy() if name_column else plan['row'] + 1,
+            'Cost': plan['cost'].map(lambda value: f"${value:.2f}"),
+            'Proposed Grant': plan['grant'],
+            'Match Score': plan['score'],
+        })
+        layout.addWidget(self.create_table_widget(preview))
+
+        # Balances per grant
+        summary_label = QLabel("Grant Balances:")
+        summary_label.setStyleSheet("font-size: 14px; color: black;")
+        layout.addWidget(summary_label)
+        layout.addWidget(self.create_table_widget(summary))
+
+        button_box = QDialogButtonBox()
+        commit_button = button_box.addButton("Commit Allocation", QDialogButtonBox.AcceptRole)
+        commit_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
+        button_box.addButton(QDialogButtonBox.Cancel)
+        button_box.accepted.connect(dialog.accept)
+        button_box.rejected.connect(dialog.reject)
+        layout.addWidget(button_box)
+
+        dialog.setLayout(layout)
+        with profiling_suspended():
+            result = dialog.exec_()
+        if result == QDialog.Accepted:
+            self.commit_allocation_plan(plan, summary)
+
+    def commit_allocation_plan(self, plan, summary):
+        """Apply an allocation plan: update grant balances, record the costs and mark the rows as allocated."""
+        grant_data = self.grant_management.grant_data
+
+        # Step 1: Update each grant that receives costs
+        for _, grant in summary[summary['Planned'] > 0].iterrows():
+            grant_name = grant['Grant Name']
+            current = grant_data.loc[grant_data['Grant Name'] == grant_name]
+            allocated_cost = 0.0
+            if 'Allocated Costs' in current.columns and pd.notna(current['Allocated Costs'].iloc[0]):
+                allocated_cost = float(current['Allocated Costs'].iloc[0])
+            updated_allocated_cost = allocated_cost + grant['Planned']
+            net_amount = float(current['Total Balance'].iloc[0]) - updated_allocated_cost
+
+            self.grant_management.update_grant_data(grant_name, 'Allocated Costs', updated_allocated_cost)
+            self.grant_management.update_grant_data(grant_name, 'Net Amount', net_amount)
+            self.grant_management.add_allocated_cost(grant['Grant ID'], grant['Planned'])
+
+        # Step 2: Mark the rows, so they are skipped next time
+        placed = plan[plan['grant'] != ""]
+        self.mark_allocated_rows(placed['row'].to_numpy(), placed['grant'].to_numpy())
+
+        # Step 3: Show the net amount of the grant selected in the combo box
+        selected = self.grant_management.get_grant_data(self.grant_combo.currentText())
+        if not selected.empty and 'Net Amount' in selected.columns:
+            self.net_amount_label.setText(f"Net Amount in Grant: ${float(selected['Net Amount'].iloc[0]):.2f}")
+
+        QMessageBox.information(
+            self.parent, "Costs Allocated",
+            f"Allocated ${placed['cost'].sum():.2f} across {placed['grant'].nunique()} grants ({len(placed)} rows)."
+        )
+
+    def mark_allocated_rows(self, rows, grant_names):
+        """
+        Write the grants into the sheet's ALLOCATED_GRANT_COLUMN and record them in the marks
+        file, so the rows are not allocated again, also after the workbook is reloaded.
+        """
+        if ALLOCATED_GRANT_COLUMN not in self.sheet_data.columns:
+            self.sheet_data[ALLOCATED_GRANT_COLUMN] = pd.Series("", index=self.sheet_data.index, dtype=object)
+        column_position = self.sheet_data.columns.get_loc(ALLOCATED_GRANT_COLUMN)
+        self.sheet_data.iloc[rows, column_position] = grant_names
+        self.aggregate_cache.invalidate(self.sheet_data)
+        self.refresh_current_table([ALLOCATED_GRANT_COLUMN])
+
+        marks = load_allocation_marks(self.allocation_marks_path)
+        record_allocation_marks(marks, self.sheet_data, rows, grant_names)
+        try:
+            save_allocation_marks(self.allocation_marks_path, marks)
+        except OSError as e:
+            QMessageBox.warning(self.parent, "Allocation", f"The allocated rows could not be recorded: {str(e)}")
 
     def add_categorize_and_group_button(self):
         """
@@ -1620,9 +2263,166 @@ class ExcelHandler:
         categorize_button = QPushButton("Categorize and Group Items")
         categorize_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
         categorize_button.setFixedHeight(35)
-        categorize_button.clicked.connect(self.categorize_and_group_items)
+        categorize_button.clicked.connect(lambda: self.categorize_and_group_items())
         self.right_button_layout.addWidget(categorize_button)
 
+    def categorize_sheet(self, name_column, category_column):
+        """
+        Categorize the current sheet, showing progress while new items are classified. Adds the
+        category column plus '<category> rule' and '<category> match' columns telling which rule
+        fired and on which term, to make misclassified rows easy to debug.
+        """
+        progress = QProgressDialog("Categorizing items...", None, 0, 100, self.parent)
+        progress.setWindowTitle("Categorize Items")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)  # Only shown when classification takes a while
+
+        def report_progress(done, total):
+            progress.setValue(int(done * 100 / total))
+            progress.setLabelText(f"Categorizing items... {done} of {total} distinct items")
+            QApplication.processEvents()
+
+        try:
+            with profile_phase("match category rules", rows=len(self.sheet_data)):
+                explained = explain_rows(
+                    self.sheet_data, name_column, self.supplier_resolver, self.category_memo,
+                    progress_callback=report_progress
+                )
+        finally:
+            progress.close()
+
+        self.supplier_resolver.save()
+        self.category_memo.save()
+
+        # Items no rule matched get the classifier's category when it is confident enough
+        with profile_phase("fallback classifier"):
+            apply_fallback(explained, self.sheet_data[name_column], self.fallback_classifier)
+
+        # Match the capitalization of the category column
+        rule_suffix, match_suffix = ("Rule", "Match") if category_column.istitle() else ("rule", "match")
+        self.sheet_data[category_column] = explained['category']
+        self.sheet_data[f"{category_column} {rule_suffix}"] = explained['rule']
+        self.sheet_data[f"{category_column} {match_suffix}"] = explained['matched_term']
+        self.aggregate_cache.invalidate(self.sheet_data)  # Same frame and columns when re-categorized
+
+    def run_monthly_close(self):
+        """Run the whole month-end close over the open sheets and save one consolidated workbook."""
+        if not getattr(self, 'sheet_dict', None):
+            QMessageBox.warning(self.parent, "No Data", "No data has been loaded. Please upload an Excel file first.")
+            return
+
+        with profiling_suspended():
+            month, ok = QInputDialog.getItem(
+                self.parent, "Monthly Close", "Month to close:", [ALL_MONTHS] + available_months(self.sheet_dict), 0, False
+            )
+        if not ok:
+            return
+        default_name = "monthly_close.xlsx" if month == ALL_MONTHS else f"monthly_close_{month}.xlsx"
+        with profiling_suspended():
+            output_path, _ = QFileDialog.getSaveFileName(self.parent, "Save Monthly Close", default_name, "Excel Files (*.xlsx)")
+        if not output_path:
+            return
+
+        progress = QProgressDialog("Running monthly close...", None, 0, 100, self.parent)
+        progress.setWindowTitle("Monthly Close")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def report_progress(done, total, stage_name):
+            progress.setValue(int(done * 100 / total))
+            progress.setLabelText(f"Running monthly close... {stage_name}")
+            QApplication.processEvents()
+
+        try:
+            log = run_monthly_close(
+                self.sheet_dict, self.grant_management.grant_data, output_path, month=month,
+                resolver=self.supplier_resolver, memo=self.category_memo, progress_callback=report_progress
+            )
+            self.supplier_resolver.save()
+            self.category_memo.save()
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"An error occurred during the monthly close: {str(e)}")
+            return
+        finally:
+            progress.close()
+
+        summary = "\n".join(f"{row.stage}: {row.status} ({row.details})" for row in log.itertuples())
+        QMessageBox.information(self.parent, "Monthly Close", f"Saved to {output_path}\n\n{summary}")
+
+    def generate_chart_report(self):
+        """Render the standard chart pack of workbooks or a folder into a multi-page PDF."""
+        with profiling_suspended():
+            source, ok = QInputDialog.getItem(self.parent, "Chart Report", "Create the report from:", ["Files", "Folder"], 0, False)
+        if not ok:
+            return
+        if source == "Folder":
+            with profiling_suspended():
+                folder = QFileDialog.getExistingDirectory(self.parent, "Select Folder of Workbooks", self.save_directory)
+            paths = [folder] if folder else []
+        else:
+            with profiling_suspended():
+                paths, _ = QFileDialog.getOpenFileNames(self.parent, "Select Workbooks", self.save_directory, DATA_FILE_FILTER)
+        if not paths:
+            return
+
+        with profiling_suspended():
+            output_path, _ = QFileDialog.getSaveFileName(self.parent, "Save Report", "chart_report.pdf", "PDF Files (*.pdf)")
+        if not output_path:
+            return
+        if not output_path.lower().endswith(".pdf"):
+            output_path += ".pdf"
+
+        progress = QProgressDialog("Rendering charts...", None, 0, 100, self.parent)
+        progress.setWindowTitle("Chart Report")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def report_progress(done, total):
+            progress.setValue(int(done * 100 / total))
+            progress.setLabelText(f"Rendering charts... page {done} of {total}")
+            QApplication.processEvents()
+
+        try:
+            page_count = generate_report(
+                paths, self.grant_management.grant_data, output_path,
+                ledger=self.grant_management.allocated_costs, progress_callback=report_progress
+            )
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"An error occurred while generating the report: {str(e)}")
+            return
+        finally:
+            progress.close()
+
+        QMessageBox.information(self.parent, "Chart Report", f"Saved a {page_count}-page report to {output_path}")
+
+    def train_fallback_classifier(self):
+        """Train the 'Others' fallback classifier on the categorized history of saved files."""
+        if not classifier_available():
+            QMessageBox.warning(
+                self.parent, "Missing Package",
+                "The fallback classifier needs scikit-learn. Install it with 'pip install scikit-learn'."
+            )
+            return
+
+        cache_directory = self.folder_watcher.cache_directory if self.folder_watcher is not None else os.path.join(self.save_directory, ".cache")
+        if not os.path.isdir(cache_directory):
+            QMessageBox.warning(self.parent, "No History", "No processed files were found. Upload some inventory files first.")
+            return
+
+        try:
+            examples = training_examples_from_cache(cache_directory)
+            classifier = FallbackClassifier().fit(examples['name'], examples['category'])
+            classifier.save(self.fallback_model_path)
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"An error occurred while training the classifier: {str(e)}")
+            return
+
+        self.fallback_classifier = classifier
+        QMessageBox.information(
+            self.parent, "Classifier Trained",
+            f"Trained on {len(examples)} categorized items in {len(classifier.categories)} categories."
+        )
+
     def categorize_and_group_items(self):
         """
         Categorize items in the 'general + cost' sheet into predefined categories,
@@ -1637,239 +2437,17 @@ class ExcelHandler:
         try:
 
             logging.basicConfig(level=logging.DEBUG)
-            # Extended categories with keywords
-            categories = {
-                    'Media': [
-                        # General media
-                        'media', 'PBS', 'cell-culture', 'cell culture media', 'DMEM', 'RPMI', 'EMEM', 
-                        'McCoy', 'IMDM', 'F-12', 'Ham\'s F-12', 'MEM', 'AMEM', 'α-MEM', 'Basal Medium Eagle',
-                        'L-15', 'Leibovitz\'s L-15', 'Hank\'s Balanced Salt Solution', 'HBSS', 'Eagle\'s Medium', 
-                        'Williams\' Medium E', 'Coon\'s Modified Ham\'s F-12', 'serum-free medium', 
-                        'low-glucose medium', 'high-glucose medium', 'DMEM/F-12', 'RPMI-1640', 'keratinocyte medium',
-                        
-                        # Neutralizers and derivatives
-                        'trypsin', 'trypsin-EDTA', 'trypsin neutralizer', 'TrypLE', 'trypsin substitute', 
-                        'neutralizing solution', 'EDTA', 'collagenase', 'dispase', 'accutase', 
-                        'cell dissociation solution', 'cell detachment solution', 'trypsin inhibitor',
-                        
-                        # Supplements and additives
-                        'glutamine', 'L-glutamine', 'sodium pyruvate', 'non-essential amino acids', 
-                        'NEAA', 'FBS', 'fetal bovine serum', 'bovine serum', 'horse serum', 'cell culture grade water',
-                        'water for injection', 'sterile water', 'distilled water', 'di water', 'ultrapure water',
-                        
-                        # Specialized media
-                        'neural stem cell medium', 'mesenchymal stem cell medium', 'embryonic stem cell medium',
-                        'organoid culture media', 'hepatocyte media', 'airway epithelial cell media',
-                        'fibroblast growth medium', 'skeletal muscle cell media', 'chondrocyte media', 
-                        'endothelial growth medium', 'epithelial cell growth medium', 'keratinocyte serum-free medium',
-                        
-                        # Growth additives
-                        'growth factor supplement', 'b27 supplement', 'N2 supplement', 'bfgf', 'EGF', 'insulin', 
-                        'transferrin', 'selenium', 'hydrocortisone', 'dexamethasone', 'ascorbic acid', 'retinoic acid'
-                    ],
-                    'W/S/N Blots': [
-                        'blot', 'western', 'southern', 'northern', 'gel', 'membrane', 'buffer', 'stain', 'substrate', 
-                        'PAGE', 'SDS-PAGE', 'acrylamide', 'electrophoresis', 'ladder', 'marker', 'staining', 'mounting',
-                        'HRP', 'chemiluminescent', 'chemiluminescence', 'fluorescent dye', 'immunoblot', 'immunoblotting', 
-                        'transfer buffer', 'running buffer', 'blotting buffer', 'wash buffer', 'blocking buffer',
-                        'PVDF', 'nitrocellulose', 'immobilon', 'BCA', 'Coomassie', 'silver stain', 'Ponceau', 
-                        'NuPAGE', 'Bis-Tris', 'Tris-Glycine', 'MES buffer', 'MOPS buffer', 'transfer membrane',
-                        'gel loading dye', 'protein ladder', 'DNA ladder', 'protein stain', 'anti-HRP', 'fluorescent marker',
-                        'secondary detection', 'imaging substrate', 'ECL', 'enhanced chemiluminescence',
-                        'polyacrylamide gel', 'Western substrate', 'Coomassie blue', 'chromogenic substrate',
-                        'hybridization buffer', 'washing reagent', 'autoradiography', 'electroblotting', 'LDS Sample Buf', 'TBS w TWEEN TBST'
-                    ],
-                    'Antibodies': [
-                        'antibody', 'antibodies', 'mAb', 'IgG', 'phospho', 'phospho-', 
-                        'rabbit', 'mouse', 'goat', 'anti-', 'affinipure', 'monoclonal',
-                        'secondary antibody', 'primary antibody', 'HRP-conjugated',
-                        'Alexa Fluor', 'AF488', 'AF568', 'AF594', 'FITC', 'APC',
-                        'Cy3', 'Cy5', 'Dylight', 'fluorescent antibody', 'polyclonal', 
-                        'isotype control', 'conjugated antibody', 'biotinylated antibody', 
-                        'peroxidase', 'HRP', 'AP (alkaline phosphatase)', 'ELISA antibody',
-                        'immunoblot antibody', 'immunohistochemistry', 'IHC', 'ICC', 
-                        'immunofluorescence', 'flow cytometry', 'western blot',
-
-                        ## specific antibodies
-                        'Hu Vimentin PE'
-                    ],
-                    'Flasks, Tips, etc.': [
-                        'flask', 'flasks', 'Erlenmeyer flask', 'Erlenmeyer flasks', 'Conical flask', 'Conical flasks','well', 'wells',
-                        'Cell culture flask', 'Cell culture flasks', 'Round-bottom flask', 'Round-bottom flasks',
-                        'Volumetric flask', 'Volumetric flasks', 'Vacuum flask', 'Vacuum flasks', 'Filtering flask', 'Filtering flasks',
-                        'tip', 'tips', 'pipet', 'pipets', 'pipette', 'pipettes', 'pipette tip', 'pipette tips',
-                        'filter tip', 'filter tips', 'gel-loading tip', 'gel-loading tips', 'multi-channel tip', 'multi-channel tips',
-                        'serological pipette', 'serological pipettes', 'manual pipette', 'manual pipettes', 'automatic pipette',
-                        'automatic pipettes', 'multichannel pipette', 'multichannel pipettes', 'micropipette', 'micropipettes',
-                        'repeater pipette', 'repeater pipettes', 'transfer pipette', 'transfer pipettes', 'glass pipette', 'glass pipettes',
-                        'tube', 'tubes', 'centrifuge tube', 'centrifuge tubes', 'cryogenic tube', 'cryogenic tubes', 'chambers',
-                        'microcentrifuge tube', 'microcentrifuge tubes', 'PCR tube', 'PCR tubes', 'glass tube', 'glass tubes',
-                        'Falcon tube', 'Falcon tubes', 'Eppendorf tube', 'Eppendorf tubes', 'test tube', 'test tubes',
-                        'storage tube', 'storage tubes', 'plts' ,'plate', 'plates', 'cell culture plate', 'cell culture plates',
-                        'microplate', 'microplates', 'petri plate', 'petri plates', 'ELISA plate', 'ELISA plates',
-                        'PCR plate', 'PCR plates', 'multi-well plate', 'multi-well plates', 'sealing plate', 'sealing plates',
-                        'box', 'boxes', 'storage box', 'storage boxes', 'cryogenic box', 'cryogenic boxes', 'freezer box', 'freezer boxes',
-                        'microtube box', 'microtube boxes', 'tip box', 'tip boxes', 'tube rack', 'tube racks',
-                        'autoclave-safe box', 'autoclave-safe boxes', 'syringe', 'syringes', 'disposable syringe', 'disposable syringes',
-                        'glass syringe', 'glass syringes', 'luer-lock syringe', 'luer-lock syringes', 'syringe filter', 'syringe filters',
-                        'insulin syringe', 'insulin syringes', 'rack', 'racks', 'holder', 'holders', 'pipette rack', 'pipette racks',
-                        'pipet rack', 'pipet racks', 'plate rack', 'plate racks', 'tube rack', 'tube racks', 'freezer rack', 'freezer racks',
-                        'test tube rack', 'test tube racks', 'cryovial', 'cryovials', 'cryobox', 'cryoboxes', '384', 'allprotect tissue reagent',
-                        'coutness', 'cryoelite', 'FBM', 'VWR BASIN'
-                        'nitrogen storage rack', 'sterile container', 'sterile containers', 'sample vial', 'sample vials',
-                        'funnel', 'funnels', 'glass slide', 'glass slides', 'coverslip', 'coverslips', 'weigh boat', 'weigh boats',
-                        'measuring cylinder', 'measuring cylinders', 'spray bottle', 'spray bottles', 'lab tray', 'lab trays', 'T.I.P.S.',
-                        'drip tray', 'drip trays', 'cell strainer', 'cell strainers', 'reservoir tray', 'reservoir trays', 'beaker', 'beakers', 'gloves', 'glove'
-                    ],
-                    'Assays': [
-                        'assay', 'CyQUANT', 'DNeasy', 'Glo', 'immuno', 'ChIP', 'EdU', 'FITC', 'flow cytometry', 'mycoplasma', 'purelink hipure'
-                    ],
-                    'Mouse Work': [
-                        'mouse', 'animal', 'rack', 'cage', 'rodent', 'bedding', 'scale', 'feeding', 'syringe for mouse', 
-                        'mouse holder', 'animal cage'
-                    ],
-                    'Biological': [
-                        # Existing items
-                        'Lipofectamine', 'KAPA', 'concentrator', 'concentrators', 'goat serum', 'serum', 
-                        'primers', 'primer', 'plasmid', 'glycerol stock', 'gBlock', 'lentivirus', 'Cas9', 'virus'
-                        
-                        # Enzymes and enzyme-related terms
-                        'enzyme', 'restriction enzyme', 'ligase', 'polymerase', 'reverse transcriptase',
-                        'DNA ligase', 'RNA polymerase', 'nuclease', 'endonuclease', 'exonuclease', 
-                        'DNA polymerase', 'RNase', 'RNase inhibitor', 'phosphatase', 'kinase', 
-                        'T4 ligase', 'Taq polymerase', 'Q5 polymerase', 'EcoRI', 'BamHI', 'NotI', 'HindIII',
-                        'restriction digestion', 'digestion enzyme', 'proteinase K', 'Klenow fragment',
-                        'DNase', 'DNAse I', 'methylase', 'NEBuilder', 'HiFi DNA Assembly', 'nickase',
-                        
-                        # NEB-specific items
-                        'NEB', 'New England Biolabs', 'NEBuilder HiFi', 'Q5 Master Mix', 'Quick CIP',
-                        'NEB ligase', 'NEB polymerase', 'NEB restriction enzyme', 'NEB buffer',
-                        'NEBuffer', 'NEB T4 DNA Ligase', 'NEB Taq', 'NEB EcoRI', 'NEB digestion kit',
-                        'NEB Phusion', 'NEB LunaScript', 'NEBNext', 'NEB methylase', 'NEB exonuclease',
-                        
-                        # Biological reagents and kits
-                        'competent cells', 'cloning kit', 'transfection reagent', 'DNA assembly',
-                        'electroporation reagent', 'viral vector', 'cDNA synthesis kit', 'PCR kit',
-                        'RT-PCR kit', 'NGS prep kit', 'plasmid purification', 'protein ladder', 'SuperScript', 'RNeasy',
-                        'marker', 'DNA ladder', 'RNA ladder', 'molecular weight marker', 'agarose', 'LB', 'agar',
-                        
-                        # Proteins and protein-related reagents
-                        'protein expression', 'protein purification', 'proteinase', 'protease', 
-                        'protein A', 'protein G', 'protein marker', 'protein standard', 'recombinant protein',
-                        
-                        # Cell culture additives and growth reagents
-                        'cell culture reagent', 'cell growth reagent', 'supplement', 'cell recovery medium',
-                        'freezing medium', 'cryopreservation', 'transfection reagent', 'nucleofection reagent',
-                        
-                        #Biologic Dyes
-                        'Phalloidin', 'ANNEXIN V', 'ANNEXIN', 'HOECHST', 'vimentin live cell dye', 
-                        'prolong diamond antifade mountant with dapi', 'dapi',
-
-                        #Ladders
-                        'GENERULER', 'master mix',
-
-                        # Miscellaneous biological terms
-                        'oligonucleotide', 'oligo', 'siRNA', 'shRNA', 'gRNA', 'sgRNA', 'RNAi', 'DNA template', 
-                        'RNA template', 'expression plasmid', 'vector', 'CRISPR', 'CRISPR-Cas9', 'cloning vector',
-                        'glycerol', 'competent cell', 'E.coli', 'BL21', 'DH5α', 'expression host', 'assembly mix', 'sequence',
-                        'provirus', 'glucose', 'depc-treated'
-
-
-                    ],
-                    'Drugs': [
-                        #Generic drugs
-                        'drug', 'compound', 'chemical', 'inhibitor', 'small molecule', 'antibiotic', 'penicillin', 'amoxicillin', 'ciprofloxacin', 'azithromycin', 'cephalexin', 
-                        'clindamycin', 'metronidazole', 'ampicillin', 'kanamycin', 'streptomycin', 'gentamicin', 'tetracycline', 'chloramphenicol', 
-                        'penicillin', 'carbenicillin', 'antibiotic', 'small molecule', 'compound', 'chemical', 'inhibitor', 'aspirin', 'ibuprofen', 
-                        'paracetamol', 'acetaminophen', 'statins', 'antiviral', 'aphidicolin', 'benzo(a)pyrene', 'doxycycline hyclate',
-                        
-                        #Antibiotics
-                        'penicillin', 'streptomycin', 'ampicillin', 'kanamycin', 'tetracycline', 
-                        'chloramphenicol', 'cephalosporin', 'erythromycin', 'rifampin', 'vancomycin', 
-                        'gentamicin', 'ciprofloxacin', 'levofloxacin', 'azithromycin'
-
-                        # Chemotherapy Drugs
-                        'cisplatin', 'carboplatin', 'oxaliplatin', 'paclitaxel', 'docetaxel', 
-                        'doxorubicin', 'epirubicin', 'cyclophosphamide', 'ifosfamide', 
-                        'etoposide', 'irinotecan', 'topotecan', 'gemcitabine', 'vincristine', 
-                        'vinblastine', 'vinorelbine', 'bleomycin', 'mitomycin', '5-fluorouracil', 
-                        'capecitabine', 'methotrexate', 'pemetrexed', 'temozolomide', 'dacarbazine', 
-                        'mechlorethamine', 'melphalan', 'busulfan', 'fludarabine', 'cladribine', 'OLAPARIB'],
-
-                    'Chemical': [
-                        'buffer', 'DMSO', 'ethanol', 'TCEP', 'methanol', 'glutaraldehyde', 
-                        'SDS', 'Tris', 'HEPES', 'NaCl', 'TBE', 'formaldehyde', 'molecular biology', 'molecular'
-                        'ammonia', 'glycine', 'crystal violet', 'ethyl cinnamate', 'iodonitrotetrazolium', 'Tetrakis(2-hydroxypropyl)',
-                        'poly(ethylene glycol)', 'poly-l-lysine', 'protamine sulfate grade x', 'sulfo-smcc', 'tert-butanol'
-                    ],
-                    'Services (sequencing)': ['sequencing', 'service', 'genomics', 'WGS', 'long-read', 'sequencing service'],
-                    'Services (one-time)': ['repair', 'installation', 'quote', 'service fee', 'one-time service', 'BSC'],
-                    'Services (recurrent)': ['LN2', 'nitrogen', 'maintenance', 'subscription', 'recurring service', 'FY'],
-                    'Office Supplies': ['ink cartridge', 'printer', 'stationery', 'WB Mason', 'pen', 'VWR Tape']
-                
-                    }
-
-            # Original suppliers mapped to categories
-            drug_suppliers = ['MedChemExpress', 'SelleckChem', 'ApexBio']
-            enzyme_suppliers = ['New England Biolabs', 'NEB']
-            plasmid_suppliers = ['Addgene', 'addgene']
-            antibody_suppliers = ['Cell Signaling Technology']
-            office_supplies_suppliers = ['WB Mason']
-            mouse_suppliers = ['SoftMouse.NET','ISEEHEAR INC']
-            biological_suppliers = ['Integrated DNA Technologies', 'VectorBuilder'] 
-
-
-            # Normalization mapping for suppliers
-            supplier_aliases = {
-                'cell signaling': 'Cell Signaling Technology',
-                'sigma aldrich': 'Millipore Sigma',
-                'life tech': 'Life Technologies',
-                'wb mason': 'WB Mason',
-                'medchemexpress': 'MedChemExpress',
-                'med chem express': 'MedChemExpress',
-                'medchem express': 'MedChemExpress',
-                'selleckchem': 'SelleckChem',
-                'selleck chem': 'SelleckChem',
-                'selleckchemicals': 'SelleckChem',
-                'apexbio': 'ApexBio',
-                'apex bio': 'ApexBio',
-                'apexbiotechnology': 'ApexBio',
-                'neb': 'New England Biolabs',
-                'new england biolabs': 'New England Biolabs',
-                'thermo fisher': 'Thermo Fisher',
-                'invitrogen': 'Invitrogen',
-                'promega': 'Promega',
-                'bio-rad': 'Bio-Rad',
-                'qiagen': 'Qiagen',
-                'takara': 'Takara',
-                'roche': 'Roche',
-                'clontech': 'Clontech',
-                'agilent': 'Agilent',
-                'millipore': 'Millipore',
-                'ge healthcare': 'GE Healthcare',
-                'applied biosystems': 'Applied Biosystems',
-                'epicentre': 'Epicentre',
-                'softmouse.net': 'SoftMouse.NET',
-                'ISEEHEAR INC': 'ISEEHEAR INC',
-                'ISEEHEAR': 'ISEEHEAR INC',
-                'idt': 'Integrated DNA Technologies', 
-                'integrated dna technologies': 'Integrated DNA Technologies',
-                'integrated dna tech': 'Integrated DNA Technologies',
-                'vectorbuilder': 'VectorBuilder',  # Normalize VectorBuilder
-                'vector builder': 'VectorBuilder'
-            }
-
-
             # Step 1: Automatically find the 'name' column
             name_column = self.find_name_column()
 
             # Step 2: If not found, prompt the user to select the column
             if not name_column:
                 column_names = self.sheet_data.columns.tolist()
-                name_column, ok = QInputDialog.getItem(
-                    self.parent, "Select Name Column",
-                    "Choose the column containing item names:", column_names, 0, False
-                )
+                with profiling_suspended():
+                    name_column, ok = QInputDialog.getItem(
+                        self.parent, "Select Name Column",
+                        "Choose the column containing item names:", column_names, 0, False
+                    )
                 if not ok or not name_column:
                     QMessageBox.warning(self.parent, "Operation Cancelled", "No column was selected.")
                     return
@@ -1879,103 +2457,14 @@ class ExcelHandler:
                 QMessageBox.warning(self.parent, "Missing Column", f"The current sheet does not contain a '{name_column}' column.")
                 return
 
-            # Function to normalize supplier names
-            def normalize_supplier(supplier):
-                if not supplier:
-                    return None
-
-                supplier_lower = supplier.lower().strip()
-
-                # Check for known supplier patterns
-                if "medchem" in supplier_lower:
-                    return "MedChemExpress"
-                if "apex" in supplier_lower:
-                    return "ApexBio"
-                if "selleck" in supplier_lower:
-                    return "SelleckChem"
-                if 'neb' in supplier_lower:
-                    return 'New England Biolabs'
-                if "idt" in supplier_lower or "integrated dna" in supplier_lower:
-                    return "Integrated DNA Technologies"
-                if "vectorbuilder" in supplier_lower or "vector builder" in supplier_lower:
-                    return "VectorBuilder"
-
-                # Return the original supplier if no match is found
-                return supplier
-
-            # Function to assign a category based on name and supplier
-            def assign_category(name, supplier):
-                name_lower = str(name).lower().strip()
-
-                # Check if 'cisplatin' is in the name (prioritized)
-                if "cisplatin" in name_lower:
-                    return "Drugs"  # Prioritize 'cisplatin'
-
-
-                # Normalize supplier
-                normalized_supplier = normalize_supplier(supplier)
-
-                    # Prioritized keyword matching
-                if "gel ink pen" in name_lower or ("pen" in name_lower and "gel" in name_lower):
-                    return "Office Supplies"  # Prioritize gel ink pens
-                elif "western blot" in name_lower or ("gel" in name_lower and "blot" in name_lower):
-                    return "W/S/N Blots"  # Secondary priority for western blot gels
-                elif "gel" in name_lower:
-                    # Additional logic for generic gels if needed
-                    return "W/S/N Blots"  # Default to blot gels
-
-                # Check supplier-based categorization
-                if normalized_supplier in drug_suppliers:
-                    return 'Drugs'
-                if normalized_supplier in enzyme_suppliers:
-                    return 'Biological'
-                if normalized_supplier in plasmid_suppliers:
-                    return 'Biological'
-                if normalized_supplier in antibody_suppliers:
-                    return 'Antibodies'
-                if normalized_supplier in office_supplies_suppliers:
-                    return 'Office Supplies'
-                # Check supplier-based categorization
-                if normalized_supplier in ["MedChemExpress", "ApexBio", "SelleckChem"]:
-                    return 'Drugs'
-                    # Check for supplier-specific categorization
-                if normalized_supplier in biological_suppliers:
-                    return 'Biological'
-                if normalized_supplier in mouse_suppliers:
-                    return 'Mouse Work'
-    
-                # Check name-based categorization
-                for category, keywords in categories.items():
-                    if any(keyword.lower() in name_lower for keyword in keywords):
-                        return category
-
-                # Specific Category Matching
-                specific_category_keywords = {
-                    'Antibodies': ['mouse antibody', 'rabbit antibody', 'goat antibody'],
-                    'Mouse Work': ['mouse cage', 'mouse bedding', 'animal cage']
-                }
-                for category, specific_keywords in specific_category_keywords.items():
-                    if any(keyword.lower() in name_lower for keyword in specific_keywords):
-                        return category
-
-                # General Category Matching
-                for category, keywords in categories.items():
-                    if any(keyword.lower() in name_lower for keyword in keywords):
-                        return category
-
-                return 'Others'
-
-                # Step 4: Categorize each item based on name and supplier
-
-            # Categorize items
-            self.sheet_data['Category'] = self.sheet_data.apply(
-                lambda row: assign_category(row[name_column], row.get('supplier', '')), axis=1
-            )
+            # Step 4: Categorize each item based on name and supplier
+            self.categorize_sheet(name_column, 'Category')
 
             # Group data by the 'Category' column and count items
-            grouped_data = self.sheet_data.groupby('Category').apply(
-                lambda x: x.assign(Count=len(x))
-            ).reset_index(drop=True)
+            with profile_phase("group by category", rows=len(self.sheet_data)):
+                grouped_data = self.sheet_data.groupby('Category').apply(
+                    lambda x: x.assign(Count=len(x))
+                ).reset_index(drop=True)
 
             # Add grouped data as a new sheet
             new_sheet_name = "categorized_items"
@@ -1992,9 +2481,10 @@ class ExcelHandler:
             table_widget.setColumnCount(grouped_data.shape[1])
             table_widget.setHorizontalHeaderLabels(grouped_data.columns)
 
-            for i, row in grouped_data.iterrows():
-                for j, value in enumerate(row):
-                    table_widget.setItem(i, j, QTableWidgetItem(str(value)))
+            with profile_phase("populate table", rows=grouped_data.shape[0]):
+                for i, row in grouped_data.iterrows():
+                    for j, value in enumerate(row):
+                        table_widget.setItem(i, j, QTableWidgetItem(str(value)))
 
             table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
             self.tab_widget.addTab(table_widget, new_sheet_name)
@@ -2007,11 +2497,11 @@ class ExcelHandler:
 
 
     def display_saved_files(self):
-        """Display a list of previously uploaded Excel files."""
+        """Display previously uploaded files with their cataloged metadata, with search and date filters."""
         dialog = QDialog(self.parent)
         dialog.setWindowTitle("Previously Uploaded Excel Files")
         dialog.setStyleSheet("background-color: #cce7ff;")
-        dialog.resize(400, 300)
+        dialog.resize(1100, 600)
 
         # Center the dialog on the screen
         screen = QApplication.primaryScreen().geometry()
@@ -2021,33 +2511,111 @@ class ExcelHandler:
 
         layout = QVBoxLayout()
 
-        file_list_widget = QListWidget()
-        file_list_widget.setStyleSheet("font-size: 14px; color: #333; background-color: #f9f9f9;")
-
-        # Populate the list widget with the saved file names
-        for file_name in os.listdir(self.save_directory):
-            if file_name.endswith(".xlsx"):
-                file_list_widget.addItem(file_name)
-
-        layout.addWidget(file_list_widget)
+        # Bring the catalog up to date with the directory (uses background-processed results only)
+        cache_directory = self.folder_watcher.cache_directory if self.folder_watcher is not None else os.path.join(self.save_directory, ".cache")
+        try:
+            self.file_catalog.sync(self.save_directory, cache_directory)
+        except Exception as e:
+            print(f"Error updating the file catalog: {str(e)}")
+
+        # Search and date filters
+        filter_layout = QHBoxLayout()
+        search_input = QLineEdit()
+        search_input.setPlaceholderText("Search file, sheet, supplier or fund...")
+        search_input.setStyleSheet("font-size: 14px; color: black; background-color: white;")
+        filter_layout.addWidget(search_input)
+
+        date_filter_checkbox = QCheckBox("Dates between")
+        date_filter_checkbox.setStyleSheet("font-size: 14px; color: black;")
+        filter_layout.addWidget(date_filter_checkbox)
+
+        start_date_edit = QDateEdit()
+        start_date_edit.setCalendarPopup(True)
+        start_date_edit.setDate(QDate.currentDate().addYears(-1))
+        filter_layout.addWidget(start_date_edit)
+
+        end_date_edit = QDateEdit()
+        end_date_edit.setCalendarPopup(True)
+        end_date_edit.setDate(QDate.currentDate())
+        filter_layout.addWidget(end_date_edit)
+        layout.addLayout(filter_layout)
+
+        headers = ["File", "Sheets", "Rows", "Date Range", "Total Cost", "Suppliers", "Funds"]
+        file_table_widget = QTableWidget()
+        file_table_widget.setColumnCount(len(headers))
+        file_table_widget.setHorizontalHeaderLabels(headers)
+        file_table_widget.setSelectionBehavior(QTableWidget.SelectRows)
+        file_table_widget.setEditTriggers(QTableWidget.NoEditTriggers)
+        file_table_widget.setStyleSheet("font-size: 14px; color: #333; background-color: #f9f9f9;")
+        file_table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        layout.addWidget(file_table_widget)
+
+        def populate_files():
+            text = search_input.text().strip()
+            date_from = date_to = None
+            if date_filter_checkbox.isChecked():
+                date_from = start_date_edit.date().toString("yyyy-MM-dd")
+                date_to = end_date_edit.date().toString("yyyy-MM-dd")
+
+            entries = self.file_catalog.search(text, date_from, date_to)
+
+            # Files not cataloged yet (still being processed) are listed by name only
+            if date_from is None:
+                cataloged = {entry['file_name'] for entry in self.file_catalog.search()}
+                for file_name in sorted(os.listdir(self.save_directory)):
+                    if is_data_file(file_name) and file_name not in cataloged and text.lower() in file_name.lower():
+                        entries.append({'file_name': file_name})
+
+            file_table_widget.setRowCount(len(entries))
+            for row, entry in enumerate(entries):
+                date_range = f"{entry['first_date']} to {entry['last_date']}" if entry.get('first_date') else ""
+                total_cost = f"${entry['total_cost']:.2f}" if entry.get('total_cost') is not None else ""
+                values = [
+                    entry['file_name'], entry.get('sheet_names') or "", str(entry.get('row_count') or ""),
+                    date_range, total_cost, entry.get('suppliers') or "", entry.get('funds') or ""
+                ]
+                for col, value in enumerate(values):
+                    item = QTableWidgetItem(value)
+                    item.setToolTip(value)
+                    file_table_widget.setItem(row, col, item)
+                file_table_widget.item(row, 0).setData(Qt.UserRole, entry['file_name'])
+
+        search_input.textChanged.connect(populate_files)
+        date_filter_checkbox.stateChanged.connect(populate_files)
+        start_date_edit.dateChanged.connect(populate_files)
+        end_date_edit.dateChanged.connect(populate_files)
+        populate_files()
 
         open_button = QPushButton("Open Selected File")
         open_button.setStyleSheet("font-size: 16px; color: white; background-color: #4CAF50;")
-        open_button.clicked.connect(lambda: self.open_selected_file(file_list_widget))
+        open_button.clicked.connect(lambda: self.open_selected_file(file_table_widget))
         layout.addWidget(open_button)
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
-    def open_selected_file(self, file_list_widget):
+    def open_selected_file(self, file_table_widget):
         """Open and display the selected file from the list."""
-        selected_file = file_list_widget.currentItem().text()
+        current_row = file_table_widget.currentRow()
+        current_item = file_table_widget.item(current_row, 0) if current_row >= 0 else None
+        selected_file = current_item.data(Qt.UserRole) if current_item else None
 
         if selected_file:
             file_path = os.path.join(self.save_directory, selected_file)
             try:
-                # Load the selected file
-                excel_data = pd.read_excel(file_path, sheet_name=None)
+                # Use the background-processed results when they are ready
+                excel_data = None
+                if self.folder_watcher is not None:
+                    excel_data = load_cached_results(file_path, self.folder_watcher.cache_directory)
+
+                if excel_data is not None:
+                    self.memory_report = {}
+                else:
+                    # Load the selected file
+                    excel_data, _ = read_data_file(file_path, backend=self.reader_backend)
+                    excel_data = {name: data for name, data in excel_data.items() if not data.empty}
+                    excel_data = self.optimize_loaded_sheets(excel_data)
                 self.display_excel_contents(excel_data)
             except Exception as e:
                 QMessageBox.critical(self.parent, "Error", f"An error occurred while opening the Excel file: {str(e)}")
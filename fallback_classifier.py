@@ -0,0 +1,154 @@
+"""
+Optional statistical fallback for items the keyword rules leave as 'Others'.
+
+Item names are turned into TF-IDF vectors of character n-grams (robust to abbreviations,
+catalog suffixes and typos) and each category is represented by the normalized centroid of
+its training items. An 'Others' item gets the category of the most similar centroid when
+the cosine similarity reaches the confidence threshold. Training uses the rule-categorized
+history in the folder watcher cache; the fitted model is pickled so it loads instantly.
+Needs scikit-learn (pip install scikit-learn); everything runs locally on the CPU.
+"""
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from categorizer import find_name_column
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+except ImportError:
+    TfidfVectorizer = None
+
+MODEL_FILE_NAME = "fallback_model.pkl"
+CONFIDENCE_THRESHOLD = 0.4  # Minimum cosine similarity to a category centroid
+MIN_EXAMPLES_PER_CATEGORY = 3
+PREDICT_BATCH_SIZE = 10000
+RULE_CLASSIFIER = 'classifier'
+
+logger = logging.getLogger(__name__)
+
+
+def classifier_available():
+    return TfidfVectorizer is not None
+
+
+def training_examples_from_cache(cache_directory):
+    """Distinct (item name, category) pairs from the categorized sheets in the cache, 'Others' excluded."""
+    frames = []
+    for cache_name in os.listdir(cache_directory):
+        if not cache_name.endswith(".pkl"):
+            continue
+        try:
+            excel_data = pd.read_pickle(os.path.join(cache_directory, cache_name))
+        except Exception as e:
+            logger.warning("Error reading %s: %s", cache_name, e)
+            continue
+        for sheet_data in excel_data.values():
+            name_column = find_name_column([col for col in sheet_data.columns if col != 'category'])
+            if name_column is None or 'category' not in sheet_data.columns:
+                continue
+            frames.append(pd.DataFrame({
+                'name': sheet_data[name_column].astype(object),
+                'category': sheet_data['category'].astype(object),
+            }))
+
+    if not frames:
+        return pd.DataFrame(columns=['name', 'category'])
+    examples = pd.concat(frames, ignore_index=True).dropna()
+    examples['name'] = examples['name'].map(lambda value: str(value).lower().strip())
+    examples = examples[(examples['category'] != 'Others') & (examples['name'] != "")]
+    return examples.drop_duplicates().reset_index(drop=True)
+
+
+class FallbackClassifier:
+    def __init__(self, threshold=CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self.vectorizer = None
+        self.centroids = None  # (categories x features), rows normalized to unit length
+        self.categories = []
+
+    def fit(self, names, categories):
+        """Fit on item names and their categories. Returns self."""
+        if TfidfVectorizer is None:
+            raise ImportError("scikit-learn is required for the fallback classifier")
+
+        examples = pd.DataFrame({'name': list(names), 'category': list(categories)})
+        counts = examples['category'].value_counts()
+        examples = examples[examples['category'].isin(counts[counts >= MIN_EXAMPLES_PER_CATEGORY].index)]
+        if examples['category'].nunique() < 2:
+            raise ValueError("At least two categories with enough categorized items are needed for training")
+
+        self.vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), sublinear_tf=True, min_df=2)
+        features = self.vectorizer.fit_transform(examples['name'])
+
+        self.categories = sorted(examples['category'].unique())
+        labels = examples['category'].to_numpy()
+        centroids = np.vstack([
+            np.asarray(features[labels == category].mean(axis=0)) for category in self.categories
+        ])
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids / np.where(norms == 0, 1, norms)
+        logger.debug("Trained fallback classifier on %d items in %d categories", len(examples), len(self.categories))
+        return self
+
+    def predict(self, names):
+        """Return (categories, confidences) arrays; the category is None below the threshold."""
+        names = [str(name).lower().strip() for name in names]
+        predictions = np.empty(len(names), dtype=object)
+        confidences = np.zeros(len(names))
+
+        for start in range(0, len(names), PREDICT_BATCH_SIZE):
+            batch = self.vectorizer.transform(names[start:start + PREDICT_BATCH_SIZE])
+            similarities = np.asarray(batch @ self.centroids.T)  # TF-IDF rows are unit length, so this is cosine similarity
+            best = similarities.argmax(axis=1)
+            confidences[start:start + len(best)] = similarities[np.arange(len(best)), best]
+            predictions[start:start + len(best)] = np.array(self.categories, dtype=object)[best]
+
+        predictions[confidences < self.threshold] = None
+        return predictions, confidences
+
+    def save(self, path):
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(self, f)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def load(path):
+        """Load a saved model, or return None if there is none (or scikit-learn is missing)."""
+        if TfidfVectorizer is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning("Error loading the fallback classifier: %s", e)
+            return None
+
+
+def apply_fallback(explained, names, classifier):
+    """
+    Re-categorize the 'Others' rows of an explain_rows() result in place. Each distinct
+    'Others' name is predicted once; confident predictions replace the category and are
+    marked with the 'classifier' rule and their confidence.
+    """
+    others = (explained['category'] == 'Others').to_numpy()
+    if classifier is None or not others.any():
+        return 0
+
+    names = pd.Series(names).astype(object)
+    codes, unique_names = pd.factorize(names.where(names.notna(), "").to_numpy()[others])
+    predictions, confidences = classifier.predict(unique_names)
+    confident = pd.notna(predictions[codes])
+
+    positions = np.flatnonzero(others)[confident]
+    explained.iloc[positions, explained.columns.get_loc('category')] = predictions[codes][confident]
+    explained.iloc[positions, explained.columns.get_loc('rule')] = RULE_CLASSIFIER
+    explained.iloc[positions, explained.columns.get_loc('matched_term')] = [
+        f"confidence {value:.2f}" for value in confidences[codes][confident]
+    ]
+    logger.debug("Fallback classifier re-categorized %d of %d 'Others' rows", len(positions), others.sum())
+    return len(positions)
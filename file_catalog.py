@@ -0,0 +1,191 @@
+"""
+SQLite catalog of saved files: sheet names, row counts, date ranges, total cost,
+suppliers and funds, so the saved-files dialog can filter and search without opening files.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data_loader import clean_cost_series, is_data_file
+from folder_watcher import load_cached_results
+
+CATALOG_FILE_NAME = "catalog.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_name   TEXT PRIMARY KEY,
+    size        INTEGER,
+    mtime       REAL,
+    sheet_names TEXT,
+    row_count   INTEGER,
+    first_date  TEXT,
+    last_date   TEXT,
+    total_cost  REAL
+);
+CREATE TABLE IF NOT EXISTS file_suppliers (file_name TEXT, supplier TEXT);
+CREATE TABLE IF NOT EXISTS file_funds (file_name TEXT, fund TEXT);
+CREATE INDEX IF NOT EXISTS idx_file_suppliers ON file_suppliers (supplier, file_name);
+CREATE INDEX IF NOT EXISTS idx_file_funds ON file_funds (fund, file_name);
+CREATE INDEX IF NOT EXISTS idx_files_dates ON files (first_date, last_date);
+"""
+
+
+def summarize_sheets(excel_data):
+    """Collect the catalog metadata of a loaded file ({sheet_name: DataFrame})."""
+    row_count = 0
+    total_cost = 0.0
+    dates = []
+    suppliers = set()
+    funds = set()
+
+    for sheet_data in excel_data.values():
+        row_count += len(sheet_data)
+        columns = {str(col).lower(): col for col in sheet_data.columns}
+
+        if 'cost' in columns:
+            total_cost += float(clean_cost_series(sheet_data[columns['cost']]).sum())
+
+        date_columns = [col for name, col in columns.items() if 'date' in name]
+        for col in date_columns:
+            values = pd.to_datetime(sheet_data[col], errors='coerce').dropna()
+            if not values.empty:
+                dates.extend([values.min(), values.max()])
+
+        if 'supplier' in columns:
+            suppliers.update(str(value).strip() for value in sheet_data[columns['supplier']].dropna().unique())
+        if 'fund_number' in columns:
+            funds.update(str(value).strip() for value in sheet_data[columns['fund_number']].dropna().unique())
+
+    return {
+        'sheet_names': ", ".join(str(name) for name in excel_data.keys()),
+        'row_count': row_count,
+        'first_date': min(dates).strftime("%Y-%m-%d") if dates else None,
+        'last_date': max(dates).strftime("%Y-%m-%d") if dates else None,
+        'total_cost': total_cost,
+        'suppliers': sorted(value for value in suppliers if value),
+        'funds': sorted(value for value in funds if value),
+    }
+
+
+class FileCatalog:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """
+        A short-lived connection (which keeps the catalog usable from the watcher thread),
+        committed on success and always closed.
+        """
+        connection = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def cataloged_versions(self):
+        """{file name: (size, mtime)} of every cataloged file, in one query."""
+        with self._connect() as connection:
+            return {row[0]: (row[1], row[2]) for row in connection.execute("SELECT file_name, size, mtime FROM files")}
+
+    def update_file(self, file_path, excel_data):
+        """Add or refresh one file's entry from its already loaded sheets."""
+        stat = os.stat(file_path)
+        summary = summarize_sheets(excel_data)
+        with self._connect() as connection:
+            self._write_entry(connection, os.path.basename(file_path), stat, summary)
+
+    def _write_entry(self, connection, file_name, stat, summary):
+        connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (file_name, stat.st_size, stat.st_mtime, summary['sheet_names'], summary['row_count'],
+             summary['first_date'], summary['last_date'], summary['total_cost'])
+        )
+        connection.execute("DELETE FROM file_suppliers WHERE file_name = ?", (file_name,))
+        connection.execute("DELETE FROM file_funds WHERE file_name = ?", (file_name,))
+        connection.executemany(
+            "INSERT INTO file_suppliers VALUES (?, ?)", [(file_name, value) for value in summary['suppliers']]
+        )
+        connection.executemany(
+            "INSERT INTO file_funds VALUES (?, ?)", [(file_name, value) for value in summary['funds']]
+        )
+
+    def remove_file(self, file_name):
+        with self._connect() as connection:
+            self._delete_entry(connection, file_name)
+
+    def _delete_entry(self, connection, file_name):
+        for table in ("files", "file_suppliers", "file_funds"):
+            connection.execute(f"DELETE FROM {table} WHERE file_name = ?", (file_name,))
+
+    def sync(self, directory, cache_directory):
+        """
+        Drop entries for deleted files and catalog changed files whose background-processed
+        results are ready. Files are never parsed here, so this stays fast for large archives.
+        """
+        # Step 1: Compare the files on disk with the catalog in memory
+        cataloged = self.cataloged_versions()
+        on_disk = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and is_data_file(entry.name):
+                    on_disk[entry.name] = entry.stat()
+
+        # Step 2: Summarize the changed files whose results are ready (the summaries are small)
+        updates = []
+        for file_name, stat in on_disk.items():
+            if cataloged.get(file_name) == (stat.st_size, stat.st_mtime):
+                continue
+            excel_data = load_cached_results(os.path.join(directory, file_name), cache_directory)
+            if excel_data is not None:
+                updates.append((file_name, stat, summarize_sheets(excel_data)))
+
+        # Step 3: Write everything over one connection
+        removed = set(cataloged) - set(on_disk)
+        if not removed and not updates:
+            return
+        with self._connect() as connection:
+            for file_name in removed:
+                self._delete_entry(connection, file_name)
+            for file_name, stat, summary in updates:
+                self._write_entry(connection, file_name, stat, summary)
+
+    def search(self, text="", date_from=None, date_to=None):
+        """
+        Return catalog rows (dicts) whose file name, sheet names, suppliers or funds contain
+        the search text and whose date range overlaps [date_from, date_to] ('YYYY-MM-DD').
+        """
+        query = """
+            SELECT f.file_name, f.sheet_names, f.row_count, f.first_date, f.last_date, f.total_cost,
+                   (SELECT group_concat(supplier, ', ') FROM file_suppliers s WHERE s.file_name = f.file_name),
+                   (SELECT group_concat(fund, ', ') FROM file_funds d WHERE d.file_name = f.file_name)
+            FROM files f WHERE 1 = 1
+        """
+        params = []
+
+        if text:
+            pattern = f"%{text}%"
+            query += """
+                AND (f.file_name LIKE ? OR f.sheet_names LIKE ?
+                     OR f.file_name IN (SELECT file_name FROM file_suppliers WHERE supplier LIKE ?)
+                     OR f.file_name IN (SELECT file_name FROM file_funds WHERE fund LIKE ?))
+            """
+            params += [pattern] * 4
+        if date_from:
+            query += " AND f.last_date >= ?"
+            params.append(date_from)
+        if date_to:
+            query += " AND f.first_date <= ?"
+            params.append(date_to)
+        query += " ORDER BY f.file_name"
+
+        with self._connect() as connection:
+            rows = connection.execute(query, params).fetchall()
+
+        columns = ['file_name', 'sheet_names', 'row_count', 'first_date', 'last_date', 'total_cost', 'suppliers', 'funds']
+        return [dict(zip(columns, row)) for row in rows]
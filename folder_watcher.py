@@ -0,0 +1,199 @@
+"""
+Background ingestion of files dropped into the uploaded-files directory.
+
+New or changed workbooks are parsed, given compact dtypes and categorized in a worker
+thread, and the results are cached on disk so opening them later is instant.
+Uses watchdog (inotify/FSEvents) when installed, otherwise polls the directory.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from data_loader import read_data_file, optimize_workbook_dtypes, is_data_file
+from categorizer import find_name_column, categorize_rows
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+CACHE_DIRECTORY_NAME = ".cache"
+
+logger = logging.getLogger(__name__)
+
+
+def cache_path_for(file_path, cache_directory):
+    """Cache file for the current version (size and modification time) of a saved file."""
+    stat = os.stat(file_path)
+    return os.path.join(
+        cache_directory, f"{os.path.basename(file_path)}.{stat.st_size}.{int(stat.st_mtime)}.pkl"
+    )
+
+
+def load_cached_results(file_path, cache_directory):
+    """Return the cached {sheet_name: DataFrame} for a file, or None if it is missing or stale."""
+    try:
+        cache_path = cache_path_for(file_path, cache_directory)
+    except OSError:
+        return None
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        return pd.read_pickle(cache_path)
+    except Exception as e:
+        logger.warning("Error reading cached results for %s: %s", file_path, e)
+        return None
+
+
+def ingest_file(file_path, cache_directory):
+    """Parse, optimize and categorize one file, write the results to the cache and return them."""
+    excel_data, _ = read_data_file(file_path)
+    excel_data = {name: data for name, data in excel_data.items() if not data.empty}
+    excel_data, _ = optimize_workbook_dtypes(excel_data)
+
+    for sheet_data in excel_data.values():
+        name_column = find_name_column(sheet_data.columns)
+        if name_column is not None:
+            sheet_data['category'] = categorize_rows(sheet_data, name_column)
+
+    os.makedirs(cache_directory, exist_ok=True)
+    cache_path = cache_path_for(file_path, cache_directory)
+
+    # Drop caches of older versions of the same file
+    prefix = os.path.basename(file_path) + "."
+    for cache_name in os.listdir(cache_directory):
+        if cache_name.startswith(prefix) and os.path.join(cache_directory, cache_name) != cache_path:
+            os.remove(os.path.join(cache_directory, cache_name))
+
+    # Write then rename, so a half-written cache is never read
+    temp_path = cache_path + ".tmp"
+    pd.to_pickle(excel_data, temp_path)
+    os.replace(temp_path, cache_path)
+    return excel_data
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forward watchdog file events to the watcher queue."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.enqueue(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.enqueue(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.enqueue(event.dest_path)
+
+
+class FolderWatcher:
+    def __init__(self, directory, cache_directory=None, poll_interval=2.0, on_ingested=None):
+        self.directory = directory
+        self.cache_directory = cache_directory or os.path.join(directory, CACHE_DIRECTORY_NAME)
+        self.poll_interval = poll_interval
+        self.on_ingested = on_ingested  # Called as on_ingested(file_path, excel_data) from the worker thread
+        self.queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.observer = None
+
+    def start(self):
+        """Queue files that have no cache yet and start watching for new ones."""
+        for file_name in os.listdir(self.directory):
+            self.enqueue(os.path.join(self.directory, file_name))
+
+        worker = threading.Thread(target=self._process_queue, name="folder-watcher-worker", daemon=True)
+        worker.start()
+        self.threads.append(worker)
+
+        if Observer is not None:
+            self.observer = Observer()
+            self.observer.schedule(_EventHandler(self), self.directory, recursive=False)
+            self.observer.daemon = True
+            self.observer.start()
+        else:
+            poller = threading.Thread(target=self._poll_directory, name="folder-watcher-poller", daemon=True)
+            poller.start()
+            self.threads.append(poller)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join(timeout=2)
+        for thread in self.threads:
+            thread.join(timeout=2)
+
+    def is_ready(self, file_path):
+        """True when up-to-date cached results exist for the file."""
+        try:
+            return os.path.exists(cache_path_for(file_path, self.cache_directory))
+        except OSError:
+            return False
+
+    def enqueue(self, file_path):
+        if is_data_file(file_path) and os.path.isfile(file_path) and not self.is_ready(file_path):
+            self.queue.put(file_path)
+
+    def _snapshot(self):
+        snapshot = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and is_data_file(entry.name):
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_size, stat.st_mtime)
+        return snapshot
+
+    def _poll_directory(self):
+        """Fallback when watchdog is not installed: compare directory snapshots."""
+        previous = self._snapshot()
+        while not self.stop_event.wait(self.poll_interval):
+            current = self._snapshot()
+            for file_path, signature in current.items():
+                if previous.get(file_path) != signature:
+                    self.enqueue(file_path)
+            previous = current
+
+    def _wait_until_stable(self, file_path, checks=10):
+        """Wait until a file stops growing, so half-copied files are not parsed."""
+        last_size = -1
+        for _ in range(checks):
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                return False
+            if size == last_size:
+                return True
+            last_size = size
+            if self.stop_event.wait(0.5):
+                return False
+        return True
+
+    def _process_queue(self):
+        while not self.stop_event.is_set():
+            try:
+                file_path = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if not self._wait_until_stable(file_path) or self.is_ready(file_path):
+                continue
+
+            try:
+                start = time.perf_counter()
+                excel_data = ingest_file(file_path, self.cache_directory)
+                logger.debug("Ingested %s in %.2f s", os.path.basename(file_path), time.perf_counter() - start)
+                if self.on_ingested is not None:
+                    self.on_ingested(file_path, excel_data)
+            except Exception:
+                logger.exception("Error ingesting %s", file_path)
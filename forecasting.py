@@ -0,0 +1,167 @@
+"""
+Spend burn-rate forecasting per grant.
+
+The allocation ledger (allocated_costs.csv: Grant ID, Cost, Date) is resampled to monthly
+spend per grant, a local linear trend of cumulative spend (the burn rate) is fitted to the
+last few months of every grant at once (weighted least squares on a months x grants
+matrix), and each grant's remaining balance is divided by its burn rate to find when it
+runs out. Results are cached per grant and only grants whose ledger, balance or
+reference month changed are recomputed.
+"""
+import hashlib
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from allocation_optimizer import grant_balances
+
+TREND_WINDOW_MONTHS = 6  # Months of history the local trend is fitted on
+FORECAST_HORIZON_MONTHS = 120  # Grants lasting longer than this have no exhaustion date
+FORECAST_CACHE_FILE_NAME = "forecast_cache.pkl"
+
+logger = logging.getLogger(__name__)
+
+
+def monthly_spend(ledger, as_of):
+    """
+    Monthly spend per grant as a (months x grants) DataFrame, months at month start, from the
+    first dated allocation through the `as_of` month. Undated ledger entries are ignored.
+    """
+    dated = ledger.assign(Date=pd.to_datetime(ledger['Date'], errors='coerce')).dropna(subset=['Date'])
+    if dated.empty:
+        return pd.DataFrame()
+    dated = dated.assign(Cost=pd.to_numeric(dated['Cost'], errors='coerce').fillna(0))
+
+    spend = dated.pivot_table(index='Date', columns='Grant ID', values='Cost', aggfunc='sum').resample('MS').sum()
+    as_of_month = pd.Timestamp(as_of).to_period('M').to_timestamp()
+    months = pd.date_range(spend.index.min(), max(spend.index.max(), as_of_month), freq='MS')
+    return spend.reindex(months, fill_value=0.0).loc[:as_of_month]
+
+
+def fit_burn_rates(spend, first_months):
+    """
+    Local trend of every grant in one vectorized pass: the slope of cumulative spend over the
+    last TREND_WINDOW_MONTHS complete months (weighted least squares on a months x grants
+    matrix), which is robust to months without allocations. Months before a grant's first
+    allocation get no weight; with a single month the burn rate is that month's spend.
+    """
+    complete = spend.iloc[:-1] if len(spend) > 1 else spend  # The current month is still in progress
+    window = complete.cumsum().iloc[-TREND_WINDOW_MONTHS:]
+    monthly = complete.iloc[-TREND_WINDOW_MONTHS:].to_numpy(dtype=float)
+    y = window.to_numpy(dtype=float)
+    t = np.arange(len(window), dtype=float)[:, None]
+    weights = (window.index.to_numpy()[:, None] >= first_months[None, :]).astype(float)
+
+    n = weights.sum(axis=0)
+    safe_n = np.where(n == 0, 1, n)
+    t_mean = (weights * t).sum(axis=0) / safe_n
+    y_mean = (weights * y).sum(axis=0) / safe_n
+    covariance = (weights * (t - t_mean) * (y - y_mean)).sum(axis=0)
+    variance = (weights * (t - t_mean) ** 2).sum(axis=0)
+
+    average = (weights * monthly).sum(axis=0) / safe_n
+    rate = np.where(variance > 0, covariance / np.where(variance > 0, variance, 1), average)
+    return np.clip(rate, 0, None), average
+
+
+def project_exhaustion(burn_rate, remaining, as_of):
+    """
+    Return (exhaustion dates, months left) per grant at the given monthly burn rates.
+    Dates are NaT when nothing is being spent or the balance lasts beyond FORECAST_HORIZON_MONTHS.
+    """
+    months_left = np.where(burn_rate > 0, np.clip(remaining, 0, None) / np.where(burn_rate > 0, burn_rate, 1), np.nan)
+    months_left = np.where(remaining <= 0, 0.0, months_left)
+    months_left = np.where(months_left > FORECAST_HORIZON_MONTHS, np.nan, months_left)
+
+    as_of = pd.Timestamp(as_of).normalize()
+    dates = [
+        as_of + pd.Timedelta(days=round(months * 30.44)) if not np.isnan(months) else pd.NaT
+        for months in months_left
+    ]
+    return dates, months_left
+
+
+def grant_fingerprint(grant_ledger, remaining, as_of):
+    """Changes whenever the grant's ledger, its balance or the forecast month changes."""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(grant_ledger[['Cost', 'Date']].astype(str), index=False).to_numpy().tobytes())
+    digest.update(f"{remaining:.2f}|{pd.Timestamp(as_of).to_period('M')}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}  # {grant id: (fingerprint, forecast row dict)}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    self.entries = pickle.load(f)
+            except Exception as e:
+                logger.warning("Error reading the forecast cache: %s", e)
+
+    def save(self):
+        if not self.path:
+            return
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                pickle.dump(self.entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning("Error writing the forecast cache: %s", e)
+
+
+def forecast_grants(ledger, grant_data, cache=None, as_of=None):
+    """
+    Forecast every grant. Returns a DataFrame with the remaining balance, recent average
+    monthly spend, burn rate, projected exhaustion date and months left per grant.
+    Only grants whose fingerprint changed since the cached forecast are recomputed.
+    """
+    as_of = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now()
+    cache = cache or ForecastCache()
+    remaining = pd.Series(grant_balances(grant_data), index=grant_data['Grant ID'].to_numpy())
+
+    # Step 1: Find the grants whose forecast is stale
+    ledgers = {grant_id: group for grant_id, group in ledger.groupby('Grant ID')}
+    empty_ledger = ledger.iloc[:0]
+    fingerprints = {
+        grant_id: grant_fingerprint(ledgers.get(grant_id, empty_ledger), remaining[grant_id], as_of)
+        for grant_id in remaining.index
+    }
+    stale = [grant_id for grant_id, fingerprint in fingerprints.items()
+             if cache.entries.get(grant_id, (None,))[0] != fingerprint]
+
+    # Step 2: Recompute the stale grants in one batch
+    if stale:
+        stale_ledger = ledger[ledger['Grant ID'].isin(stale)]
+        spend = monthly_spend(stale_ledger, as_of).reindex(columns=stale, fill_value=0.0)
+        if spend.empty:
+            spend = pd.DataFrame(0.0, index=[as_of.to_period('M').to_timestamp()], columns=stale)
+
+        first_months = np.array([
+            spend.index[spend[grant_id].to_numpy() > 0][0] if (spend[grant_id] > 0).any() else spend.index[-1]
+            for grant_id in stale
+        ], dtype='datetime64[ns]')
+        burn_rate, average = fit_burn_rates(spend, first_months)
+        stale_remaining = remaining[stale].to_numpy(dtype=float)
+        dates, months_left = project_exhaustion(burn_rate, stale_remaining, as_of)
+
+        for position, grant_id in enumerate(stale):
+            cache.entries[grant_id] = (fingerprints[grant_id], {
+                'Remaining': round(float(stale_remaining[position]), 2),
+                'Avg Monthly Spend': round(float(average[position]), 2),
+                'Burn Rate': round(float(burn_rate[position]), 2),
+                'Projected Exhaustion': dates[position],
+                'Months Left': round(float(months_left[position]), 1),
+            })
+        logger.debug("Forecast recomputed for %d of %d grants", len(stale), len(remaining))
+
+    # Step 3: Assemble the results from the cache
+    rows = []
+    for grant_id, grant_name in zip(grant_data['Grant ID'], grant_data['Grant Name']):
+        rows.append({'Grant ID': grant_id, 'Grant Name': grant_name, **cache.entries[grant_id][1]})
+    return pd.DataFrame(rows)
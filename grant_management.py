@@ -7,6 +7,9 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QDate
 
+from profiling import profile_public_methods, profiling_suspended
+
+@profile_public_methods
 class GrantManagement:
     def __init__(self, directory_path='/Users/paul/Desktop/Faltas_GMS'):
         self.directory_path = directory_path
@@ -27,7 +30,8 @@ class GrantManagement:
             return os.path.join(self.directory_path, csv_files[0])
         else:
             options = QFileDialog.Options()
-            file_path, _ = QFileDialog.getOpenFileName(None, "Select a CSV File", self.directory_path, "CSV Files (*.csv)", options=options)
+            with profiling_suspended():
+                file_path, _ = QFileDialog.getOpenFileName(None, "Select a CSV File", self.directory_path, "CSV Files (*.csv)", options=options)
             if file_path:
                 return file_path
             else:
@@ -55,6 +59,8 @@ class GrantManagement:
             try:
                 data = pd.read_csv(self.costs_file_path)
                 if 'Grant ID' in data.columns and 'Cost' in data.columns:
+                    if 'Date' not in data.columns:
+                        data['Date'] = pd.NA  # Older ledgers have no allocation dates
                     return data
                 else:
                     return self.initialize_costs_csv()
@@ -72,7 +78,7 @@ class GrantManagement:
 
     def initialize_costs_csv(self):
         """Initialize the costs CSV with default columns."""
-        data = pd.DataFrame(columns=['Grant ID', 'Cost'])
+        data = pd.DataFrame(columns=['Grant ID', 'Cost', 'Date'])
         data.to_csv(self.costs_file_path, index=False)
         return data
 
@@ -95,9 +101,10 @@ class GrantManagement:
         if self.costs_file_path:
             self.allocated_costs.to_csv(self.costs_file_path, index=False)
 
-    def add_allocated_cost(self, grant_id, cost):
-        """Add a new allocated cost to the list for a specific grant."""
-        new_cost = pd.DataFrame({'Grant ID': [grant_id], 'Cost': [cost]})
+    def add_allocated_cost(self, grant_id, cost, date=None):
+        """Add a new allocated cost to the list for a specific grant, dated today unless a date is given."""
+        date = date or pd.Timestamp.now().strftime("%Y-%m-%d")
+        new_cost = pd.DataFrame({'Grant ID': [grant_id], 'Cost': [cost], 'Date': [date]})
         self.allocated_costs = pd.concat([self.allocated_costs, new_cost], ignore_index=True)
         self.save_allocated_costs()
 
@@ -108,6 +115,11 @@ class GrantManagement:
         ]
         self.save_allocated_costs()
 
+    def clear_allocated_costs(self, grant_id):
+        """Remove every allocated cost of a specific grant."""
+        self.allocated_costs = self.allocated_costs[self.allocated_costs['Grant ID'] != grant_id]
+        self.save_allocated_costs()
+
     def get_allocated_costs(self, grant_id):
         """Retrieve allocated costs for a specific grant."""
         return self.allocated_costs[self.allocated_costs['Grant ID'] == grant_id]
@@ -167,7 +179,8 @@ class GrantManagement:
                 layout.addWidget(scroll)
 
                 dialog.setLayout(layout)
-                dialog.exec_()
+                with profiling_suspended():
+                    dialog.exec_()
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred while displaying grants: {str(e)}")
@@ -271,7 +284,8 @@ class GrantManagement:
         add_button.clicked.connect(add_grant_action)
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
 
     def show_grants(self):
@@ -313,7 +327,8 @@ class GrantManagement:
         layout.addWidget(add_rule_button)
 
         dialog.setLayout(layout)
-        dialog.exec_()
+        with profiling_suspended():
+            dialog.exec_()
 
     def add_spending_rule(self, grant_name, dialog):
         """Add a spending rule to the selected grant."""
@@ -0,0 +1,183 @@
+"""
+Match inventory line items against the 'Allowed Items' of every grant.
+
+All allowed items are compiled into one term vocabulary. Each distinct row text (item name,
+category, project/requester notes) is tokenized once, and every allowed item is scored with
+a single bincount over the postings of its terms, so hundreds of grants x 100k rows is a
+few hundred array operations rather than a Python loop over rows and grants.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from categorizer import find_name_column
+
+RULE_STOPWORDS = {'and', 'the', 'of', 'for', 'with', 'in', 'on', 'to', 'a', 'an'}
+
+# Columns besides the item name that describe what a line item is for
+RULE_TEXT_KEYWORDS = ['category', 'description', 'project', 'note', 'comment', 'requester', 'requested', 'purpose']
+
+MATCH_THRESHOLD = 1 / 3  # Fraction of an allowed item's terms a row must contain to be eligible
+MIN_MATCHED_TERMS = 2  # Terms a row must share with an allowed item of several terms, so a requester's name alone is not a match
+
+
+def rule_tokens(text):
+    """Lowercase word tokens with stopwords dropped and plurals folded ('Tips' -> 'tip')."""
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", str(text).lower()):
+        if len(token) < 2 or token in RULE_STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def find_rule_text_columns(columns):
+    """The item name column plus category/description/project columns, in sheet order."""
+    name_column = find_name_column(columns)
+    return [
+        col for col in columns
+        if col == name_column or any(keyword in str(col).lower() for keyword in RULE_TEXT_KEYWORDS)
+    ]
+
+
+def row_texts(sheet_data):
+    """One text per row joining the columns the rules are matched against."""
+    columns = find_rule_text_columns(sheet_data.columns)
+    if not columns:
+        return pd.Series("", index=sheet_data.index)
+    texts = sheet_data[columns[0]].astype(object).where(sheet_data[columns[0]].notna(), "").astype(str)
+    for col in columns[1:]:
+        texts = texts + " " + sheet_data[col].astype(object).where(sheet_data[col].notna(), "").astype(str)
+    return texts
+
+
+class GrantRuleMatcher:
+    def __init__(self, grant_data):
+        """Compile the 'Allowed Items' of every grant (a GrantManagement.grant_data frame)."""
+        self.grant_names = grant_data['Grant Name'].tolist()
+        self.vocabulary = {}  # term -> term id
+        self.rules = []  # (grant index, allowed item, term ids)
+        self.unrestricted = set()  # Grants without allowed items accept any line item
+
+        for grant_index, allowed_items in enumerate(grant_data['Allowed Items']):
+            allowed_items = [item for item in (allowed_items or []) if rule_tokens(item)]
+            if not allowed_items:
+                self.unrestricted.add(grant_index)
+            for allowed_item in allowed_items:
+                term_ids = {self.vocabulary.setdefault(token, len(self.vocabulary)) for token in rule_tokens(allowed_item)}
+                self.rules.append((grant_index, allowed_item, np.array(sorted(term_ids))))
+
+    def _score_unique(self, unique_texts):
+        """
+        Return (text ids, grant indexes, scores, allowed items) for every distinct text and
+        restricted grant whose best allowed item reaches MATCH_THRESHOLD and shares at least
+        MIN_MATCHED_TERMS terms with the text (all of them for shorter allowed items).
+        """
+        # Step 1: Postings of the rule terms over the distinct texts
+        postings = [[] for _ in self.vocabulary]
+        for text_id, text in enumerate(unique_texts):
+            for token in set(rule_tokens(text)):
+                term_id = self.vocabulary.get(token)
+                if term_id is not None:
+                    postings[term_id].append(text_id)
+        postings = [np.array(ids, dtype=np.intp) for ids in postings]
+
+        # Step 2: Score every allowed item with one bincount, keep each grant's best item
+        best = {}  # grant index -> (scores, allowed item index per text)
+        for rule_index, (grant_index, _, term_ids) in enumerate(self.rules):
+            hits = np.concatenate([postings[term_id] for term_id in term_ids])
+            matched_terms = np.bincount(hits, minlength=len(unique_texts))
+            enough_terms = matched_terms >= min(MIN_MATCHED_TERMS, len(term_ids))
+            scores = np.where(enough_terms, matched_terms / len(term_ids), 0.0)
+            if grant_index not in best:
+                best[grant_index] = (scores, np.full(len(unique_texts), rule_index))
+            else:
+                best_scores, best_rules = best[grant_index]
+                better = scores > best_scores
+                best_scores[better] = scores[better]
+                best_rules[better] = rule_index
+
+        # Step 3: Keep the eligible (text, grant) pairs
+        text_ids, grant_indexes, pair_scores, allowed_items = [], [], [], []
+        for grant_index, (scores, rule_indexes) in best.items():
+            eligible = np.flatnonzero(scores >= MATCH_THRESHOLD)
+            text_ids.append(eligible)
+            grant_indexes.append(np.full(len(eligible), grant_index))
+            pair_scores.append(scores[eligible])
+            allowed_items.append(rule_indexes[eligible])
+
+        if not text_ids:
+            empty = np.array([], dtype=np.intp)
+            return empty, empty, np.array([]), empty
+        return (np.concatenate(text_ids), np.concatenate(grant_indexes),
+                np.concatenate(pair_scores), np.concatenate(allowed_items))
+
+    def match_rows(self, sheet_data):
+        """
+        Return a DataFrame (same index as the sheet) with the eligible grants of every row,
+        best match first, plus the best grant, its score and the allowed item it matched.
+        Grants without allowed items accept everything and are not listed.
+        """
+        codes, unique_texts = pd.factorize(row_texts(sheet_data))
+        text_ids, grant_indexes, scores, rule_indexes = self._score_unique(unique_texts)
+
+        # Best match first within each text
+        order = np.lexsort((-scores, text_ids))
+        text_ids, grant_indexes, scores, rule_indexes = (
+            text_ids[order], grant_indexes[order], scores[order], rule_indexes[order]
+        )
+        grant_names = np.array(self.grant_names, dtype=object)
+        rule_items = np.array([rule[1] for rule in self.rules], dtype=object)
+
+        # Entries are grouped by text; the first entry of each text is its best match
+        first_ids, first_positions = np.unique(text_ids, return_index=True)
+        ends = np.append(first_positions[1:], len(text_ids))
+        matched_names = grant_names[grant_indexes].tolist()
+        eligible = np.full(len(unique_texts), "", dtype=object)
+        eligible[first_ids] = [", ".join(matched_names[start:end]) for start, end in zip(first_positions, ends)]
+
+        best_grant = np.full(len(unique_texts), "", dtype=object)
+        best_score = np.zeros(len(unique_texts))
+        best_item = np.full(len(unique_texts), "", dtype=object)
+        best_grant[first_ids] = grant_names[grant_indexes[first_positions]]
+        best_score[first_ids] = scores[first_positions]
+        best_item[first_ids] = rule_items[rule_indexes[first_positions]]
+
+        return pd.DataFrame({
+            'eligible grants': eligible[codes],
+            'best grant': best_grant[codes],
+            'match score': best_score[codes].round(2),
+            'matched rule': best_item[codes],
+        }, index=sheet_data.index)
+
+    def eligibility_mask(self, sheet_data, grant_name):
+        """Boolean array: True where a row satisfies the grant's Allowed Items (all False for an unknown grant)."""
+        if grant_name not in self.grant_names:
+            return np.zeros(len(sheet_data), dtype=bool)
+        grant_index = self.grant_names.index(grant_name)
+        if grant_index in self.unrestricted:
+            return np.ones(len(sheet_data), dtype=bool)
+
+        codes, unique_texts = pd.factorize(row_texts(sheet_data))
+        text_ids, grant_indexes, _, _ = self._score_unique(unique_texts)
+        eligible_texts = np.zeros(len(unique_texts), dtype=bool)
+        eligible_texts[text_ids[grant_indexes == grant_index]] = True
+        return eligible_texts[codes]
+
+    def eligible_pairs(self, sheet_data, include_unrestricted=False):
+        """
+        Every (row position, grant index, score) a row is eligible for, as a DataFrame.
+        With include_unrestricted, grants without allowed items are included for every row with score 0.
+        """
+        codes, unique_texts = pd.factorize(row_texts(sheet_data))
+        text_ids, grant_indexes, scores, _ = self._score_unique(unique_texts)
+
+        rows = pd.DataFrame({'row': np.arange(len(sheet_data)), 'text': codes})
+        pairs = rows.merge(pd.DataFrame({'text': text_ids, 'grant': grant_indexes, 'score': scores}), on='text')
+        frames = [pairs[['row', 'grant', 'score']]]
+        for grant_index in sorted(self.unrestricted) if include_unrestricted else []:
+            frames.append(pd.DataFrame({'row': rows['row'], 'grant': grant_index, 'score': 0.0}))
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,225 @@
+"""
+Month-end close as one job.
+
+The close used to be upload, group by month, sum by month, categorize, sum by fund, allocate
+and download, each through its own dialog and each recomputing from scratch. Here it is a
+declarative list of stages run in order over one shared context: the sheets are combined and
+their costs, dates and months are parsed once, every later stage reuses those columns, and
+all results are written to a single workbook. Stages whose inputs are missing are skipped
+and listed in the 'Close Log' sheet.
+"""
+import importlib.util
+import logging
+
+import pandas as pd
+
+from data_loader import clean_cost_series
+from categorizer import find_name_column, explain_rows
+from chart_data import find_date_column, find_category_column
+from dashboard_cache import find_supplier_column
+from allocation_optimizer import plan_allocation
+
+ALL_MONTHS = "All Months"
+SOURCE_SHEET_COLUMN = 'source_sheet'
+MAX_SHEET_NAME_LENGTH = 31  # Excel limit
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_stage(context):
+    """Combine the sheets and parse cost, date and month once for every later stage."""
+    frames = []
+    for sheet_name, sheet_data in context['sheet_dict'].items():
+        frame = sheet_data.set_axis([str(col).lower() for col in sheet_data.columns], axis=1)
+        frame = frame.loc[:, ~frame.columns.duplicated()]  # 'Category' and 'category' collapse to one
+        frames.append(frame.assign(**{SOURCE_SHEET_COLUMN: sheet_name}))
+    data = pd.concat(frames, ignore_index=True, sort=False)
+
+    data['clean_cost'] = clean_cost_series(data['cost'])
+    date_column = find_date_column(data.columns)
+    if date_column is not None:
+        data[date_column] = pd.to_datetime(data[date_column], errors='coerce')
+        data['month'] = data[date_column].dt.to_period('M').astype(str)
+        if context['month'] not in (None, ALL_MONTHS):
+            data = data[data['month'] == context['month']].reset_index(drop=True)
+    context['data'] = data
+    return f"{len(data)} rows from {len(frames)} sheets"
+
+
+def categorize_stage(context):
+    """Categorize the line items unless the sheets already carry a category."""
+    data = context['data']
+    if find_category_column(data.columns) is not None:
+        return "Existing categories kept"
+    name_column = find_name_column(data.columns)
+    if name_column is None:
+        return None
+    explained = explain_rows(data, name_column, context.get('resolver'), context.get('memo'))
+    data['category'] = explained['category'].to_numpy()
+    return f"{data['category'].nunique()} categories"
+
+
+def group_by_month_stage(context):
+    """All line items sorted by month, like Group by Month."""
+    data = context['data']
+    sort_columns = [col for col in ('month', SOURCE_SHEET_COLUMN) if col in data.columns]
+    context['sheets']['Line Items'] = data.sort_values(sort_columns, kind='stable').drop(columns=['clean_cost'])
+    return f"{len(data)} line items"
+
+
+def summarize(data, column):
+    """Total cost and item count per value of a column, like the Sum Costs dialogs."""
+    return data.groupby(column, observed=True).agg(
+        total_cost=('clean_cost', 'sum'), items=('clean_cost', 'size')
+    ).reset_index()
+
+
+def sum_by_month_stage(context):
+    context['sheets']['Costs by Month'] = summarize(context['data'], 'month')
+    return f"{len(context['sheets']['Costs by Month'])} months"
+
+
+def sum_by_category_stage(context):
+    category_column = find_category_column(context['data'].columns)
+    context['sheets']['Costs by Category'] = summarize(context['data'], category_column)
+    return f"{len(context['sheets']['Costs by Category'])} categories"
+
+
+def sum_by_fund_stage(context):
+    context['sheets']['Costs by Fund'] = summarize(context['data'], 'fund_number')
+    return f"{len(context['sheets']['Costs by Fund'])} funds"
+
+
+def sum_by_supplier_stage(context):
+    supplier_column = find_supplier_column(context['data'].columns)
+    summary = summarize(context['data'], supplier_column).sort_values('total_cost', ascending=False)
+    context['sheets']['Costs by Supplier'] = summary
+    return f"{len(summary)} suppliers"
+
+
+def allocate_stage(context):
+    """Proposed allocation of the unallocated items (a preview; grant balances are not changed)."""
+    data = context['data']
+    plan, summary = plan_allocation(data, context['grant_data'])
+
+    name_column = find_name_column(data.columns)
+    if name_column is not None:
+        plan.insert(1, name_column, data[name_column].iloc[plan['row'].to_numpy()].to_numpy())
+    plan.insert(1, SOURCE_SHEET_COLUMN, data[SOURCE_SHEET_COLUMN].iloc[plan['row'].to_numpy()].to_numpy())
+
+    context['sheets']['Allocation Plan'] = plan.drop(columns=['row'])
+    context['sheets']['Grant Summary'] = summary
+    placed = plan['grant'] != ""
+    return f"{placed.sum()} of {len(plan)} items placed, ${plan.loc[placed, 'cost'].sum():.2f}"
+
+
+def has_grants(context):
+    return context['grant_data'] is not None and not context['grant_data'].empty
+
+
+# The close, in order: (stage name, function, columns the stage needs, extra condition)
+MONTHLY_CLOSE_PIPELINE = [
+    ("Prepare", prepare_stage, ['cost'], None),
+    ("Categorize", categorize_stage, [], None),
+    ("Group by Month", group_by_month_stage, ['month'], None),
+    ("Sum by Month", sum_by_month_stage, ['month'], None),
+    ("Sum by Category", sum_by_category_stage, [find_category_column], None),
+    ("Sum by Fund", sum_by_fund_stage, ['fund_number'], None),
+    ("Sum by Supplier", sum_by_supplier_stage, [find_supplier_column], None),
+    ("Allocate", allocate_stage, ['cost'], has_grants),
+]
+
+
+def _missing_requirements(requirements, columns):
+    """Required columns (names, or finder functions returning one) that the data does not have."""
+    missing = []
+    for requirement in requirements:
+        if callable(requirement):
+            if requirement(columns) is None:
+                missing.append(requirement.__name__.replace('find_', '').replace('_', ' '))
+        elif requirement not in columns:
+            missing.append(requirement)
+    return missing
+
+
+def columns_of(sheet_dict, sheet_name):
+    """A sheet's column labels; a SheetStore answers without reading spilled sheets back."""
+    if hasattr(sheet_dict, 'read_columns'):
+        return sheet_dict.columns(sheet_name)
+    return list(sheet_dict[sheet_name].columns)
+
+
+def column_values(sheet_dict, sheet_name, column):
+    """One column of a sheet; a SheetStore maps only that column of a spilled sheet."""
+    if hasattr(sheet_dict, 'read_columns'):
+        return sheet_dict.read_columns(sheet_name, [column])[column]
+    return sheet_dict[sheet_name][column]
+
+
+def sheet_columns(sheet_dict):
+    """Lowercase union of the columns of all sheets."""
+    columns = []
+    for sheet_name in sheet_dict:
+        columns.extend(str(col).lower() for col in columns_of(sheet_dict, sheet_name) if str(col).lower() not in columns)
+    return columns
+
+
+def excel_engine():
+    """xlsxwriter writes large workbooks faster; openpyxl is the fallback."""
+    return 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') is not None else 'openpyxl'
+
+
+def run_monthly_close(sheet_dict, grant_data, output_path, month=None, resolver=None, memo=None,
+                      pipeline=None, progress_callback=None):
+    """
+    Run the close pipeline over the given sheets and write every result to one workbook.
+    progress_callback(done, total, stage name) is called before each stage.
+    Returns the log as a DataFrame (stage, status, details).
+    """
+    pipeline = pipeline or MONTHLY_CLOSE_PIPELINE
+    context = {
+        'sheet_dict': sheet_dict, 'grant_data': grant_data, 'month': month,
+        'resolver': resolver, 'memo': memo, 'sheets': {}, 'data': None,
+    }
+
+    log = []
+    for index, (name, stage, requirements, condition) in enumerate(pipeline):
+        if progress_callback is not None:
+            progress_callback(index, len(pipeline), name)
+
+        columns = sheet_columns(sheet_dict) if context['data'] is None else context['data'].columns
+        missing = _missing_requirements(requirements, columns)
+        if missing:
+            log.append((name, "Skipped", f"Missing: {', '.join(missing)}"))
+            if index == 0:
+                break  # Nothing can run without the prepared data
+            continue
+        if condition is not None and not condition(context):
+            log.append((name, "Skipped", "Not applicable"))
+            continue
+
+        details = stage(context)
+        log.append((name, "Done" if details is not None else "Skipped", details or "Nothing to do"))
+        logger.debug("Monthly close stage '%s': %s", name, details)
+
+    log = pd.DataFrame(log, columns=['stage', 'status', 'details'])
+    if progress_callback is not None:
+        progress_callback(len(pipeline), len(pipeline), "Writing workbook")
+
+    with pd.ExcelWriter(output_path, engine=excel_engine()) as writer:
+        for sheet_name, sheet_data in context['sheets'].items():
+            sheet_data.to_excel(writer, sheet_name=sheet_name[:MAX_SHEET_NAME_LENGTH], index=False)
+        log.to_excel(writer, sheet_name="Close Log", index=False)
+    return log
+
+
+def available_months(sheet_dict):
+    """Months ('YYYY-MM') found in the date column of any sheet, newest first."""
+    months = set()
+    for sheet_name in sheet_dict:
+        lower = {str(col).lower(): col for col in columns_of(sheet_dict, sheet_name)}
+        date_column = find_date_column(list(lower))
+        if date_column is not None:
+            dates = pd.to_datetime(column_values(sheet_dict, sheet_name, lower[date_column]), errors='coerce').dropna()
+            months.update(dates.dt.to_period('M').astype(str).unique())
+    return sorted(months, reverse=True)
@@ -0,0 +1,126 @@
+"""
+A persistent matplotlib canvas for the sheet charts.
+
+One figure and one axes are created per canvas and reused for every chart. Line charts keep
+their Line2D and only swap its data; bar charts only change bar heights when the labels are
+unchanged. Long series are downsampled to the visible pixel width, and re-downsampled over the
+visible range when the view is zoomed or panned (with the toolbar from make_toolbar), so a
+million-row column draws as fast as a thousand-row one.
+"""
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from matplotlib.figure import Figure
+
+from chart_data import downsample_minmax
+
+MIN_BUCKETS = 200  # Buckets used before the canvas has a real width
+MARKER_POINT_LIMIT = 200  # Series with more points are drawn without markers
+LINE_COLOR = 'blue'
+BAR_COLOR = '#4CAF50'
+
+
+class PlotCanvas(FigureCanvas):
+    def __init__(self, parent=None):
+        super().__init__(Figure(figsize=(6, 4)))
+        self.setParent(parent)
+        self.ax = self.figure.add_subplot(111)
+        self.kind = None  # 'line', 'date' or 'bar'
+        self.line = None
+        self.bars = None
+        self.bar_labels = []
+        self.series = None  # Full-resolution (x, y) of the line chart
+        self.refreshing = False
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+
+    def make_toolbar(self, parent=None):
+        """Matplotlib's zoom/pan toolbar for this canvas, to be laid out next to it."""
+        return NavigationToolbar(self, parent)
+
+    def bucket_count(self):
+        return max(int(self.width()), MIN_BUCKETS)
+
+    def reset_axes(self, kind):
+        """Start over only when the chart type changes; otherwise the artists are reused."""
+        if kind == self.kind:
+            return
+        self.ax.cla()
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+        self.line, self.bars, self.bar_labels, self.series = None, None, [], None
+        self.kind = kind
+        if kind == 'date':
+            self.ax.xaxis_date()
+        self.ax.grid(True)
+
+    def set_titles(self, title, x_label, y_label):
+        self.ax.set_title(title)
+        self.ax.set_xlabel(x_label)
+        self.ax.set_ylabel(y_label)
+
+    def plot_series(self, x, y, title, x_label, y_label, x_is_date=False):
+        """Draw a line of y against x, downsampled to the canvas width. Points are sorted by x first if needed."""
+        kind = 'date' if x_is_date else 'line'
+        self.reset_axes(kind)
+
+        x = mdates.date2num(np.asarray(x, dtype='datetime64[ns]')) if x_is_date else np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if np.any(np.diff(x) < 0):  # Downsampling and zooming look ranges up by position
+            order = np.argsort(x, kind='stable')
+            x, y = x[order], y[order]
+        self.series = (x, y)
+        x_points, y_points = downsample_minmax(x, self.series[1], self.bucket_count())
+
+        if self.line is None:
+            self.line, = self.ax.plot(x_points, y_points, linestyle='-', color=LINE_COLOR)
+        else:
+            self.line.set_data(x_points, y_points)
+        self.line.set_marker('o' if len(x_points) <= MARKER_POINT_LIMIT else '')
+
+        self.set_titles(title, x_label, y_label)
+        self.refreshing = True
+        try:
+            self.ax.relim()
+            self.ax.autoscale_view()
+        finally:
+            self.refreshing = False
+        if x_is_date:
+            self.figure.autofmt_xdate()
+        self.draw_idle()
+
+    def plot_categories(self, labels, values, title, x_label, y_label):
+        """Draw one bar per label. Bars are reused when the labels have not changed."""
+        self.reset_axes('bar')
+        labels = [str(label) for label in labels]
+        values = np.asarray(values, dtype=float)
+
+        if self.bars is not None and labels == self.bar_labels:
+            for bar, value in zip(self.bars, values):
+                bar.set_height(value)
+        else:
+            if self.bars is not None:
+                self.bars.remove()
+            positions = np.arange(len(labels))
+            self.bars = self.ax.bar(positions, values, color=BAR_COLOR)
+            self.ax.set_xticks(positions)
+            self.ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+            self.bar_labels = labels
+
+        self.set_titles(title, x_label, y_label)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.figure.tight_layout()
+        self.draw_idle()
+
+    def on_xlim_changed(self, ax):
+        """Re-downsample the visible range after a zoom or pan."""
+        if self.refreshing or self.line is None or self.series is None:
+            return
+        x, y = self.series
+        low, high = ax.get_xlim()
+        start = max(np.searchsorted(x, low, side='left') - 1, 0)
+        end = min(np.searchsorted(x, high, side='right') + 1, len(x))
+        x_points, y_points = downsample_minmax(x[start:end], y[start:end], self.bucket_count())
+        self.line.set_data(x_points, y_points)
+        self.line.set_marker('o' if len(x_points) <= MARKER_POINT_LIMIT else '')
+        self.draw_idle()
@@ -0,0 +1,214 @@
+"""
+Timing and memory instrumentation for the handler actions.
+
+@profile_public_methods wraps every public method of a class so each call is recorded as an
+action: wall time, rows processed (the size of the handler's current sheet or grant table)
+and, when memory tracking is on, peak traced memory. Inside a method, `with profile_phase(...)`
+breaks an action into phases (parsing, matching, table population, ...), and public methods
+called by other public methods show up as phases of the outer action. Records go to a
+rotating log file and to an in-memory history read by the debug panel; each top-level action
+can also be run under cProfile with the stats dumped to a .prof file. Dialogs opened by an
+action are run under profiling_suspended, so time spent waiting on the user is left out, and
+methods marked @not_profiled (cheap slots called on every selection change) are not wrapped.
+"""
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+
+PROFILE_LOG_FILE_NAME = "profile.log"
+PROFILE_LOG_MAX_BYTES = 1024 ** 2
+PROFILE_LOG_BACKUP_COUNT = 3
+PROFILE_HISTORY_SIZE = 500  # Records kept in memory for the debug panel
+CPROFILE_DIRECTORY_NAME = "cprofile"
+
+# Switched from the debug panel
+settings = {
+    'enabled': True,
+    'track_memory': False,  # tracemalloc slows allocation-heavy code, so it is opt-in
+    'cprofile': False,  # Dump a .prof file per top-level action
+    'cprofile_directory': None,
+}
+
+history = deque(maxlen=PROFILE_HISTORY_SIZE)
+_totals = {'records': 0}  # Records ever written, so viewers can tell when the full deque changed
+logger = logging.getLogger("profiling")
+logger.propagate = False
+_state = threading.local()
+
+
+def configure_profiling(log_directory):
+    """Send records to a rotating log in log_directory; cProfile dumps go to its 'cprofile' subfolder."""
+    os.makedirs(log_directory, exist_ok=True)
+    log_path = os.path.join(log_directory, PROFILE_LOG_FILE_NAME)
+    if not any(getattr(handler, 'baseFilename', None) == os.path.abspath(log_path) for handler in logger.handlers):
+        handler = RotatingFileHandler(log_path, maxBytes=PROFILE_LOG_MAX_BYTES, backupCount=PROFILE_LOG_BACKUP_COUNT)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    settings['cprofile_directory'] = os.path.join(log_directory, CPROFILE_DIRECTORY_NAME)
+
+
+def set_memory_tracking(enabled):
+    settings['track_memory'] = enabled
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _stack():
+    if not hasattr(_state, 'stack'):
+        _state.stack = []
+    return _state.stack
+
+
+def count_rows(instance):
+    """Rows the handler is working on: its current sheet, or its grant table."""
+    for attribute in ('sheet_data', 'grant_data'):
+        data = getattr(instance, attribute, None)
+        if isinstance(data, pd.DataFrame):
+            return len(data)
+    return None
+
+
+def _record(action, phase, depth, seconds, rows, peak_bytes):
+    record = {
+        'time': time.strftime("%H:%M:%S"),
+        'action': action,
+        'phase': phase,
+        'depth': depth,
+        'seconds': round(seconds, 4),
+        'rows': rows,
+        'peak_mb': round(peak_bytes / 1024 ** 2, 2) if peak_bytes is not None else None,
+    }
+    history.append(record)
+    _totals['records'] += 1
+    logger.info(
+        "%s%s | %s | %.4fs | rows=%s | peak_mb=%s",
+        "  " * depth, action, phase, seconds, rows, record['peak_mb']
+    )
+    return record
+
+
+@contextmanager
+def profile_phase(name, rows=None):
+    """
+    Time a block as a phase of the current action. Yields a dict whose 'rows' entry can be
+    set inside the block once the number of rows processed is known.
+    """
+    phase = {'rows': rows}
+    if not settings['enabled']:
+        yield phase
+        return
+
+    stack = _stack()
+    action = stack[0]['name'] if stack else name
+    tracking = settings['track_memory'] and tracemalloc.is_tracing()
+    if tracking:
+        # The peak counter is global: hand the peak so far to the enclosing phase before resetting it
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    entry = {'name': name, 'peak': 0, 'paused': 0.0}
+    stack.append(entry)
+    start = time.perf_counter()
+    try:
+        yield phase
+    finally:
+        seconds = time.perf_counter() - start - entry['paused']
+        peak = max(entry['peak'], tracemalloc.get_traced_memory()[1]) if tracking else None
+        stack.pop()
+        if tracking and stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        _record(action, name, len(stack), seconds, phase['rows'], peak)
+
+
+@contextmanager
+def profiling_suspended():
+    """
+    Start a fresh action stack, e.g. around a modal dialog's exec_(), so actions triggered from
+    inside the dialog are recorded on their own rather than as phases of the action that opened it.
+    The time spent inside is not counted in the phases that were running.
+    """
+    saved = list(_stack())
+    _stack().clear()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        paused = time.perf_counter() - start
+        for entry in saved:
+            entry['paused'] += paused
+        _stack()[:] = saved
+
+
+def profiled(function):
+    """Record every call of a method as an action (or as a phase when called from another action)."""
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not settings['enabled']:
+            return function(*args, **kwargs)
+
+        top_level = not _stack()
+        profiler = cProfile.Profile() if top_level and settings['cprofile'] and settings['cprofile_directory'] else None
+        with profile_phase(name) as phase:
+            if profiler is not None:
+                try:
+                    profiler.enable()
+                except ValueError:  # Another profiler is already active
+                    profiler = None
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    dump_profile(profiler, name)
+                if phase['rows'] is None and args:
+                    phase['rows'] = count_rows(args[0])
+
+    return wrapper
+
+
+def dump_profile(profiler, name):
+    directory = settings['cprofile_directory']
+    try:
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.prof"))
+    except OSError as e:
+        logger.warning("Error writing the cProfile dump: %s", e)
+
+
+def not_profiled(function):
+    """Keep a public method out of profile_public_methods, e.g. a slot run on every selection change."""
+    function.not_profiled = True
+    return function
+
+
+def profile_public_methods(cls):
+    """Class decorator: wrap every public method defined on the class with @profiled, except @not_profiled ones."""
+    for attribute, value in list(vars(cls).items()):
+        if not attribute.startswith('_') and inspect.isfunction(value) and not getattr(value, 'not_profiled', False):
+            setattr(cls, attribute, profiled(value))
+    return cls
+
+
+def record_count():
+    return _totals['records']
+
+
+def summarize_history(records=None):
+    """History as a DataFrame, newest first."""
+    records = list(history) if records is None else records
+    return pd.DataFrame(records[::-1], columns=['time', 'action', 'phase', 'depth', 'seconds', 'rows', 'peak_mb'])
@@ -0,0 +1,226 @@
+"""
+Off-screen chart reports.
+
+A workbook (or a folder of workbooks) is loaded and aggregated once in this process into
+small page specifications: an overview page (cost per month, category, fund and supplier)
+and one page per grant (balance, monthly allocations and what its allocated items were).
+The pages are drawn as vector graphics into a multi-page PDF (sharp at any zoom, with
+selectable text). PNG copies of the pages, if asked for, are rendered with the
+non-interactive Agg canvas in worker processes, one page per task. No Qt or pyplot is used,
+so this runs fine next to the GUI.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+import matplotlib.dates as mdates
+
+from data_loader import load_file_for_merge, is_data_file
+from categorizer import find_name_column, categorize_rows
+from chart_data import find_date_column, find_category_column, cost_by_month, cost_by_group
+from dashboard_cache import find_supplier_column
+from allocation_optimizer import grant_balances, ALLOCATED_GRANT_COLUMN
+from forecasting import monthly_spend
+
+PAGE_SIZE = (11, 8.5)  # Landscape letter, in inches
+REPORT_DPI = 120
+PARALLEL_REPORT_THRESHOLD = 4  # Fewer pages are rendered in this process
+LINE_COLOR = 'blue'
+BAR_COLOR = '#4CAF50'
+
+logger = logging.getLogger(__name__)
+
+
+def report_files(paths):
+    """Expand folders into the data files they contain, keeping the given order."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if is_data_file(os.path.join(path, name))
+            )
+        elif is_data_file(path):
+            files.append(path)
+    return files
+
+
+def load_report_data(file_paths):
+    """All sheets of all files as one DataFrame with lowercase columns and a 'category' column."""
+    frames = []
+    for file_path in file_paths:
+        frames.extend(load_file_for_merge(file_path).values())
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames, ignore_index=True, sort=False)
+
+    if find_category_column(data.columns) is None:
+        name_column = find_name_column(data.columns)
+        if name_column is not None:
+            data['category'] = categorize_rows(data, name_column)
+    return data
+
+
+def line_chart(title, series, x_label, y_label):
+    return {'kind': 'line', 'title': title, 'x': series.index.to_numpy(), 'y': series.to_numpy(dtype=float),
+            'x_label': x_label, 'y_label': y_label}
+
+
+def bar_chart(title, series, x_label, y_label):
+    return {'kind': 'bar', 'title': title, 'x': [str(label) for label in series.index], 'y': series.to_numpy(dtype=float),
+            'x_label': x_label, 'y_label': y_label}
+
+
+def overview_page(data, title):
+    """Workbook-wide charts; charts whose columns are missing are left out."""
+    charts = []
+    if 'cost' in data.columns:
+        date_column = find_date_column(data.columns)
+        if date_column is not None:
+            monthly = cost_by_month(data, date_column)
+            if not monthly.empty:
+                charts.append(line_chart("Cost by Month", monthly, "Month", "Cost"))
+        category_column = find_category_column(data.columns)
+        if category_column is not None:
+            charts.append(bar_chart("Cost by Category", cost_by_group(data, category_column), "Category", "Cost"))
+        if 'fund_number' in data.columns:
+            charts.append(bar_chart("Cost by Fund", cost_by_group(data, 'fund_number'), "Fund Number", "Cost"))
+        supplier_column = find_supplier_column(data.columns)
+        if supplier_column is not None:
+            charts.append(bar_chart("Top Suppliers", cost_by_group(data, supplier_column, limit=11), "Supplier", "Cost"))
+    return {'title': title, 'charts': charts}
+
+
+def grant_pages(data, grant_data, ledger=None):
+    """One page per grant: its balance, monthly allocations from the ledger and its allocated items."""
+    balances = grant_balances(grant_data)
+    totals = pd.to_numeric(grant_data['Total Balance'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    spend = pd.DataFrame()
+    if ledger is not None and not ledger.empty and 'Date' in ledger.columns:
+        spend = monthly_spend(ledger, pd.Timestamp.now())
+
+    allocated_rows = {}
+    if ALLOCATED_GRANT_COLUMN in data.columns and 'cost' in data.columns:
+        allocated_rows = {grant: rows for grant, rows in data.groupby(ALLOCATED_GRANT_COLUMN, observed=True)}
+    category_column = find_category_column(data.columns)
+
+    pages = []
+    for position, (grant_id, grant_name) in enumerate(zip(grant_data['Grant ID'], grant_data['Grant Name'])):
+        balance = pd.Series({
+            'Total': totals[position],
+            'Allocated': totals[position] - balances[position],
+            'Remaining': balances[position],
+        })
+        charts = [bar_chart("Balance", balance, "", "Amount")]
+        if grant_id in spend.columns and spend[grant_id].any():
+            charts.append(line_chart("Allocations by Month", spend[grant_id], "Month", "Allocated"))
+        rows = allocated_rows.get(grant_name)
+        if rows is not None and category_column is not None:
+            charts.append(bar_chart("Allocated Items by Category", cost_by_group(rows, category_column), "Category", "Cost"))
+        pages.append({'title': f"{grant_name} ({grant_id})", 'charts': charts})
+    return pages
+
+
+def draw_page(page, figure):
+    """Draw one page specification into a figure."""
+    figure.suptitle(page['title'], fontsize=16)
+
+    charts = page['charts']
+    if not charts:
+        figure.text(0.5, 0.5, "No chartable data", ha='center', va='center', fontsize=14)
+    columns = 1 if len(charts) == 1 else 2
+    rows = max(1, -(-len(charts) // columns))
+    for index, chart in enumerate(charts):
+        ax = figure.add_subplot(rows, columns, index + 1)
+        if chart['kind'] == 'line':
+            x = np.asarray(chart['x'])
+            if np.issubdtype(x.dtype, np.datetime64):
+                x = mdates.date2num(x)
+                ax.xaxis_date()
+                ax.tick_params(axis='x', labelrotation=30)
+            ax.plot(x, chart['y'], marker='o' if len(x) <= 60 else '', linestyle='-', color=LINE_COLOR)
+        else:
+            positions = np.arange(len(chart['x']))
+            ax.bar(positions, chart['y'], color=BAR_COLOR)
+            ax.set_xticks(positions)
+            ax.set_xticklabels(chart['x'], rotation=45, ha='right', fontsize=8)
+        ax.set_title(chart['title'])
+        ax.set_xlabel(chart['x_label'])
+        ax.set_ylabel(chart['y_label'])
+        ax.grid(True)
+    figure.tight_layout(rect=(0, 0, 1, 0.95))
+
+
+def render_page(page, dpi=REPORT_DPI):
+    """Render one page specification to PNG bytes with the Agg canvas. Runs in worker processes."""
+    figure = Figure(figsize=PAGE_SIZE, dpi=dpi)
+    FigureCanvasAgg(figure)
+    draw_page(page, figure)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=dpi)
+    return buffer.getvalue()
+
+
+def render_pages(pages, max_workers=None, progress_callback=None):
+    """Render all pages, across worker processes when there are enough of them. Returns PNG bytes in page order."""
+    images = [None] * len(pages)
+    workers = max_workers or os.cpu_count() or 1
+    if len(pages) >= PARALLEL_REPORT_THRESHOLD and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(render_page, page): index for index, page in enumerate(pages)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                images[futures[future]] = future.result()
+                if progress_callback is not None:
+                    progress_callback(done, len(pages))
+    else:
+        for index, page in enumerate(pages):
+            images[index] = render_page(page)
+            if progress_callback is not None:
+                progress_callback(index + 1, len(pages))
+    return images
+
+
+def write_pdf(pages, output_path, progress_callback=None):
+    """Draw the page specifications as vector pages of one multi-page PDF."""
+    with PdfPages(output_path) as pdf:
+        for index, page in enumerate(pages):
+            figure = Figure(figsize=PAGE_SIZE)
+            draw_page(page, figure)
+            pdf.savefig(figure)
+            if progress_callback is not None:
+                progress_callback(index + 1, len(pages))
+
+
+def generate_report(paths, grant_data, output_path, ledger=None, png_directory=None, max_workers=None, progress_callback=None):
+    """
+    Render the chart pack of the given workbooks/folders into a multi-page PDF at output_path
+    (and one PNG per page in png_directory, if given). Returns the number of pages.
+    """
+    file_paths = report_files(paths)
+    if not file_paths:
+        raise ValueError("No supported data files were found")
+
+    # Step 1: Load and aggregate in this process; the page specs are small
+    data = load_report_data(file_paths)
+    title = os.path.basename(file_paths[0]) if len(file_paths) == 1 else f"{len(file_paths)} files"
+    pages = [overview_page(data, f"Overview: {title}")] + grant_pages(data, grant_data, ledger)
+
+    # Step 2: Draw the PDF from the page specs
+    write_pdf(pages, output_path, progress_callback)
+
+    # Step 3: PNG copies, rendered in parallel, one task per page
+    if png_directory:
+        images = render_pages(pages, max_workers)
+        os.makedirs(png_directory, exist_ok=True)
+        for index, image in enumerate(images, start=1):
+            with open(os.path.join(png_directory, f"page_{index:03d}.png"), "wb") as f:
+                f.write(image)
+    logger.debug("Report written to %s: %d pages from %d files", output_path, len(pages), len(file_paths))
+    return len(pages)
@@ -0,0 +1,97 @@
+"""
+In-memory inverted index over the text columns of loaded sheets (item name/description,
+supplier, catalog number), so a search across every sheet is a few dictionary lookups
+instead of a scan of every cell.
+"""
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+from categorizer import find_name_column
+
+SEARCH_COLUMN_KEYWORDS = ['name', 'description', 'supplier', 'vendor', 'catalog', 'cat #', 'cat no', 'product']
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a value, so 'AB-1234' is found by 'ab' or '1234'."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def find_search_columns(columns):
+    """Text columns worth indexing: the item name column plus supplier/description/catalog columns."""
+    search_columns = [col for col in columns if any(keyword in str(col).lower() for keyword in SEARCH_COLUMN_KEYWORDS)]
+    name_column = find_name_column(columns)
+    if name_column is not None and name_column not in search_columns:
+        search_columns.insert(0, name_column)
+    return search_columns
+
+
+class _ColumnIndex:
+    """
+    Index of one column. Values are factorized first, so each distinct string is tokenized
+    once; postings point at distinct values and are expanded to rows through the codes.
+    """
+
+    def __init__(self, series):
+        self.codes, uniques = pd.factorize(series)
+        postings = {}
+        for value_id, value in enumerate(uniques):
+            for token in set(tokenize(value)):
+                postings.setdefault(token, []).append(value_id)
+        self.postings = {token: np.array(ids) for token, ids in postings.items()}
+        self.tokens = sorted(self.postings)
+
+    def match(self, term):
+        """Boolean row mask of values having a token that starts with `term`."""
+        start = bisect.bisect_left(self.tokens, term)
+        end = bisect.bisect_left(self.tokens, term + "\uffff")
+        if start == end:
+            return np.zeros(len(self.codes), dtype=bool)
+        value_ids = np.concatenate([self.postings[token] for token in self.tokens[start:end]])
+        return np.isin(self.codes, value_ids)
+
+
+class SearchIndex:
+    def __init__(self, excel_data=None):
+        self.sheets = {}  # {sheet_name: {column: _ColumnIndex}}
+        self.row_counts = {}
+        for sheet_name, sheet_data in (excel_data or {}).items():
+            self.add_sheet(sheet_name, sheet_data)
+
+    def add_sheet(self, sheet_name, sheet_data):
+        """Index (or re-index after edits) one sheet."""
+        self.sheets[sheet_name] = {
+            col: _ColumnIndex(sheet_data[col]) for col in find_search_columns(sheet_data.columns)
+        }
+        self.row_counts[sheet_name] = len(sheet_data)
+
+    def is_current(self, sheet_name, sheet_data):
+        return sheet_name in self.sheets and self.row_counts[sheet_name] == len(sheet_data)
+
+    def search(self, query):
+        """
+        Return {sheet_name: array of row positions} for rows where every word of the query
+        is the start of a word in one of the indexed columns. Sheets without matches are left out.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return {}
+
+        results = {}
+        for sheet_name, column_indexes in self.sheets.items():
+            if not column_indexes:
+                continue
+            mask = np.ones(self.row_counts[sheet_name], dtype=bool)
+            for term in terms:
+                term_mask = np.zeros(self.row_counts[sheet_name], dtype=bool)
+                for column_index in column_indexes.values():
+                    term_mask |= column_index.match(term)
+                mask &= term_mask
+            rows = np.flatnonzero(mask)
+            if len(rows):
+                results[sheet_name] = rows
+        return results
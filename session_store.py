@@ -0,0 +1,104 @@
+"""
+The open sheets and their view state, kept between runs.
+
+When the sheet window closes, every sheet of ExcelHandler.sheet_dict (with its derived
+columns such as 'month', 'category' or 'eligible grants') is written as an uncompressed
+Arrow IPC (Feather) file, next to a manifest with the sheet order, the current sheet, the
+group colors and the column each grouped sheet is colored by. Restoring maps the files back
+without parsing or copying them, so the last session reopens at once however large its
+workbooks were. Sheets the SheetStore has already spilled are copied file to file.
+"""
+import json
+import os
+import shutil
+import time
+
+from sheet_store import write_feather, read_feather
+
+SESSION_DIRECTORY_NAME = "session"
+MANIFEST_FILE_NAME = "manifest.json"
+SESSION_FORMAT_VERSION = 1
+
+
+def json_value(value):
+    """A group value JSON can hold: numpy scalars become Python numbers, anything else unusual a string."""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def write_session_sheet(sheet_data, path):
+    try:
+        write_feather(sheet_data, path)
+    except (ValueError, TypeError):
+        # Object columns mixing numbers and text cannot be stored as one Arrow type
+        object_columns = sheet_data.select_dtypes(include='object').columns
+        write_feather(sheet_data.astype({col: str for col in object_columns}), path)
+
+
+def save_session(directory, sheet_dict, current_sheet=None, group_color_mapping=None, sheet_groupings=None):
+    """
+    Write the sheets and view state to directory. The new session is written next to the old
+    one and swapped in at the end, so an interrupted save leaves the previous session intact.
+    """
+    staging = directory + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    # Step 1: One Arrow file per sheet
+    sheets = []
+    spilled = getattr(sheet_dict, 'spilled', {})
+    for index, sheet_name in enumerate(sheet_dict):
+        file_name = f"sheet_{index}.arrow"
+        if sheet_name in spilled:
+            shutil.copyfile(spilled[sheet_name], os.path.join(staging, file_name))  # Already in the same format
+        else:
+            write_session_sheet(sheet_dict[sheet_name], os.path.join(staging, file_name))
+        sheets.append({'name': sheet_name, 'file': file_name})
+
+    # Step 2: The manifest
+    manifest = {
+        'version': SESSION_FORMAT_VERSION,
+        'saved': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'sheets': sheets,
+        'current_sheet': current_sheet,
+        'group_colors': [[json_value(value), color] for value, color in (group_color_mapping or {}).items()],
+        'sheet_groupings': sheet_groupings or {},
+    }
+    with open(os.path.join(staging, MANIFEST_FILE_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+    # Step 3: Swap it in
+    previous = directory + ".old"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)  # Files still mapped (Windows) go with the next save
+
+
+def session_info(directory):
+    """The manifest of the saved session, or None if there is no usable one."""
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != SESSION_FORMAT_VERSION or not manifest.get('sheets'):
+        return None
+    return manifest
+
+
+def load_session(directory):
+    """
+    Map the saved sheets back. Returns ({sheet_name: DataFrame}, manifest) with the group colors
+    as a dict, or (None, None) if there is no saved session.
+    """
+    manifest = session_info(directory)
+    if manifest is None:
+        return None, None
+    sheets = {entry['name']: read_feather(os.path.join(directory, entry['file'])) for entry in manifest['sheets']}
+    manifest['group_colors'] = {value: color for value, color in manifest['group_colors']}
+    return sheets, manifest
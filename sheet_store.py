@@ -0,0 +1,233 @@
+"""
+Open sheets kept within a memory budget.
+
+SheetStore is the dict of the sheets shown in the sheet window (ExcelHandler.sheet_dict).
+When the sheets held in memory grow past the budget, the least recently used ones are
+written to Feather (Arrow IPC) files in a spill folder and dropped from memory; the sheet
+being worked on is never spilled. A spilled sheet is read back through a memory map the
+next time it is looked up, e.g. when its tab is activated. Without pyarrow, or with a
+budget of 0, every sheet stays in memory.
+"""
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+DEFAULT_MEMORY_BUDGET_MB = 1024
+MEMORY_BUDGET_FILE_NAME = "memory_budget.json"
+SPILL_DIRECTORY_NAME = "spill"
+BYTES_PER_MB = 1024 ** 2
+MEMORY_MAPPED_ATTR = 'memory_mapped'  # Set in DataFrame.attrs of sheets whose columns are read-only file mappings
+
+logger = logging.getLogger(__name__)
+
+
+def spill_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def frame_bytes(sheet_data):
+    """Memory held by a DataFrame, including the strings of object columns."""
+    return int(sheet_data.memory_usage(index=True, deep=True).sum())
+
+
+def load_memory_budget(path):
+    """Budget in MB saved at path, or the default."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(json.load(f).get('budget_mb', DEFAULT_MEMORY_BUDGET_MB))
+    except (OSError, ValueError, TypeError):
+        return DEFAULT_MEMORY_BUDGET_MB
+
+
+def save_memory_budget(path, budget_mb):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'budget_mb': int(budget_mb)}, f)
+
+
+def write_feather(sheet_data, path):
+    """Write a sheet (index included) as an uncompressed Feather file, so it can be memory-mapped back."""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    feather.write_feather(pa.Table.from_pandas(sheet_data, preserve_index=True), path, compression='uncompressed')
+
+
+def read_feather(path):
+    """
+    Read a Feather file through a memory map without copying the columns. They are read-only
+    views of the file, so the frame is flagged with MEMORY_MAPPED_ATTR; see writable_copy.
+    """
+    import pyarrow.feather as feather
+    sheet_data = feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+    sheet_data.attrs[MEMORY_MAPPED_ATTR] = True
+    return sheet_data
+
+
+def writable_copy(sheet_data):
+    """A sheet that can be changed in place: memory-mapped sheets are copied, others returned as they are."""
+    if not sheet_data.attrs.get(MEMORY_MAPPED_ATTR):
+        return sheet_data
+    sheet_data = sheet_data.copy()
+    sheet_data.attrs.pop(MEMORY_MAPPED_ATTR, None)
+    return sheet_data
+
+
+class SheetStore(MutableMapping):
+    def __init__(self, spill_directory, budget_mb=DEFAULT_MEMORY_BUDGET_MB, listener=None):
+        self.spill_directory = spill_directory
+        self.budget_mb = budget_mb  # 0 keeps everything in memory
+        self.listener = listener  # listener(sheet_name, spilled) after a sheet is spilled or read back
+        self.names = {}  # Every sheet name, in the order the sheets were added
+        self.resident = OrderedDict()  # {sheet_name: DataFrame}, least recently used first
+        self.sizes = {}  # {sheet_name: bytes}, of the resident sheets
+        self.spilled = {}  # {sheet_name: Feather path}
+        self.spilled_columns = {}  # {sheet_name: column labels}, of the spilled sheets
+        self.unspillable = set()  # Sheets pyarrow could not write (e.g. mixed-type object columns)
+        self.pinned = None  # The sheet being worked on
+        self.directory = None  # This store's folder inside spill_directory, created on the first spill
+        self.file_numbers = itertools.count()
+
+    def __getitem__(self, sheet_name):
+        if sheet_name in self.resident:
+            self.resident.move_to_end(sheet_name)
+            return self.resident[sheet_name]
+        if sheet_name not in self.spilled:
+            raise KeyError(sheet_name)
+
+        # Read the sheet back; the file stays until close() since its pages may still be mapped
+        path = self.spilled.pop(sheet_name)
+        self.spilled_columns.pop(sheet_name, None)
+        sheet_data = read_feather(path)
+        self.resident[sheet_name] = sheet_data
+        self.sizes[sheet_name] = frame_bytes(sheet_data)
+        logger.debug("Sheet '%s' read back from %s", sheet_name, path)
+        if self.listener is not None:
+            self.listener(sheet_name, False)
+        self.enforce_budget(keep=sheet_name)
+        return sheet_data
+
+    def __setitem__(self, sheet_name, sheet_data):
+        self.spilled.pop(sheet_name, None)
+        self.spilled_columns.pop(sheet_name, None)
+        self.unspillable.discard(sheet_name)
+        self.names[sheet_name] = None
+        self.resident[sheet_name] = sheet_data
+        self.resident.move_to_end(sheet_name)
+        self.sizes[sheet_name] = frame_bytes(sheet_data)
+        self.enforce_budget(keep=sheet_name)
+
+    def __delitem__(self, sheet_name):
+        del self.names[sheet_name]
+        self.resident.pop(sheet_name, None)
+        self.sizes.pop(sheet_name, None)
+        self.spilled.pop(sheet_name, None)
+        self.spilled_columns.pop(sheet_name, None)
+        self.unspillable.discard(sheet_name)
+
+    def __iter__(self):
+        return iter(list(self.names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, sheet_name):
+        return sheet_name in self.names
+
+    def is_spilled(self, sheet_name):
+        return sheet_name in self.spilled
+
+    def columns(self, sheet_name):
+        """Column labels of a sheet, without reading it back if it is spilled."""
+        if sheet_name in self.spilled:
+            return self.spilled_columns[sheet_name]
+        return list(self[sheet_name].columns)
+
+    def read_columns(self, sheet_name, columns):
+        """
+        Some columns of a sheet. A spilled sheet stays on disk: only these columns are mapped
+        from its file, and it is neither made resident nor counted against the budget.
+        """
+        if sheet_name not in self.spilled:
+            return self[sheet_name][columns]
+        import pyarrow.feather as feather
+        labels = {str(col): col for col in self.spilled_columns[sheet_name]}
+        table = feather.read_table(self.spilled[sheet_name], columns=[str(col) for col in columns], memory_map=True)
+        sheet_data = table.to_pandas(split_blocks=True)
+        return sheet_data.set_axis([labels[name] for name in sheet_data.columns], axis=1)
+
+    def pin(self, sheet_name):
+        """
+        Keep the sheet being worked on in memory, as a writable frame: code holding it may
+        still change it in place.
+        """
+        self.pinned = sheet_name
+        if sheet_name in self.names:
+            self.resident[sheet_name] = writable_copy(self[sheet_name])
+
+    def set_budget(self, budget_mb):
+        self.budget_mb = budget_mb
+        self.enforce_budget()
+
+    def resident_bytes(self):
+        return sum(self.sizes.values())
+
+    def enforce_budget(self, keep=None):
+        """Spill least recently used sheets until the resident ones fit the budget."""
+        if not self.budget_mb or not spill_available():
+            return
+        # The sheet being worked on may have been changed in place (e.g. a 'category' column added)
+        if self.pinned in self.resident:
+            self.sizes[self.pinned] = frame_bytes(self.resident[self.pinned])
+        budget = self.budget_mb * BYTES_PER_MB
+        for sheet_name in list(self.resident):
+            if self.resident_bytes() <= budget:
+                break
+            if sheet_name not in (keep, self.pinned) and sheet_name not in self.unspillable:
+                self.spill(sheet_name)
+
+    def spill(self, sheet_name):
+        """Write a resident sheet to disk and drop it from memory."""
+        import pyarrow as pa
+        if self.directory is None:
+            os.makedirs(self.spill_directory, exist_ok=True)
+            self.directory = tempfile.mkdtemp(prefix="sheets_", dir=self.spill_directory)
+        path = os.path.join(self.directory, f"sheet_{next(self.file_numbers)}.feather")
+        try:
+            write_feather(self.resident[sheet_name], path)
+        except (ValueError, TypeError, OSError, pa.ArrowException) as e:
+            # e.g. ArrowNotImplementedError for object columns holding lists or dicts
+            logger.warning("Sheet '%s' kept in memory, it could not be spilled: %s", sheet_name, e)
+            self.unspillable.add(sheet_name)
+            return False
+
+        self.spilled_columns[sheet_name] = list(self.resident.pop(sheet_name).columns)
+        size = self.sizes.pop(sheet_name)
+        self.spilled[sheet_name] = path
+        logger.debug("Sheet '%s' spilled to %s (%.1f MB)", sheet_name, path, size / BYTES_PER_MB)
+        if self.listener is not None:
+            self.listener(sheet_name, True)
+        return True
+
+    def memory_summary(self):
+        text = f"Sheets in memory: {self.resident_bytes() / BYTES_PER_MB:.1f} MB"
+        if self.budget_mb and spill_available():
+            text += f" of {self.budget_mb} MB budget"
+        if self.spilled:
+            text += f", {len(self.spilled)} of {len(self.names)} sheets on disk"
+        return text
+
+    def close(self):
+        """Forget every sheet and remove the spill files."""
+        self.names.clear()
+        self.resident.clear()
+        self.sizes.clear()
+        self.spilled.clear()
+        self.spilled_columns.clear()
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)  # Files still mapped (Windows) stay until the next start
+            self.directory = None
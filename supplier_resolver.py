@@ -0,0 +1,194 @@
+"""
+Supplier name normalization.
+
+A sheet has many rows but only a handful of distinct supplier spellings, so each distinct
+value is resolved once (known patterns, then aliases, then a token-based fuzzy match) and
+the result is broadcast back to the rows with Series.map. Resolved names can be kept in a
+JSON cache so later sessions skip the matching entirely.
+"""
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Normalization mapping for suppliers
+SUPPLIER_ALIASES = {
+    'cell signaling': 'Cell Signaling Technology',
+    'sigma aldrich': 'Millipore Sigma',
+    'life tech': 'Life Technologies',
+    'wb mason': 'WB Mason',
+    'medchemexpress': 'MedChemExpress',
+    'med chem express': 'MedChemExpress',
+    'medchem express': 'MedChemExpress',
+    'selleckchem': 'SelleckChem',
+    'selleck chem': 'SelleckChem',
+    'selleckchemicals': 'SelleckChem',
+    'apexbio': 'ApexBio',
+    'apex bio': 'ApexBio',
+    'apexbiotechnology': 'ApexBio',
+    'neb': 'New England Biolabs',
+    'new england biolabs': 'New England Biolabs',
+    'thermo fisher': 'Thermo Fisher',
+    'invitrogen': 'Invitrogen',
+    'promega': 'Promega',
+    'bio-rad': 'Bio-Rad',
+    'qiagen': 'Qiagen',
+    'takara': 'Takara',
+    'roche': 'Roche',
+    'clontech': 'Clontech',
+    'agilent': 'Agilent',
+    'millipore': 'Millipore',
+    'ge healthcare': 'GE Healthcare',
+    'applied biosystems': 'Applied Biosystems',
+    'epicentre': 'Epicentre',
+    'softmouse.net': 'SoftMouse.NET',
+    'ISEEHEAR INC': 'ISEEHEAR INC',
+    'ISEEHEAR': 'ISEEHEAR INC',
+    'idt': 'Integrated DNA Technologies',
+    'integrated dna technologies': 'Integrated DNA Technologies',
+    'integrated dna tech': 'Integrated DNA Technologies',
+    'vectorbuilder': 'VectorBuilder',  # Normalize VectorBuilder
+    'vector builder': 'VectorBuilder'
+}
+
+# Substring patterns checked before the aliases (the original normalization rules)
+SUPPLIER_PATTERNS = [
+    (["medchem"], "MedChemExpress"),
+    (["apex"], "ApexBio"),
+    (["selleck"], "SelleckChem"),
+    (["neb"], "New England Biolabs"),
+    (["idt", "integrated dna"], "Integrated DNA Technologies"),
+    (["vectorbuilder", "vector builder"], "VectorBuilder"),
+]
+
+# Words that do not tell suppliers apart
+SUPPLIER_STOPWORDS = {'inc', 'llc', 'ltd', 'co', 'corp', 'corporation', 'company', 'the', 'gmbh', 'usa', 'us', 'and'}
+
+FUZZY_MATCH_THRESHOLD = 0.9  # Minimum spelling similarity for typos such as "Seleckchem"
+
+
+def _tokens(text):
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in SUPPLIER_STOPWORDS]
+
+
+def _tokens_match(value_token, candidate_token):
+    # Abbreviations such as "tech" for "technologies" count as a match
+    return value_token == candidate_token or (len(value_token) >= 4 and candidate_token.startswith(value_token))
+
+
+def rules_version():
+    """Fingerprint of the normalization rules, so a cache built with other rules is discarded."""
+    rules = json.dumps([SUPPLIER_ALIASES, SUPPLIER_PATTERNS, sorted(SUPPLIER_STOPWORDS), FUZZY_MATCH_THRESHOLD])
+    return hashlib.sha1(rules.encode("utf-8")).hexdigest()
+
+
+class SupplierResolver:
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.resolved = {}  # {raw supplier string: canonical name}
+        self.dirty = False
+
+        # Match candidates: every alias and every canonical name, pre-tokenized
+        self.candidates = []
+        for alias, canonical in SUPPLIER_ALIASES.items():
+            for text in (alias, canonical):
+                tokens = _tokens(text)
+                if tokens:
+                    self.candidates.append((tokens, "".join(tokens), canonical))
+
+        if cache_path:
+            self.load()
+
+    def load(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Error reading the supplier cache: %s", e)
+            return
+        if cache.get('rules_version') == rules_version():
+            self.resolved = cache.get('resolved', {})
+
+    def save(self):
+        """Write newly resolved names to the cache file, if there are any."""
+        if not self.cache_path or not self.dirty:
+            return
+        temp_path = self.cache_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({'rules_version': rules_version(), 'resolved': self.resolved}, f, indent=1)
+            os.replace(temp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning("Error writing the supplier cache: %s", e)
+
+    def fuzzy_match(self, supplier):
+        """
+        Best alias or canonical name whose words all appear in the supplier name (covering at
+        least half of its words), or whose spelling is nearly identical. None if nothing fits.
+        """
+        tokens = _tokens(supplier)
+        if not tokens:
+            return None
+        compact = "".join(tokens)
+
+        best_score, best_name = 0.0, None
+        for candidate_tokens, candidate_compact, canonical in self.candidates:
+            matched = sum(
+                1 for candidate_token in candidate_tokens
+                if any(_tokens_match(token, candidate_token) for token in tokens)
+            )
+            if matched == len(candidate_tokens) and matched * 2 >= len(tokens):
+                score = 2 * matched / (len(tokens) + len(candidate_tokens))
+            else:
+                score = difflib.SequenceMatcher(None, compact, candidate_compact).ratio()
+                if score < FUZZY_MATCH_THRESHOLD:
+                    continue
+            if score > best_score:
+                best_score, best_name = score, canonical
+        return best_name
+
+    def resolve_one(self, supplier):
+        """Canonical spelling of one supplier name."""
+        supplier_lower = supplier.lower().strip()
+
+        for patterns, canonical in SUPPLIER_PATTERNS:
+            if any(pattern in supplier_lower for pattern in patterns):
+                return canonical
+
+        for alias, canonical in SUPPLIER_ALIASES.items():
+            if supplier_lower == alias.lower():
+                return canonical
+
+        return self.fuzzy_match(supplier) or supplier.strip()
+
+    def resolve(self, supplier):
+        """Normalize a supplier name to its canonical spelling (None for blanks and non-text values)."""
+        if not supplier or not isinstance(supplier, str):
+            return None
+        if supplier not in self.resolved:
+            self.resolved[supplier] = self.resolve_one(supplier)
+            self.dirty = True
+        return self.resolved[supplier]
+
+    def resolve_series(self, series):
+        """Normalize a whole supplier column, resolving each distinct value only once."""
+        mapping = {value: self.resolve(value) for value in pd.unique(series.dropna())}
+        return series.map(mapping).astype(object)
+
+
+# Shared in-memory resolver used by normalize_supplier
+default_resolver = SupplierResolver()
+
+
+def normalize_supplier(supplier):
+    """Normalize a supplier name to its canonical spelling."""
+    return default_resolver.resolve(supplier)
@@ -4,12 +4,14 @@ import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QLineEdit, QHBoxLayout,
     QLabel, QMessageBox, QListWidget, QDialog, QScrollArea, QFormLayout, QDialogButtonBox,
-    QFileDialog, QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView
+    QFileDialog, QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView, QDockWidget, QCheckBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from datetime import datetime
 from grant_management import GrantManagement
 from excel_handler import ExcelHandler  # Assuming ExcelHandler is in a separate module
+from forecasting import forecast_grants, ForecastCache, FORECAST_CACHE_FILE_NAME
+from profiling import configure_profiling, set_memory_tracking, summarize_history, record_count, history, settings as profiling_settings
 
 
 
@@ -23,8 +25,15 @@ class GrantManagementApp(QMainWindow):
         # Initialize GrantManagement
         self.grant_management = GrantManagement()
 
+        # Timing log of every ExcelHandler/GrantManagement action, shown in the debug panel
+        configure_profiling(os.path.join(self.grant_management.directory_path, "logs"))
+
         # Initialize ExcelHandler
         self.excel_handler = ExcelHandler(self, self.grant_management)
+        self.excel_handler.start_folder_watcher()
+
+        # Per-grant forecasts, recomputed only for grants whose ledger changed
+        self.forecast_cache = ForecastCache(os.path.join(self.grant_management.directory_path, FORECAST_CACHE_FILE_NAME))
 
         # Main layout
         layout = QVBoxLayout()
@@ -73,15 +82,42 @@ class GrantManagementApp(QMainWindow):
         # Upload Excel Button
         upload_btn = QPushButton("Upload Inventory Excel File")
         upload_btn.setStyleSheet(button_style)
-        upload_btn.clicked.connect(self.excel_handler.upload_excel)  # Link to ExcelHandler's upload_excel method
+        upload_btn.clicked.connect(lambda: self.excel_handler.upload_excel())  # Link to ExcelHandler's upload_excel method
         layout.addWidget(upload_btn)
 
+        # Upload and Merge Multiple Files Button
+        merge_upload_btn = QPushButton("Upload and Merge Multiple Files")
+        merge_upload_btn.setStyleSheet(button_style)
+        merge_upload_btn.clicked.connect(lambda: self.excel_handler.upload_multiple_files())
+        layout.addWidget(merge_upload_btn)
+
         # Display Saved Files Button
         display_saved_files_btn = QPushButton("Display Saved Excel Files")
         display_saved_files_btn.setStyleSheet(button_style)
-        display_saved_files_btn.clicked.connect(self.excel_handler.display_saved_files)  # Link to ExcelHandler's display_saved_files method
+        display_saved_files_btn.clicked.connect(lambda: self.excel_handler.display_saved_files())  # Link to ExcelHandler's display_saved_files method
         layout.addWidget(display_saved_files_btn)
 
+        # Resume Last Session Button
+        resume_session_btn = QPushButton("Resume Last Session")
+        last_session = self.excel_handler.last_session_summary()
+        if last_session:
+            resume_session_btn.setText(f"Resume Last Session ({last_session})")
+        resume_session_btn.setStyleSheet(button_style)
+        resume_session_btn.clicked.connect(lambda: self.excel_handler.restore_session())
+        layout.addWidget(resume_session_btn)
+
+
+        # Train Item Classifier Button
+        train_classifier_btn = QPushButton("Train Item Classifier")
+        train_classifier_btn.setStyleSheet(button_style)
+        train_classifier_btn.clicked.connect(lambda: self.excel_handler.train_fallback_classifier())
+        layout.addWidget(train_classifier_btn)
+
+        # Chart Report Button
+        chart_report_btn = QPushButton("Generate Chart Report")
+        chart_report_btn.setStyleSheet(button_style)
+        chart_report_btn.clicked.connect(lambda: self.excel_handler.generate_chart_report())
+        layout.addWidget(chart_report_btn)
 
         # Add Spending Rule Button
         add_rule_btn = QPushButton("Add Spending Rule")
@@ -95,17 +131,105 @@ class GrantManagementApp(QMainWindow):
         view_allocated_btn.clicked.connect(self.view_allocated_costs)
         layout.addWidget(view_allocated_btn)
 
+        # Forecast Burn Rate Button
+        forecast_btn = QPushButton("Forecast Grant Burn Rate")
+        forecast_btn.setStyleSheet(button_style)
+        forecast_btn.clicked.connect(self.show_burn_rate_forecast)
+        layout.addWidget(forecast_btn)
+
         # Remove Allocated Costs Button
         remove_allocated_btn = QPushButton("Remove Allocated Costs from Grant")
         remove_allocated_btn.setStyleSheet(button_style)
         remove_allocated_btn.clicked.connect(self.remove_allocated_costs_dialog)
         layout.addWidget(remove_allocated_btn)
 
+        # Memory Budget Button
+        memory_budget_btn = QPushButton("Set Memory Budget")
+        memory_budget_btn.setStyleSheet(button_style)
+        memory_budget_btn.clicked.connect(lambda: self.excel_handler.set_memory_budget())
+        layout.addWidget(memory_budget_btn)
+
+        # Debug Panel Button
+        debug_panel_btn = QPushButton("Show Debug Panel")
+        debug_panel_btn.setStyleSheet(button_style)
+        debug_panel_btn.clicked.connect(self.toggle_debug_panel)
+        layout.addWidget(debug_panel_btn)
+
         # Central widget
         central_widget = QWidget()
         central_widget.setLayout(layout)
         self.setCentralWidget(central_widget)
 
+        self.create_debug_panel()
+
+    def create_debug_panel(self):
+        """Dock listing the timing, rows and peak memory of recent actions and their phases."""
+        self.debug_dock = QDockWidget("Debug Panel", self)
+        panel = QWidget()
+        panel_layout = QVBoxLayout(panel)
+
+        options_layout = QHBoxLayout()
+        memory_checkbox = QCheckBox("Track Peak Memory")
+        memory_checkbox.setChecked(profiling_settings['track_memory'])
+        memory_checkbox.stateChanged.connect(lambda state: set_memory_tracking(state == Qt.Checked))
+        options_layout.addWidget(memory_checkbox)
+
+        cprofile_checkbox = QCheckBox("Write cProfile Dumps")
+        cprofile_checkbox.setChecked(profiling_settings['cprofile'])
+        cprofile_checkbox.setToolTip(f"Saved to {profiling_settings['cprofile_directory']}")
+        cprofile_checkbox.stateChanged.connect(lambda state: profiling_settings.update(cprofile=(state == Qt.Checked)))
+        options_layout.addWidget(cprofile_checkbox)
+
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear_debug_panel)
+        options_layout.addWidget(clear_button)
+        panel_layout.addLayout(options_layout)
+
+        self.debug_table = QTableWidget()
+        self.debug_table.setStyleSheet("font-size: 12px; color: black; background-color: white;")
+        panel_layout.addWidget(self.debug_table)
+
+        self.debug_dock.setWidget(panel)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.debug_dock)
+        self.debug_dock.hide()
+
+        # Poll the history while the panel is visible; records are only added, never edited
+        self.debug_record_count = -1
+        self.debug_timer = QTimer(self)
+        self.debug_timer.timeout.connect(self.refresh_debug_panel)
+        self.debug_timer.start(1000)
+
+    def clear_debug_panel(self):
+        history.clear()
+        self.debug_record_count = -1
+        self.refresh_debug_panel()
+
+    def toggle_debug_panel(self):
+        self.debug_dock.setVisible(not self.debug_dock.isVisible())
+        self.debug_record_count = -1
+        self.refresh_debug_panel()
+
+    def refresh_debug_panel(self):
+        """Show the recorded actions, newest first, phases indented under their action."""
+        if not self.debug_dock.isVisible() or record_count() == self.debug_record_count:
+            return
+        self.debug_record_count = record_count()
+        records = summarize_history()
+        columns = ['time', 'action', 'phase', 'seconds', 'rows', 'peak_mb']
+
+        self.debug_table.setRowCount(len(records))
+        self.debug_table.setColumnCount(len(columns))
+        self.debug_table.setHorizontalHeaderLabels(["Time", "Action", "Phase", "Seconds", "Rows", "Peak MB"])
+        for i, record in enumerate(records.itertuples(index=False)):
+            for j, column in enumerate(columns):
+                value = getattr(record, column)
+                if column == 'phase':
+                    text = "    " * int(record.depth) + str(value)
+                else:
+                    text = "" if pd.isna(value) else str(value)
+                self.debug_table.setItem(i, j, QTableWidgetItem(text))
+        self.debug_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
     def button_style(self):
         """Return the button style used across the UI."""
         return """
@@ -153,6 +277,54 @@ class GrantManagementApp(QMainWindow):
         dialog.setLayout(layout)
         dialog.exec_()
 
+    def show_burn_rate_forecast(self):
+        """Display each grant's burn rate and projected exhaustion date."""
+        if self.grant_management.grant_data.empty:
+            QMessageBox.information(self, "No Grants", "There are no grants in the database.")
+            return
+
+        try:
+            forecast = forecast_grants(self.grant_management.allocated_costs, self.grant_management.grant_data, self.forecast_cache)
+            self.forecast_cache.save()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while forecasting: {str(e)}")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Grant Burn Rate Forecast")
+        dialog.setStyleSheet("background-color: #cce7ff;")
+        dialog.resize(900, 400)
+
+        layout = QVBoxLayout(dialog)
+        table_widget = QTableWidget()
+        table_widget.setRowCount(forecast.shape[0])
+        table_widget.setColumnCount(forecast.shape[1])
+        table_widget.setHorizontalHeaderLabels(forecast.columns)
+        table_widget.setStyleSheet("font-size: 14px; color: black; background-color: white;")
+
+        for i, row in forecast.iterrows():
+            for j, (column, value) in enumerate(row.items()):
+                if column == 'Projected Exhaustion':
+                    text = value.strftime("%Y-%m-%d") if pd.notna(value) else "Not within 10 years"
+                elif column in ('Remaining', 'Avg Monthly Spend', 'Burn Rate'):
+                    text = f"${value:,.2f}"
+                elif column == 'Months Left':
+                    text = f"{value:.1f}" if pd.notna(value) else ""
+                else:
+                    text = str(value)
+                table_widget.setItem(i, j, QTableWidgetItem(text))
+
+        table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(table_widget)
+
+        note_label = QLabel("Burn rate is the recent trend of monthly allocations; allocations made before dates were recorded are not included.")
+        note_label.setWordWrap(True)
+        note_label.setStyleSheet("font-size: 12px; color: #555;")
+        layout.addWidget(note_label)
+
+        dialog.setLayout(layout)
+        dialog.exec_()
+
     def remove_allocated_costs_dialog(self):
         """Dialog to select and remove allocated costs from a grant."""
         dialog = QDialog(self)
@@ -197,6 +369,7 @@ class GrantManagementApp(QMainWindow):
             if not grant_data.empty:
                 # Reset the allocated costs to zero
                 self.grant_management.update_grant_data(grant_name, 'Allocated Costs', 0)
+                self.grant_management.clear_allocated_costs(grant_data['Grant ID'].iloc[0])
                 QMessageBox.information(self, "Success", f"Allocated costs removed from {grant_name}.")
                 dialog.accept()
             else:
@@ -644,6 +817,7 @@ class GrantManagementApp(QMainWindow):
             dialog.reject()
 
     def closeEvent(self, event):
+        self.excel_handler.stop_folder_watcher()
         super().closeEvent(event)
         QApplication.quit()
         sys.exit()